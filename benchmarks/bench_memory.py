@@ -0,0 +1,97 @@
+"""Measures the memory used by roads, traffic lights, points and cars.
+
+Memory is measured with tracemalloc while the objects are created, so it includes
+everything they allocate, e.g. the road arrays. Large maps are built by tiling the
+sample map.
+
+Usage:
+    python benchmarks/bench_memory.py --tiles 4 --cars 10000
+"""
+
+import argparse
+import tracemalloc
+from typing import Callable
+
+import numpy as np
+
+from psi_environment.data.car import DummyAgent
+from psi_environment.data.map_state import (
+    create_adjacency_matrix,
+    create_edges,
+    create_roads,
+    create_traffic_lights,
+    get_map,
+    get_node_indices,
+)
+from psi_environment.data.point import Point
+
+
+def measure(create: Callable[[], object]) -> tuple[object, int]:
+    """Creates objects and measures the memory they use.
+
+    Args:
+        create (Callable[[], object]): Function creating the objects.
+
+    Returns:
+        tuple[object, int]: The created objects and the number of bytes they use.
+    """
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    objects = create()
+    size = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+    return objects, size
+
+
+def run(tiles: int, n_cars: int, seed: int):
+    """Prints the memory used per road, traffic light, point and car.
+
+    Args:
+        tiles (int): Number of copies of the sample map along each axis.
+        n_cars (int): Number of cars to create.
+        seed (int): Random seed.
+    """
+    np.random.seed(seed)
+    map_array = np.tile(get_map(), (tiles, tiles))
+    node_indices = get_node_indices(map_array)
+    adjacency_matrix = create_adjacency_matrix(map_array, node_indices)
+    edges = create_edges(node_indices, adjacency_matrix)
+
+    roads, roads_size = measure(
+        lambda: create_roads(edges, adjacency_matrix, node_indices)
+    )
+    lights, lights_size = measure(
+        lambda: create_traffic_lights(edges, adjacency_matrix, 1.0)
+    )
+    road_keys = list(roads)
+    points, points_size = measure(
+        lambda: [
+            Point(map_position=(i, i), road_positions=[(road_keys[0], 0)])
+            for i in range(n_cars)
+        ]
+    )
+    cars, cars_size = measure(
+        lambda: [
+            DummyAgent(road_keys[i % len(road_keys)], 0, seed, i + 1)
+            for i in range(n_cars)
+        ]
+    )
+
+    print(f"map {map_array.shape[1]}x{map_array.shape[0]} tiles, {len(roads)} roads")
+    print(f"road:          {roads_size / len(roads):8.1f} bytes")
+    print(f"traffic light: {lights_size / max(len(lights), 1):8.1f} bytes")
+    print(f"point:         {points_size / len(points):8.1f} bytes")
+    print(f"car:           {cars_size / len(cars):8.1f} bytes")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tiles", type=int, default=4)
+    parser.add_argument("--cars", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=2137)
+    args = parser.parse_args()
+    run(args.tiles, args.cars, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Measures the time MapState.move_cars takes on crowded maps.
+
+Cars are placed on random cells of a tiled sample map and all of them drive
+forward, so most of them queue up behind each other. Moving cars one by one is
+compared with moving the cars that are not at a road end all at once.
+
+Usage:
+    python benchmarks/bench_moves.py --tiles 4 --density 0.3 --ticks 200
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from psi_environment.data.action import Action
+from psi_environment.data.map_state import MapState, get_map
+
+
+def run(tiles: int, density: float, ticks: int, seed: int, vectorized: bool) -> float:
+    """Moves the cars of a crowded map for a number of ticks.
+
+    Args:
+        tiles (int): Number of copies of the sample map along each axis.
+        density (float): Fraction of the road cells taken by cars.
+        ticks (int): Number of ticks to simulate.
+        seed (int): Random seed.
+        vectorized (bool): Whether cars are moved all at once on the lane buffer.
+
+    Returns:
+        float: Milliseconds per tick.
+    """
+    np.random.seed(seed)
+    map_state = MapState(
+        seed,
+        map_array=np.tile(get_map(), (tiles, tiles)),
+        vectorized_moves=vectorized,
+    )
+    cells = [
+        (road_key, pos)
+        for road_key, road in map_state.get_roads().items()
+        for pos in range(road.get_length())
+    ]
+    n_cars = int(len(cells) * density)
+    for car_id, idx in enumerate(
+        np.random.choice(len(cells), n_cars, replace=False), start=1
+    ):
+        map_state._add_car(car_id, *cells[idx])
+
+    start = time.perf_counter()
+    for tick in range(ticks):
+        actions = [(car_id, Action.FORWARD) for car_id in range(1, n_cars + 1)]
+        map_state.move_cars(actions)
+        if tick % 10 == 0:
+            map_state._switch_traffic_lights()
+    return (time.perf_counter() - start) / ticks * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tiles", type=int, default=4)
+    parser.add_argument("--density", type=float, default=0.3)
+    parser.add_argument("--ticks", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=2137)
+    args = parser.parse_args()
+
+    for vectorized in (False, True):
+        ms = run(args.tiles, args.density, args.ticks, args.seed, vectorized)
+        name = "all at once" if vectorized else "one by one"
+        print(f"{name:12}: {ms:8.2f} ms per tick")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Measures rendering throughput of Game on large maps.
+
+The benchmark uses the SDL dummy video driver, so it can run on machines without
+a display. Large maps are built by tiling the sample map.
+
+Usage:
+    python benchmarks/bench_render.py --tiles 4 --frames 200
+"""
+
+import argparse
+import os
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import numpy as np
+
+from psi_environment.data.map import Map
+from psi_environment.data.map_state import get_map
+from psi_environment.game.game import Game
+
+
+def make_large_map(tiles: int) -> np.ndarray:
+    """Builds a map array by tiling the sample map.
+
+    Args:
+        tiles (int): Number of copies of the sample map along each axis.
+
+    Returns:
+        np.ndarray: The tiled map array.
+    """
+    return np.tile(get_map(), (tiles, tiles))
+
+
+def run(tiles: int, frames: int, n_bots: int, seed: int) -> float:
+    """Renders a number of frames of a running simulation.
+
+    Args:
+        tiles (int): Number of copies of the sample map along each axis.
+        frames (int): Number of frames to render.
+        n_bots (int): Number of bot cars on the map.
+        seed (int): Random seed of the simulation.
+
+    Returns:
+        float: Rendered frames per second. Simulation time is not included.
+    """
+    np.random.seed(seed)
+    game_map = Map(random_seed=seed, n_bots=n_bots, map_array=make_large_map(tiles))
+    game = Game(game_map, random_seed=seed, ticks_per_second=0)
+
+    render_time = 0.0
+    for _ in range(frames):
+        game_map.step()
+        start = time.perf_counter()
+        game.step()
+        render_time += time.perf_counter() - start
+    game.stop()
+    return frames / render_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tiles", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--bots", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=2137)
+    args = parser.parse_args()
+
+    for tiles in args.tiles:
+        fps = run(tiles, args.frames, args.bots, args.seed)
+        shape = make_large_map(tiles).shape
+        print(f"map {shape[1]}x{shape[0]} tiles: {fps:8.1f} FPS")
+
+
+if __name__ == "__main__":
+    main()
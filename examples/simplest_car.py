@@ -21,3 +21,4 @@ if __name__ == "__main__":
     while env.is_running():
         current_cost, is_running = env.step()
         print(current_cost, is_running)
+    env.close()
@@ -1,3 +1,6 @@
+from collections import Counter
+from typing import Any, Hashable
+
 from typing_extensions import deprecated
 
 import numpy as np
@@ -7,12 +10,73 @@ from psi_environment.data.action import Action
 from psi_environment.data.point import Point
 
 
+_MISSING = object()
+
+
 class EnvironmentAPI:
     """Defines the API for interacting with the environment, including functions for
-    getting data about cost, map state, and traffic."""
+    getting data about cost, map state, and traffic.
+
+    Answers to repeated queries are cached. Answers that depend only on the map
+    layout (road lengths, road ends, next roads and available turns) are cached
+    forever, answers that depend on the cars (traffic) until the version of the map
+    state changes, i.e. until the next move. Use for_map_state() to share one API
+    object, and its caches, between all cars of a map.
+    """
 
     def __init__(self, map_state: MapState):
         self._map_state = map_state
+        self._static_cache: dict[Hashable, Any] = {}
+        self._dynamic_cache: dict[Hashable, Any] = {}
+        self._cache_version = None
+        self._cache_hits: Counter[str] = Counter()
+        self._cache_misses: Counter[str] = Counter()
+
+    @classmethod
+    def for_map_state(cls, map_state: MapState) -> "EnvironmentAPI":
+        """Returns the API object shared by all users of the map state, creating it
+        on first use.
+
+        Args:
+            map_state (MapState): The map state.
+
+        Returns:
+            EnvironmentAPI: The shared API object.
+        """
+        # kept on the map state itself, so that it lives as long as the map state
+        api = getattr(map_state, "_environment_api", None)
+        if api is None:
+            api = cls(map_state)
+            map_state._environment_api = api
+        return api
+
+    def get_cache_stats(self) -> dict[str, tuple[int, int]]:
+        """Returns the number of cache hits and misses of every cached query, e.g.
+        for tuning agents.
+
+        Returns:
+            dict[str, tuple[int, int]]: Mapping from query name to its hits and
+                misses.
+        """
+        return {
+            name: (self._cache_hits[name], self._cache_misses[name])
+            for name in self._cache_hits.keys() | self._cache_misses.keys()
+        }
+
+    def _get_cached(self, cache: dict[Hashable, Any], key: tuple) -> Any:
+        value = cache.get(key, _MISSING)
+        if value is _MISSING:
+            self._cache_misses[key[0]] += 1
+        else:
+            self._cache_hits[key[0]] += 1
+        return value
+
+    def _get_dynamic_cache(self) -> dict[Hashable, Any]:
+        version = self._map_state.get_version()
+        if version != self._cache_version:
+            self._dynamic_cache = {}
+            self._cache_version = version
+        return self._dynamic_cache
 
     def get_adjacency_matrix(self) -> np.ndarray:
         """Returns the adjacency matrix representing the connections between nodes in
@@ -23,6 +87,32 @@ class EnvironmentAPI:
         """
         return self._map_state.get_adjacency_matrix()
 
+    def get_observation(
+        self, car_id: int | None = None, crop_radius: int | None = None
+    ) -> np.ndarray:
+        """Returns a grid image of the map for learning agents. Every map tile is
+        split into 2x2 cells, so that every lane has its own cells. Channels are
+        listed in ObservationChannel: roads, cars, own car, remaining points and red
+        lights.
+
+        The array is preallocated and updated in place as the simulation runs, so
+        getting it is cheap. It is a read-only view; copy it to keep the state of a
+        given step.
+
+        Args:
+            car_id (int | None, optional): The id of the agent car. Defaults to None,
+                which returns the global observation, without own car and with the
+                points of all agents.
+            crop_radius (int | None, optional): If set, only a square of
+                2 * crop_radius + 1 cells centred on the car is returned.
+                Defaults to None, which returns the whole map.
+
+        Returns:
+            np.ndarray: Array of shape (channels, height, width).
+        """
+        grid = self._map_state.get_observation_grid(crop_radius or 0)
+        return grid.get_observation(car_id, crop_radius)
+
     def get_road(self, road_key: tuple[int, int]) -> Road | None:
         """Returns the road with the given key or None if it doesn't exist.
 
@@ -43,10 +133,13 @@ class EnvironmentAPI:
         Returns:
             int: The length of the road with the given key or np.nan if it doesn't exist
         """
-        road = self._map_state.get_road(road_key)
-        if road is None:
-            return np.nan
-        return road.get_length()
+        key = ("get_road_length", road_key)
+        length = self._get_cached(self._static_cache, key)
+        if length is _MISSING:
+            road = self._map_state.get_road(road_key)
+            length = np.nan if road is None else road.get_length()
+            self._static_cache[key] = length
+        return length
 
     def is_position_road_end(self, road_key: tuple[int, int], pos_idx: int) -> bool:
         """Checks if a given position index is at the end of a road.
@@ -58,8 +151,13 @@ class EnvironmentAPI:
         Returns:
             bool: True if the position is at the end of the road, False otherwise
         """
-        road = self._map_state.get_road(road_key)
-        return road.is_position_road_end(pos_idx)
+        key = ("is_position_road_end", road_key, pos_idx)
+        is_end = self._get_cached(self._static_cache, key)
+        if is_end is _MISSING:
+            road = self._map_state.get_road(road_key)
+            is_end = road.is_position_road_end(pos_idx)
+            self._static_cache[key] = is_end
+        return is_end
 
     def get_next_road(self, road_key: tuple[int, int], action: Action) -> Road | None:
         """Returns the road that follows the road with the given key in given direction
@@ -73,6 +171,14 @@ class EnvironmentAPI:
             Road | None: The forward road from the road with the given key or None if
                 it doesn't exist
         """
+        key = ("get_next_road", road_key, action)
+        next_road = self._get_cached(self._static_cache, key)
+        if next_road is _MISSING:
+            next_road = self._find_next_road(road_key, action)
+            self._static_cache[key] = next_road
+        return next_road
+
+    def _find_next_road(self, road_key: tuple[int, int], action: Action) -> Road | None:
         road = self._map_state.get_road(road_key)
         if road is None:
             return None
@@ -90,6 +196,29 @@ class EnvironmentAPI:
             return None
         return self._map_state.get_road(next_road_key)
 
+    def get_route_road_keys(
+        self, road_key: tuple[int, int], actions: list[Action]
+    ) -> list[tuple[int, int]] | None:
+        """Returns the roads a car drives through when it takes the given actions at
+        the next road ends, e.g. to check a route before Car.set_route().
+
+        Args:
+            road_key (tuple[int, int]): The key of the road the car is on.
+            actions (list[Action]): The actions at the next road ends.
+
+        Returns:
+            list[tuple[int, int]] | None: The keys of the roads reached after every
+                action, or None if an action is not available at its road end.
+        """
+        road_keys = []
+        for action in actions:
+            road = self.get_next_road(road_key, action)
+            if road is None:
+                return None
+            road_key = road.get_key()
+            road_keys.append(road_key)
+        return road_keys
+
     def get_forward_road(self, road_key: tuple[int, int]) -> Road | None:
         """Returns the forward road from the road with the given key or None if it
         doesn't exist.
@@ -151,11 +280,14 @@ class EnvironmentAPI:
         Returns:
             int: The number of cars on the road with the given key
         """
-        road = self._map_state.get_road(road_key)
-        if road is None:
-            return np.nan
-
-        return road.get_number_of_cars()
+        cache = self._get_dynamic_cache()
+        key = ("get_road_traffic", road_key)
+        traffic = self._get_cached(cache, key)
+        if traffic is _MISSING:
+            road = self._map_state.get_road(road_key)
+            traffic = np.nan if road is None else road.get_number_of_cars()
+            cache[key] = traffic
+        return traffic
 
     def get_specific_traffic(self, from_node: int, to_node: int) -> int:
         """Returns the traffic from a specific node to another, indicating the number of
@@ -169,7 +301,7 @@ class EnvironmentAPI:
         Returns:
             int: The number of cars from the start node to the end node.
         """
-        self.get_road_traffic((from_node, to_node))
+        return self.get_road_traffic((from_node, to_node))
 
     def get_traffic(self) -> np.ndarray:
         """Returns the traffic matrix, indicating the number of cars between nodes.
@@ -177,15 +309,19 @@ class EnvironmentAPI:
         Returns:
             np.ndarray: A matrix with shape (num_nodes, num_nodes), where each element
                 is an integer that represents the number of cars from one node to
-                another.
+                another, or NaN if there is no road between them.
         """
-        size = self._map_state.get_adjacency_matrix_size()
-        traffic_matrix = np.full((size, size), np.nan)
-
-        for i in range(size):
-            for j in range(size):
-                traffic_matrix[i, j] = self.get_specific_traffic(i, j)
-        return traffic_matrix
+        cache = self._get_dynamic_cache()
+        key = ("get_traffic",)
+        traffic_matrix = self._get_cached(cache, key)
+        if traffic_matrix is _MISSING:
+            size = self._map_state.get_adjacency_matrix_size()
+            traffic_matrix = np.full((size, size), np.nan)
+            for road_key, road in self._map_state.get_roads().items():
+                traffic_matrix[road_key] = road.get_number_of_cars()
+            cache[key] = traffic_matrix
+        # the cached matrix is shared, callers get their own copy
+        return traffic_matrix.copy()
 
     def get_points_for_all_cars(self) -> dict[int, list[Point]]:
         """Returns a list of points on the map for all cars.
@@ -261,12 +397,14 @@ class EnvironmentAPI:
         Returns:
             list[Action]: A list of available actions at the specified road.
         """
-        road = self._map_state.get_road(road_key)
-
-        if road is None:
-            return []
-
-        return road.get_available_turns()
+        key = ("get_available_turns", road_key)
+        turns = self._get_cached(self._static_cache, key)
+        if turns is _MISSING:
+            road = self._map_state.get_road(road_key)
+            turns = () if road is None else tuple(road.get_available_turns())
+            self._static_cache[key] = turns
+        # the cached turns are shared, callers get their own list
+        return list(turns)
 
     def get_points_amount_for_all_cars(self) -> dict[int, int]:
         """Checks how many each agent has points to collect
@@ -0,0 +1,181 @@
+import time
+from multiprocessing.connection import Client, Connection, Listener, wait
+from typing import Any, Type
+
+from psi_environment.data.action import Action
+from psi_environment.data.car import Car
+from psi_environment.data.map_state import MapState
+from psi_environment.data.shared_state import SharedMapState
+
+# messages sent to agent processes
+TICK = 0
+CLOSE = 1
+
+
+class AgentServer:
+    """Serves the state of a map to agents running in separate processes, e.g. heavy
+    planners or agents with their own virtualenv.
+
+    The map state is shared through a SharedMapState, so agent processes read it
+    without copying. For every request of actions, the server sends a new sequence
+    number to the agent processes over a multiprocessing.connection and waits for
+    their replies, each tagged with the sequence number it answers; late replies to
+    earlier requests are dropped. Agent processes are started with
+    run_agent_client().
+    """
+
+    def __init__(self, address: Any = None, authkey: bytes | None = None):
+        """Starts listening for agent processes.
+
+        Args:
+            address (Any, optional): Address of the listener, see
+                multiprocessing.connection.Listener. Defaults to None, which picks a
+                free local address.
+            authkey (bytes | None, optional): Key that agent processes must use to
+                connect. Defaults to None, which uses the authkey of the current
+                process, inherited by its child processes.
+        """
+        self._listener = Listener(address, authkey=authkey)
+        self._shared: SharedMapState | None = None
+        self._map_state: MapState | None = None
+        self._connections: dict[int, Connection] = {}
+        self._sequence = 0
+        self._closed = False
+
+    def get_address(self) -> Any:
+        """Returns the address agent processes connect to.
+
+        Returns:
+            Any: The address of the listener.
+        """
+        return self._listener.address
+
+    def is_closed(self) -> bool:
+        """Checks whether the server was closed.
+
+        Returns:
+            bool: True if close() was called.
+        """
+        return self._closed
+
+    def start(self, map_state: MapState, car_ids: list[int]):
+        """Moves the map state to shared memory and waits until an agent process has
+        connected for every car.
+
+        Args:
+            map_state (MapState): The map state, with cars and points placed.
+            car_ids (list[int]): Ids of the cars driven by agent processes, assigned
+                in the order in which the processes connect.
+        """
+        self._map_state = map_state
+        self._shared = SharedMapState.create(map_state)
+        for car_id in car_ids:
+            connection = self._listener.accept()
+            connection.send((self._shared.get_layout(), car_id))
+            self._connections[car_id] = connection
+
+    def get_actions(self, tick: int, timeout: float | None = None) -> dict[int, Action]:
+        """Publishes the current map state as the given tick and collects the actions
+        of the agent processes.
+
+        Args:
+            tick (int): The tick the actions are for.
+            timeout (float | None, optional): Time in seconds to wait for the
+                actions. Defaults to None, which waits for all agent processes.
+
+        Raises:
+            RuntimeError: If the server is closed.
+            ConnectionError: If an agent process disconnected.
+
+        Returns:
+            dict[int, Action]: Actions of the agents that replied in time.
+        """
+        if self._closed:
+            raise RuntimeError("The agent server is closed")
+        self._shared.update(self._map_state, tick)
+        self._sequence += 1
+        for connection in self._connections.values():
+            connection.send((TICK, self._sequence))
+
+        pending = {
+            connection: car_id for car_id, connection in self._connections.items()
+        }
+        deadline = None if timeout is None else time.monotonic() + timeout
+        actions = {}
+        while pending:
+            remaining = None
+            if deadline is not None:
+                remaining = max(0, deadline - time.monotonic())
+            ready = wait(list(pending), remaining)
+            if not ready:
+                break
+            for connection in ready:
+                try:
+                    sequence, action = connection.recv()
+                except EOFError:
+                    raise ConnectionError(
+                        f"Agent process of car {pending[connection]} disconnected"
+                    )
+                if sequence == self._sequence:
+                    actions[pending.pop(connection)] = Action(action)
+        return actions
+
+    def close(self):
+        """Stops the agent processes, closes the connections and frees the shared
+        memory. The roads of the map state get private copies of their arrays."""
+        self._closed = True
+        for connection in self._connections.values():
+            try:
+                connection.send((CLOSE, None))
+            except OSError:
+                pass
+            connection.close()
+        self._connections.clear()
+        self._listener.close()
+        if self._shared is not None:
+            self._shared.close(self._map_state)
+            self._shared = None
+
+
+def run_agent_client(address: Any, agent_type: Type[Car], authkey: bytes | None = None):
+    """Connects to an AgentServer and drives a car with an agent of the given type
+    until the server closes. Meant to be the target of an agent process.
+
+    The agent gets a map state whose roads are views of the shared memory, the rest
+    of its state is loaded from the shared memory before every action. If the agent
+    falls behind, requests that were already superseded are skipped.
+
+    Args:
+        address (Any): Address of the server, see AgentServer.get_address().
+        agent_type (Type[Car]): Type of the agent, created with the road key, road
+            position and id of its car.
+        authkey (bytes | None, optional): Key of the server. Defaults to None, which
+            uses the authkey of the current process.
+    """
+    with Client(address, authkey=authkey) as connection:
+        layout, car_id = connection.recv()
+        shared = SharedMapState.attach(layout)
+        map_state = shared.create_map_state()
+        shared.load(map_state)
+        agent = agent_type(*map_state.get_cars()[car_id], car_id)
+
+        try:
+            while True:
+                try:
+                    message, sequence = connection.recv()
+                    while message == TICK and connection.poll():
+                        message, sequence = connection.recv()
+                except EOFError:
+                    break
+                if message == CLOSE:
+                    break
+
+                shared.load(map_state)
+                agent._road_key, agent._road_pos = map_state.get_cars()[car_id]
+                action = agent.get_action(map_state)
+                try:
+                    connection.send((sequence, int(action)))
+                except OSError:
+                    break
+        finally:
+            shared.close(map_state)
@@ -0,0 +1,14 @@
+from enum import Enum
+
+
+class CallbackPolicy(Enum):
+    """The CallbackPolicy enum defines when a car is asked for its action. On the
+    other steps the car takes its default action.
+
+    ALWAYS - ask the car in every step
+    ROAD_END - ask the car only when it is at a road end, where it can turn
+    EVERY_N_TICKS - ask the car in every callback_interval-th step
+    """
+    ALWAYS = 0
+    ROAD_END = 1
+    EVERY_N_TICKS = 2
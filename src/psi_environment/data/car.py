@@ -5,6 +5,7 @@ import numpy as np
 from psi_environment.data.map_state import MapState
 from psi_environment.api.environment_api import EnvironmentAPI
 from psi_environment.data.action import Action
+from psi_environment.data.callback_policy import CallbackPolicy
 
 
 class Car:
@@ -14,8 +15,23 @@ class Car:
     Note that it does not directly represent a physical vehicle in the simulation.
     The simulation has correct physical representations of cars, while the Car class
     should only be treated as a view of the simulation.
+
+    Cars use slots to stay small in large populations. Subclasses that do not
+    declare __slots__ still get a regular instance dictionary.
     """
 
+    __slots__ = ("_road_key", "_road_pos", "_car_id", "_route_request")
+
+    # cars that always drive forward while they are blocked, by the car in front of
+    # them or by a red light, can set it to True; they are then not asked for actions
+    # while they are blocked, see MapState.get_blocked_cars
+    forward_while_blocked = False
+    # cars that only need to decide in some steps declare when they are asked for
+    # actions, in the other steps they take default_action
+    callback_policy = CallbackPolicy.ALWAYS
+    callback_interval = 1
+    default_action = Action.FORWARD
+
     def __init__(self, road_key: tuple[int, int], road_pos: int, car_id: int):
         """Initializes the Car instance.
 
@@ -28,12 +44,16 @@ class Car:
         self._road_key = road_key
         self._road_pos = road_pos
         self._car_id = car_id
+        self._route_request: tuple[list[Action], int] | None = None
 
     @abstractmethod
     def get_action(self, map_state: MapState) -> Action:
         """Abstract method to determine the car's next action based on the current
         state of the map.
 
+        It can also be defined as async def, e.g. to query a model server. Async
+        agents are awaited concurrently and can be given a deadline, see Map.
+
         Args:
             map_state (MapState): The current state of the map.
 
@@ -42,6 +62,25 @@ class Car:
         """
         pass
 
+    def set_route(self, actions: list[Action], max_blocked_ticks: int = 10):
+        """Submits a standing route from get_action: the actions to take at the next
+        road ends, see EnvironmentAPI.get_route_road_keys(). The map drives the car
+        along the route without asking it for actions, forward between road ends,
+        starting in the current step, so the action returned by get_action is not
+        used. The car is asked again when the route is completed, when the car could
+        not move for max_blocked_ticks steps in a row or when it collects a point.
+
+        Routes are executed by Map, they are not available to remote agents.
+
+        Args:
+            actions (list[Action]): The actions at the next road ends, starting with
+                the current road. An empty list only cancels the current route.
+            max_blocked_ticks (int, optional): Number of steps in a row the car may
+                not move before the route is dropped. Defaults to 10.
+        """
+        route = [Action(action) for action in actions]
+        self._route_request = (route, max_blocked_ticks)
+
     def get_car_id(self) -> int:
         """Returns the car's unique identifier.
 
@@ -75,6 +114,14 @@ class DummyAgent(Car):
     makes random decisions based on a given random seed.
     """
 
+    __slots__ = (
+        "_random_seed",
+        "_step",
+        "_last_action",
+        "_last_road_key",
+        "_last_road_pos",
+    )
+
     def __init__(
         self, road_key: tuple[int, int], road_pos: int, random_seed: int, car_id: int
     ):
@@ -109,7 +156,7 @@ class DummyAgent(Car):
         seed = (self._random_seed * self._car_id) % 10_000 + self._step
         rng = np.random.default_rng(seed)
 
-        api = EnvironmentAPI(map_state)
+        api = EnvironmentAPI.for_map_state(map_state)
 
         action = rng.choice([Action.FORWARD, Action.BACK], p=[0.95, 0.05])
         if api.is_position_road_end(self.get_road_key(), self._road_pos):
@@ -126,3 +173,66 @@ class DummyAgent(Car):
         self._last_road_key = self.get_road_key()
         self._last_road_pos = self.get_road_pos()
         return action
+
+
+class ExternalAgent(Car):
+    """The ExternalAgent class is a subclass of Car that is controlled from outside of
+    the simulation: its action for the next step is set with set_action(), e.g. by
+    Environment.step_batch(actions), instead of being decided by the car itself.
+    """
+
+    __slots__ = ("_next_action",)
+
+    def __init__(self, road_key: tuple[int, int], road_pos: int, car_id: int):
+        """Initializes the ExternalAgent instance.
+
+        Args:
+            road_key (tuple[int, int]): A tuple representing the key of the road on
+                which the car is currently located.
+            road_pos (int): An integer representing the car's position on the road.
+            car_id (int): The unique identifier of the car.
+        """
+        super().__init__(road_key, road_pos, car_id)
+        self._next_action = Action.FORWARD
+
+    def set_action(self, action: Action):
+        """Sets the action taken in the next step.
+
+        Args:
+            action (Action): The action.
+        """
+        self._next_action = Action(action)
+
+    def get_action(self, map_state: MapState) -> Action:
+        """Returns the action set with set_action() and resets it, so that a car
+        without a new action drives forward.
+
+        Args:
+            map_state (MapState): The current state of the map.
+
+        Returns:
+            Action: The action to be taken by the agent.
+        """
+        action = self._next_action
+        self._next_action = Action.FORWARD
+        return action
+
+
+class RemoteAgent(Car):
+    """The RemoteAgent class is a subclass of Car that is driven by an agent running
+    in another process, connected to the AgentServer of the map with
+    run_agent_client(). Its actions are requested by the server.
+    """
+
+    __slots__ = ()
+
+    def get_action(self, map_state: MapState) -> Action:
+        """Remote agents are not asked for actions directly.
+
+        Args:
+            map_state (MapState): The current state of the map.
+
+        Raises:
+            RuntimeError: Always, the actions come from the agent server.
+        """
+        raise RuntimeError("Actions of remote agents are requested by the agent server")
@@ -0,0 +1,376 @@
+import zlib
+from dataclasses import dataclass, field, replace
+from functools import partial
+from typing import Callable, Mapping
+
+import numpy as np
+
+from psi_environment.data.action import Action
+from psi_environment.data.map_state import Direction, MapState
+
+# creates a map state like MapState(random_seed, map_array=..., ...)
+EngineFactory = Callable[..., MapState]
+
+REFERENCE_ENGINE: EngineFactory = partial(MapState, vectorized_moves=False)
+
+
+@dataclass(frozen=True)
+class Scenario:
+    """Everything needed to replay the same ticks on different engines.
+
+    Attributes:
+        random_seed (int): Seed of the map state and of the global random generator
+            when the engines are created.
+        cars (Mapping[int, tuple[tuple[int, int], int]]): Initial road key and road
+            position of every car.
+        actions (tuple[tuple[tuple[int, Action], ...], ...]): Actions passed to
+            move_cars in every tick.
+        traffic_lights (Mapping[int, Direction]): Initial blocked direction of every
+            traffic light, by node.
+        light_interval (int): The traffic lights switch after every light_interval
+            ticks.
+        n_points (int): Number of points of every car.
+        map_array (np.ndarray | None): The map, None for the sample map.
+    """
+
+    random_seed: int
+    cars: Mapping[int, tuple[tuple[int, int], int]]
+    actions: tuple[tuple[tuple[int, Action], ...], ...]
+    traffic_lights: Mapping[int, Direction] = field(default_factory=dict)
+    light_interval: int = 10
+    n_points: int = 0
+    map_array: np.ndarray | None = None
+
+    def without_car(self, car_id: int) -> "Scenario":
+        """Returns the scenario without a car and its actions.
+
+        Args:
+            car_id (int): The id of the car.
+
+        Returns:
+            Scenario: The smaller scenario.
+        """
+        return replace(
+            self,
+            cars={key: pos for key, pos in self.cars.items() if key != car_id},
+            actions=tuple(
+                tuple(action for action in actions if action[0] != car_id)
+                for actions in self.actions
+            ),
+        )
+
+
+@dataclass(frozen=True)
+class Divergence:
+    """The first tick in which a candidate engine differs from the reference engine.
+
+    Attributes:
+        tick (int): The tick, counted from 1.
+        cars (Mapping[int, tuple]): Road key and road position of every car that
+            differs, as (reference, candidate); None if a car is missing.
+        intersections (Mapping[int, Mapping[int, tuple]]): For every node a differing
+            car was waiting at before the tick, the cars waiting at it with their
+            road keys and actions in that tick.
+        traffic_lights (Mapping[int, tuple[Direction, Direction]]): Blocked direction
+            of the traffic lights of those nodes, as (reference, candidate).
+    """
+
+    tick: int
+    cars: Mapping[int, tuple]
+    intersections: Mapping[int, Mapping[int, tuple]]
+    traffic_lights: Mapping[int, tuple[Direction, Direction]]
+
+    def __str__(self) -> str:
+        lines = [f"engines diverge in tick {self.tick}"]
+        for car_id, (reference, candidate) in sorted(self.cars.items()):
+            lines.append(f"  car {car_id}: {reference} != {candidate}")
+        for node, cars in sorted(self.intersections.items()):
+            lines.append(f"  node {node}:")
+            if node in self.traffic_lights:
+                reference, candidate = self.traffic_lights[node]
+                lines.append(f"    blocked: {reference.name} / {candidate.name}")
+            for car_id, (road_key, action) in sorted(cars.items()):
+                name = action.name if action is not None else "no action"
+                lines.append(f"    car {car_id} from {road_key}: {name}")
+        return "\n".join(lines)
+
+
+def create_engine(factory: EngineFactory, scenario: Scenario) -> MapState:
+    """Creates the initial map state of a scenario. The global random generator is
+    seeded with the seed of the scenario, as map states draw from it.
+
+    Args:
+        factory (EngineFactory): Creates the map state.
+        scenario (Scenario): The scenario.
+
+    Returns:
+        MapState: The map state with the cars, points and traffic lights placed.
+    """
+    np.random.seed(scenario.random_seed)
+    map_state = factory(
+        scenario.random_seed,
+        map_array=scenario.map_array,
+        traffic_light_nodes=list(scenario.traffic_lights),
+    )
+    for car_id, (road_key, road_pos) in scenario.cars.items():
+        map_state._add_car(car_id, road_key, road_pos)
+    if scenario.n_points:
+        map_state.add_points(scenario.n_points, list(scenario.cars))
+    for node, direction in scenario.traffic_lights.items():
+        map_state.get_traffic_light(node)._blocked_direction = direction
+    map_state._blocked_roads = None
+    map_state._state_hash = map_state._compute_state_hash()
+    return map_state
+
+
+def step_engine(map_state: MapState, scenario: Scenario, tick: int):
+    """Moves the cars of a map state in a tick of a scenario and switches the
+    traffic lights like Map.
+
+    Args:
+        map_state (MapState): The map state.
+        scenario (Scenario): The scenario.
+        tick (int): The tick, counted from 1.
+    """
+    map_state.move_cars(list(scenario.actions[tick - 1]))
+    if tick % scenario.light_interval == 0:
+        map_state._switch_traffic_lights()
+
+
+def get_digest(map_state: MapState) -> tuple[int, int]:
+    """Returns a cheap digest of the dynamic state: the Zobrist hash, which covers
+    the cars, traffic lights and points, and a checksum of the lane buffer, which
+    catches roads that disagree with the car positions.
+
+    Args:
+        map_state (MapState): The map state.
+
+    Returns:
+        tuple[int, int]: The digest.
+    """
+    return map_state.state_hash(), zlib.crc32(map_state._lanes)
+
+
+def compare_engines(
+    scenario: Scenario,
+    candidate: EngineFactory = MapState,
+    reference: EngineFactory = REFERENCE_ENGINE,
+) -> Divergence | None:
+    """Runs a scenario on a reference and a candidate engine, comparing their
+    digests after every tick.
+
+    Args:
+        scenario (Scenario): The scenario.
+        candidate (EngineFactory, optional): The engine under test. Defaults to
+            MapState.
+        reference (EngineFactory, optional): The engine with the expected results.
+            Defaults to MapState moving cars one by one.
+
+    Returns:
+        Divergence | None: The first divergence, or None if the engines agree.
+    """
+    reference_state = create_engine(reference, scenario)
+    candidate_state = create_engine(candidate, scenario)
+    for tick in range(1, len(scenario.actions) + 1):
+        step_engine(reference_state, scenario, tick)
+        step_engine(candidate_state, scenario, tick)
+        if get_digest(reference_state) != get_digest(candidate_state):
+            return _diff(reference_state, candidate_state, reference, scenario, tick)
+    return None
+
+
+def _diff(
+    reference: MapState,
+    candidate: MapState,
+    reference_factory: EngineFactory,
+    scenario: Scenario,
+    tick: int,
+) -> Divergence:
+    # the cars before the tick are replayed, so that ticks without divergence do not
+    # copy them
+    previous = create_engine(reference_factory, scenario)
+    for previous_tick in range(1, tick):
+        step_engine(previous, scenario, previous_tick)
+    cars_before = previous.get_cars()
+
+    reference_cars = reference.get_cars()
+    candidate_cars = candidate.get_cars()
+    car_ids = {
+        car_id
+        for car_id in reference_cars.keys() | candidate_cars.keys()
+        if reference_cars.get(car_id) != candidate_cars.get(car_id)
+    }
+    # cars the roads of an engine disagree on, even if their positions agree
+    cells = np.flatnonzero(reference._lanes != candidate._lanes)
+    for lanes in (reference._lanes, candidate._lanes):
+        car_ids.update(int(car_id) for car_id in lanes[cells] if car_id)
+
+    nodes = {
+        cars_before[car_id][0][1]
+        for car_id in car_ids
+        if car_id in cars_before
+        and reference.get_road(cars_before[car_id][0]).is_position_road_end(
+            cars_before[car_id][1]
+        )
+    }
+    actions = dict(scenario.actions[tick - 1])
+    intersections = {
+        node: {
+            car_id: (road_key, actions.get(car_id))
+            for car_id, (road_key, road_pos) in cars_before.items()
+            if road_key[1] == node
+            and reference.get_road(road_key).is_position_road_end(road_pos)
+        }
+        for node in nodes
+    }
+    traffic_lights = {
+        node: (
+            reference.get_traffic_light(node)._blocked_direction,
+            candidate.get_traffic_light(node)._blocked_direction,
+        )
+        for node in nodes
+        if reference.get_traffic_light(node) is not None
+    }
+    return Divergence(
+        tick=tick,
+        cars={
+            car_id: (reference_cars.get(car_id), candidate_cars.get(car_id))
+            for car_id in car_ids
+        },
+        intersections=intersections,
+        traffic_lights=traffic_lights,
+    )
+
+
+def shrink(
+    scenario: Scenario,
+    candidate: EngineFactory = MapState,
+    reference: EngineFactory = REFERENCE_ENGINE,
+) -> Scenario:
+    """Removes cars from a scenario whose engines diverge, as long as they still
+    diverge, so that the remaining cars show the cause.
+
+    Args:
+        scenario (Scenario): The diverging scenario.
+        candidate (EngineFactory, optional): The engine under test. Defaults to
+            MapState.
+        reference (EngineFactory, optional): The engine with the expected results.
+            Defaults to MapState moving cars one by one.
+
+    Returns:
+        Scenario: The smallest diverging scenario found.
+    """
+    for car_id in list(scenario.cars):
+        smaller = scenario.without_car(car_id)
+        if compare_engines(smaller, candidate, reference) is not None:
+            scenario = smaller
+    return scenario
+
+
+def create_intersection_scenario(
+    rng: np.random.Generator,
+    map_state: MapState,
+    n_nodes: int = 4,
+    n_ticks: int = 8,
+    n_background_cars: int = 10,
+) -> Scenario:
+    """Creates a random scenario of cars queued at a few intersections, every car
+    taking a random action in every tick.
+
+    Args:
+        rng (np.random.Generator): The random generator.
+        map_state (MapState): A map state of the map, to look up its roads and nodes.
+        n_nodes (int, optional): Number of intersections. Defaults to 4.
+        n_ticks (int, optional): Number of ticks. Defaults to 8.
+        n_background_cars (int, optional): Number of cars placed on random cells.
+            Defaults to 10.
+
+    Returns:
+        Scenario: The scenario.
+    """
+    roads = map_state.get_roads()
+    crossings = sorted(
+        {
+            road_key[1]
+            for road_key in roads
+            if map_state.get_number_of_node_connections(road_key[1]) > 2
+        }
+    )
+    nodes = rng.choice(crossings, size=min(n_nodes, len(crossings)), replace=False)
+
+    taken = set()
+    for road_key, road in roads.items():
+        if road_key[1] not in nodes:
+            continue
+        # a queue of up to three cars behind the road end
+        for pos in range(road.length - 1, max(road.length - 4, -1), -1):
+            if rng.random() < 0.3:
+                break
+            taken.add((road_key, pos))
+    cells = [(key, pos) for key, road in roads.items() for pos in range(road.length)]
+    for idx in rng.choice(len(cells), size=n_background_cars, replace=False):
+        taken.add(cells[idx])
+    cars = {
+        car_id: cell
+        for car_id, cell in enumerate(sorted(taken, key=str), start=1)
+    }
+
+    car_ids = np.array(list(cars))
+    actions = []
+    for _ in range(n_ticks):
+        order = rng.permutation(car_ids)
+        # a car listed twice is a corner case of the engines
+        if rng.random() < 0.1:
+            order = np.append(order, rng.choice(car_ids))
+        moves = rng.choice(4, size=len(order), p=[0.2, 0.5, 0.2, 0.1]) + 1
+        actions.append(
+            tuple(
+                (car_id, Action(move))
+                for car_id, move in zip(order.tolist(), moves.tolist())
+            )
+        )
+
+    light_nodes = [node for node in nodes if rng.random() < 0.5]
+    return Scenario(
+        random_seed=int(rng.integers(2**31)),
+        cars=cars,
+        actions=tuple(actions),
+        traffic_lights={
+            int(node): Direction(int(rng.integers(4))) for node in light_nodes
+        },
+        light_interval=int(rng.integers(2, 5)),
+        n_points=int(rng.integers(0, 4)),
+        map_array=map_state.get_map_array(),
+    )
+
+
+def fuzz_engines(
+    n_scenarios: int,
+    seed: int = 0,
+    candidate: EngineFactory = MapState,
+    reference: EngineFactory = REFERENCE_ENGINE,
+    **scenario_kwargs,
+) -> tuple[Scenario, Divergence] | None:
+    """Compares the engines on random intersection scenarios.
+
+    Args:
+        n_scenarios (int): Number of scenarios.
+        seed (int, optional): Seed of the scenarios. Defaults to 0.
+        candidate (EngineFactory, optional): The engine under test. Defaults to
+            MapState.
+        reference (EngineFactory, optional): The engine with the expected results.
+            Defaults to MapState moving cars one by one.
+        **scenario_kwargs: Passed to create_intersection_scenario().
+
+    Returns:
+        tuple[Scenario, Divergence] | None: The first diverging scenario, shrunk,
+            and its divergence, or None if the engines always agree.
+    """
+    rng = np.random.default_rng(seed)
+    map_state = MapState(seed)
+    for _ in range(n_scenarios):
+        scenario = create_intersection_scenario(rng, map_state, **scenario_kwargs)
+        if compare_engines(scenario, candidate, reference) is not None:
+            scenario = shrink(scenario, candidate, reference)
+            return scenario, compare_engines(scenario, candidate, reference)
+    return None
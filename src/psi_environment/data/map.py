@@ -1,7 +1,20 @@
+import asyncio
+import inspect
+from concurrent.futures import ThreadPoolExecutor
 from typing import Type
 
-from psi_environment.data.car import Car, DummyAgent
+import numpy as np
+
+from psi_environment.data.action import Action
+from psi_environment.data.agent_server import AgentServer
+from psi_environment.data.callback_policy import CallbackPolicy
+from psi_environment.data.car import Car, DummyAgent, RemoteAgent
 from psi_environment.data.map_state import MapState
+from psi_environment.data.map_state_view import MapStateView, freeze_roads
+from psi_environment.data.recording import Recorder
+from psi_environment.data.route import RouteTable
+from psi_environment.data.scoreboard import Scoreboard
+from psi_environment.data.snapshot import MapSnapshot
 from psi_environment.data.stop_mode import StopMode
 
 
@@ -20,6 +33,14 @@ class Map:
         traffic_lights_percentage: float = 0.4,
         traffic_lights_length: int = 10,
         stop_mode: StopMode = StopMode.ALL_FINISHED,
+        map_array: np.ndarray | None = None,
+        action_deadline: float | None = None,
+        agent_executor: ThreadPoolExecutor | None = None,
+        agent_server: AgentServer | None = None,
+        skip_waiting_cars: bool = True,
+        n_finished: int = 1,
+        max_ticks: int | None = None,
+        wall_budget: float | None = None,
     ):
         """Initializes the Map instance.
 
@@ -34,14 +55,71 @@ class Map:
                 traffic lights. Defaults to 0.4.
             traffic_lights_length (int, optional): The interval length for switching
                 traffic lights. Defaults to 10.
+            stop_mode (StopMode, optional): The condition for ending the game.
+                Defaults to StopMode.ALL_FINISHED.
+            map_array (np.ndarray | None, optional): Array representation of the map.
+                Defaults to None, which loads the sample map.
+            action_deadline (float | None, optional): Time in seconds that agents with
+                an async get_action have in every step. Agents that miss it repeat
+                their last action, or drive forward if they have none. Defaults to
+                None, which waits for all agents.
+            agent_executor (ThreadPoolExecutor | None, optional): Thread pool that
+                evaluates the synchronous agents in parallel. Such agents receive a
+                read-only MapStateView instead of the map state. Process pools are
+                not supported, as agents would run on pickled copies and lose their
+                state; use an agent server for agents in other processes. Defaults
+                to None, which evaluates agents one by one.
+            agent_server (AgentServer | None, optional): Server of the agents of type
+                RemoteAgent, which run in separate processes. The map waits until all
+                of them have connected. Their actions are subject to the action
+                deadline as well. After the server is closed, they drive forward.
+                Defaults to None.
+            skip_waiting_cars (bool, optional): Whether cars of types with
+                forward_while_blocked set are not asked for actions while they are
+                blocked, and cars that wait at red lights are left out of moving.
+                Either way, the cars move the same. Defaults to True.
+            n_finished (int, optional): The number of agents that must collect all
+                their points with StopMode.FIRST_K_FINISHED, at most all agents.
+                Defaults to 1.
+            max_ticks (int | None, optional): The number of ticks after which the
+                game is over, with StopMode.MAX_TICKS or in addition to any other
+                stop mode. Defaults to None.
+            wall_budget (float | None, optional): The wall-clock time in seconds
+                after which the game is over, with StopMode.WALL_BUDGET or in
+                addition to any other stop mode. Defaults to None.
+
+        Cars are asked for actions according to their callback_policy, see
+        CallbackPolicy, and take their default_action in the other steps. Agents
+        that submitted a route with Car.set_route are not asked while they follow it.
+
+        Raises:
+            ValueError: If there are remote agents but no agent server, if the
+                agent executor is not a thread pool, or if the limit of the stop
+                mode is not set.
         """
+        if agent_executor is not None and not isinstance(
+            agent_executor, ThreadPoolExecutor
+        ):
+            raise ValueError(
+                "Agent executor must be a ThreadPoolExecutor, use an AgentServer "
+                "to run agents in other processes"
+            )
+        if stop_mode == StopMode.MAX_TICKS and max_ticks is None:
+            raise ValueError("StopMode.MAX_TICKS requires max_ticks")
+        if stop_mode == StopMode.WALL_BUDGET and wall_budget is None:
+            raise ValueError("StopMode.WALL_BUDGET requires wall_budget")
+        if stop_mode == StopMode.FIRST_K_FINISHED and n_finished < 1:
+            raise ValueError("StopMode.FIRST_K_FINISHED requires n_finished >= 1")
         self.n_points = n_points
-        self._map_state = MapState(random_seed, traffic_lights_percentage)
+        self._map_state = MapState(random_seed, traffic_lights_percentage, map_array)
         self._cars: dict[int, Car] = {}
         self._agents: dict[int, Car] = {}
         self._random_seed = random_seed
         self._traffic_lights_length = traffic_lights_length
         self._stop_mode = stop_mode
+        self._n_finished = n_finished
+        self._max_ticks = max_ticks
+        self._wall_budget = wall_budget
 
         n_agents = len(agent_types) if agent_types is not None else 0
 
@@ -60,7 +138,43 @@ class Map:
             self._cars[car_id] = car
 
         self._map_state.add_points(n_points, self._agents.keys())
+        self._scoreboard = Scoreboard(self._map_state.get_points())
+        remote_car_ids = [
+            car_id
+            for car_id, car in self._agents.items()
+            if isinstance(car, RemoteAgent)
+        ]
+        if remote_car_ids and agent_server is None:
+            raise ValueError("Remote agents require an agent server")
+        self._agent_server = agent_server if remote_car_ids else None
+        if self._agent_server is not None:
+            self._agent_server.start(self._map_state, remote_car_ids)
         self._step = 0
+        self._last_action_results: list[tuple[int, tuple[int, int], int]] = []
+        self._recorder: Recorder | None = None
+        self._action_deadline = action_deadline
+        self._agent_executor = agent_executor
+        self._map_state_view = MapStateView(self._map_state)
+        self._event_loop: asyncio.AbstractEventLoop | None = None
+        self._last_late_actions: dict[int, Action] = {}
+        self._deadline_misses: list[tuple[int, int]] = []
+        self._skip_waiting_cars = skip_waiting_cars
+        self._forward_while_blocked_car_ids = [
+            car_id for car_id, car in self._cars.items() if car.forward_while_blocked
+        ]
+        self._road_end_car_ids = [
+            car_id
+            for car_id, car in self._cars.items()
+            if car.callback_policy == CallbackPolicy.ROAD_END
+        ]
+        self._routes = RouteTable(list(self._agents))
+        self._interval_car_ids: dict[int, list[int]] = {}
+        for car_id, car in self._cars.items():
+            if car.callback_policy == CallbackPolicy.EVERY_N_TICKS:
+                interval_car_ids = self._interval_car_ids.setdefault(
+                    car.callback_interval, []
+                )
+                interval_car_ids.append(car_id)
 
     def step(self):
         """Advances the simulation by one step.
@@ -68,14 +182,17 @@ class Map:
         updates the cars position based on the map state response, and switches traffic
         lights at specified intervals.
         """
-        actions = [
-            (
-                car_id,
-                car.get_action(self._map_state),
-            )
-            for car_id, car in self._cars.items()
-        ]
+        default_actions = self._get_default_actions()
+        actions = self._get_actions(default_actions)
+        actions = self._start_routes(actions, default_actions)
+        if self._skip_waiting_cars:
+            actions = self._remove_waiting_cars(actions)
         action_results = self._map_state.move_cars(actions)
+        self._last_action_results = action_results
+        self._routes.update(
+            {car_id for car_id, _, _ in action_results},
+            {car_id for car_id, _ in self._map_state.get_collected_points()},
+        )
 
         for car_id, car_road_key, car_road_pos in action_results:
             car = self._cars[car_id]
@@ -83,28 +200,338 @@ class Map:
             car._road_pos = car_road_pos
 
         self._step += 1
-        if self._step % self._traffic_lights_length == 0:
+        self._scoreboard.record_step(
+            self._step, self._map_state.get_collected_points()
+        )
+        lights_switched = self._step % self._traffic_lights_length == 0
+        if lights_switched:
             self._map_state._switch_traffic_lights()
 
-    def is_game_over(self) -> bool:
-        """Checks if the game is over depending on stop mode.
+        if self._recorder is not None:
+            self._recorder.record_step(
+                self._map_state, self._step, action_results, lights_switched
+            )
+
+    def _get_default_actions(self) -> dict[int, Action]:
+        """Finds the cars that are not asked for an action in this step: cars whose
+        callback policy does not ask them now take their default action, cars with
+        routes follow them, and blocked cars with forward_while_blocked set drive
+        forward.
+
+        Returns:
+            dict[int, Action]: Ids of the cars that are not asked, with their actions.
+        """
+        default_actions = {}
+        for interval, car_ids in self._interval_car_ids.items():
+            if self._step % interval != 0:
+                for car_id in car_ids:
+                    default_actions[car_id] = self._cars[car_id].default_action
+        if self._road_end_car_ids:
+            at_road_end = set(
+                self._map_state.get_cars_at_road_end(self._road_end_car_ids)
+            )
+            for car_id in self._road_end_car_ids:
+                if car_id not in at_road_end:
+                    default_actions[car_id] = self._cars[car_id].default_action
+        route_car_ids = self._routes.get_car_ids()
+        if route_car_ids:
+            default_actions.update(
+                self._routes.get_actions(
+                    route_car_ids, self._map_state.get_cars_at_road_end(route_car_ids)
+                )
+            )
+        if self._skip_waiting_cars:
+            for car_id in self._map_state.get_blocked_cars(
+                self._forward_while_blocked_car_ids
+            ):
+                default_actions[car_id] = Action.FORWARD
+        return default_actions
+
+    def _start_routes(
+        self, actions: list[tuple[int, Action]], default_actions: dict[int, Action]
+    ) -> list[tuple[int, Action]]:
+        """Stores the routes that agents submitted while they were asked for actions,
+        and replaces the actions of those agents with the actions of their routes.
+
+        Args:
+            actions (list[tuple[int, Action]]): Car ids with their actions.
+            default_actions (dict[int, Action]): The cars that were not asked.
+
+        Returns:
+            list[tuple[int, Action]]: Car ids with their actions, in order.
+        """
+        car_ids = []
+        for car_id, agent in self._agents.items():
+            # subclasses that do not call Car.__init__ have no route request
+            route_request = getattr(agent, "_route_request", None)
+            if route_request is None or car_id in default_actions:
+                continue
+            route, max_blocked_ticks = route_request
+            agent._route_request = None
+            self._routes.set_route(car_id, route, max_blocked_ticks)
+            if route:
+                car_ids.append(car_id)
+        if not car_ids:
+            return actions
+
+        route_actions = self._routes.get_actions(
+            car_ids, self._map_state.get_cars_at_road_end(car_ids)
+        )
+        return [
+            (car_id, route_actions.get(car_id, action)) for car_id, action in actions
+        ]
+
+    def _remove_waiting_cars(
+        self, actions: list[tuple[int, Action]]
+    ) -> list[tuple[int, Action]]:
+        """Removes the cars that cannot move in this step from the actions: the cars
+        waiting at red lights and the cars queued right behind them that drive
+        forward.
+
+        Args:
+            actions (list[tuple[int, Action]]): Car ids with their actions.
+
+        Returns:
+            list[tuple[int, Action]]: The actions of the other cars, in order.
+        """
+        queues = self._map_state.get_red_light_queues()
+        if not queues:
+            return actions
+        car_actions = dict(actions)
+        waiting_cars = set()
+        for queue in queues:
+            waiting_cars.add(queue[0])
+            for car_id in queue[1:]:
+                if car_actions.get(car_id) != Action.FORWARD:
+                    break
+                waiting_cars.add(car_id)
+        return [action for action in actions if action[0] not in waiting_cars]
+
+    def _get_actions(
+        self, default_actions: dict[int, Action] | None = None
+    ) -> list[tuple[int, Action]]:
+        """Asks every car for its action. Agents with a synchronous get_action are
+        called one by one or on the agent executor, agents with an async get_action
+        are awaited concurrently.
+
+        Args:
+            default_actions (dict[int, Action] | None, optional): Cars that are not
+                asked for an action, with the actions they take. Defaults to None,
+                which asks every car.
+
+        Returns:
+            list[tuple[int, Action]]: Car ids with their actions, in car order.
+        """
+        if default_actions is None:
+            default_actions = {}
+        actions = {}
+        async_cars = {}
+        sync_cars = {}
+        for car_id, car in self._cars.items():
+            if car_id in default_actions:
+                actions[car_id] = default_actions[car_id]
+            elif isinstance(car, RemoteAgent):
+                continue
+            elif inspect.iscoroutinefunction(car.get_action):
+                async_cars[car_id] = car
+            elif self._agent_executor is None:
+                actions[car_id] = car.get_action(self._map_state)
+            else:
+                sync_cars[car_id] = car
+
+        if sync_cars:
+            freeze_roads(self._map_state, True)
+            try:
+                futures = {
+                    car_id: self._agent_executor.submit(
+                        car.get_action, self._map_state_view
+                    )
+                    for car_id, car in sync_cars.items()
+                }
+                for car_id, future in futures.items():
+                    actions[car_id] = future.result()
+            finally:
+                freeze_roads(self._map_state, False)
+
+        if async_cars:
+            # one loop is kept for the whole game, creating it every step is slow
+            if self._event_loop is None:
+                self._event_loop = asyncio.new_event_loop()
+            actions.update(
+                self._event_loop.run_until_complete(self._get_async_actions(async_cars))
+            )
+
+        if self._agent_server is not None:
+            # after the server is closed, remote agents drive forward
+            closed = self._agent_server.is_closed()
+            remote_actions = {}
+            if not closed:
+                remote_actions = self._agent_server.get_actions(
+                    self._step + 1, self._action_deadline
+                )
+            for car_id, car in self._agents.items():
+                if not isinstance(car, RemoteAgent):
+                    continue
+                if closed:
+                    actions[car_id] = Action.FORWARD
+                else:
+                    actions[car_id] = self._get_late_action(
+                        car_id, remote_actions.get(car_id)
+                    )
+
+        return [(car_id, actions[car_id]) for car_id in self._cars]
+
+    async def _get_async_actions(self, cars: dict[int, Car]) -> dict[int, Action]:
+        """Awaits the actions of async agents until the action deadline.
+
+        Args:
+            cars (dict[int, Car]): The agents with an async get_action.
+
+        Returns:
+            dict[int, Action]: Actions of the agents; agents that missed the deadline
+                get their fallback action.
+        """
+        tasks = {
+            car_id: asyncio.ensure_future(car.get_action(self._map_state))
+            for car_id, car in cars.items()
+        }
+        _, pending = await asyncio.wait(tasks.values(), timeout=self._action_deadline)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+        return {
+            car_id: self._get_late_action(
+                car_id, None if task in pending else task.result()
+            )
+            for car_id, task in tasks.items()
+        }
+
+    def _get_late_action(self, car_id: int, action: Action | None) -> Action:
+        """Returns the action of an agent subject to the action deadline, or its
+        fallback action if it missed the deadline.
+
+        Args:
+            car_id (int): The id of the agent.
+            action (Action | None): The action of the agent, None if it missed the
+                deadline.
+
+        Returns:
+            Action: The action to take.
+        """
+        if action is None:
+            action = self._last_late_actions.get(car_id, Action.FORWARD)
+            self._deadline_misses.append((self._step + 1, car_id))
+        self._last_late_actions[car_id] = action
+        return action
+
+    def get_deadline_misses(self) -> list[tuple[int, int]]:
+        """Returns the agents that missed the action deadline.
+
+        Returns:
+            list[tuple[int, int]]: Steps and ids of the agents that missed the
+                deadline in them.
+        """
+        return self._deadline_misses
+
+    def is_game_over(self, stop_mode: StopMode | None = None) -> bool:
+        """Checks if the game is over depending on stop mode. The check takes
+        constant time, as the scoreboard is updated in every step.
+
+        Args:
+            stop_mode (StopMode | None, optional): The stop mode to check. Defaults
+                to None, which checks the stop mode of the map.
 
         Returns:
             bool: True if criteria defined by stop mode are fulfilled, False otherwise.
         """
-        points = self._map_state.get_points()
+        if stop_mode is None:
+            stop_mode = self._stop_mode
+        scoreboard = self._scoreboard
 
-        if self._stop_mode == StopMode.ALL_FINISHED:
-            for car, point_list in points.items():
-                if len(point_list) != 0:
-                    return False
+        if self._max_ticks is not None and scoreboard.get_tick() >= self._max_ticks:
+            return True
+        if self._wall_budget is not None and (
+            scoreboard.get_elapsed() >= self._wall_budget
+        ):
             return True
-        elif self._stop_mode == StopMode.ONE_FINISHED:
-            for car, point_list in points.items():
-                if len(point_list) == 0:
-                    return True
-            return False
+        if stop_mode == StopMode.ALL_FINISHED:
+            return scoreboard.get_n_finished() == scoreboard.get_n_agents()
+        elif stop_mode == StopMode.ONE_FINISHED:
+            return scoreboard.get_n_finished() >= 1
+        elif stop_mode == StopMode.FIRST_K_FINISHED:
+            return scoreboard.get_n_finished() >= min(
+                self._n_finished, scoreboard.get_n_agents()
+            )
+        return False
+
+    def get_scoreboard(self) -> Scoreboard:
+        """Returns the scoreboard with the collection and finish ticks of the agents.
 
+        Returns:
+            Scoreboard: The scoreboard.
+        """
+        return self._scoreboard
+
+    def start_recording(self, path: str, keyframe_interval: int = 100):
+        """Starts recording the following steps to a file, which can be replayed
+        later without the agents, e.g. with ReplayPlayer.
+
+        Args:
+            path (str): Path of the recording file. It is overwritten if it exists.
+            keyframe_interval (int, optional): Number of steps between keyframes.
+                Defaults to 100.
+
+        Raises:
+            RuntimeError: If the map is already being recorded.
+        """
+        if self._recorder is not None:
+            raise RuntimeError("Map is already being recorded")
+        self._recorder = Recorder(
+            self._map_state, open(path, "wb"), keyframe_interval, self._step
+        )
+
+    def stop_recording(self):
+        """Finishes the recording started with start_recording, if any."""
+        if self._recorder is not None:
+            self._recorder.close()
+            self._recorder = None
+
+    def close(self):
+        """Finishes the recording, if any, and closes the event loop of the async
+        agents. The agent server and the agent executor are owned by the caller and
+        are not closed. Calling it again has no effect.
+        """
+        self.stop_recording()
+        if self._event_loop is not None:
+            self._event_loop.close()
+            self._event_loop = None
+
+    def get_last_action_results(self) -> list[tuple[int, tuple[int, int], int]]:
+        """Returns the cars that moved in the last step.
+
+        Returns:
+            list[tuple[int, tuple[int, int], int]]: Car ids with their new road keys
+                and road positions, as returned by MapState.move_cars.
+        """
+        return self._last_action_results
+
+    def get_snapshot(self) -> MapSnapshot:
+        """Returns an immutable snapshot of the map state after the last step.
+
+        Returns:
+            MapSnapshot: The snapshot.
+        """
+        moved_cars = frozenset(car_id for car_id, _, _ in self._last_action_results)
+        return MapSnapshot.from_map_state(self._map_state, self._step, moved_cars)
+
+    def get_timestep(self) -> int:
+        """Returns the number of steps taken so far.
+
+        Returns:
+            int: The number of steps.
+        """
+        return self._step
 
     def get_map_state(self) -> MapState:
         """Returns the reference to the map state.
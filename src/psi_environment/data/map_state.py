@@ -5,7 +5,9 @@ from copy import deepcopy
 
 import numpy as np
 
+from psi_environment.data import zobrist
 from psi_environment.data.action import Action
+from psi_environment.data.platoon import get_platoon_starts
 from psi_environment.data.point import Point
 
 NODE_CHARACTER = "x"
@@ -19,6 +21,21 @@ class Road:
     """The Road class represents a road in the simulation, managing its properties,
     traffic and connections to other roads."""
 
+    # roads are created for every edge of the map, slots keep them small
+    __slots__ = (
+        "length",
+        "_cars_per_length",
+        "_road",
+        "_front_node",
+        "_front_indicies",
+        "_back_node",
+        "_back_indicies",
+        "_adjacent_nodes",
+        "_left_node",
+        "_right_node",
+        "_forward_node",
+    )
+
     def __init__(
         self,
         length_on_map: int,
@@ -57,7 +74,7 @@ class Road:
         self._front_indicies = front_indicies
         self._back_node = back_node
         self._back_indicies = back_indicies
-        self._adjacent_nodes = adjacent_nodes
+        self._adjacent_nodes = tuple(sorted(adjacent_nodes))
         self._left_node = left_node
         self._right_node = right_node
         self._forward_node = forward_node
@@ -315,6 +332,15 @@ class TrafficLight:
     """The TrafficLight class represents a traffic light at a specific node, managing
     the blocked directions and switching states"""
 
+    __slots__ = (
+        "_node",
+        "_up_node",
+        "_down_node",
+        "_left_node",
+        "_right_node",
+        "_blocked_direction",
+    )
+
     def __init__(
         self,
         node: int,
@@ -339,7 +365,7 @@ class TrafficLight:
             blocked_direction (Direction, optional): The direction currently blocked by
                 the traffic light. Defaults to Direction.UP.
         """
-        self._node = node
+        self._node = int(node)
         self._up_node = up_node
         self._down_node = down_node
         self._left_node = left_node
@@ -589,6 +615,7 @@ def create_traffic_lights(
     edges: dict[tuple[int, int], Direction],
     adjacency_matrix: np.ndarray,
     percentage_of_nodes: float = 0.4,
+    nodes: list[int] | None = None,
 ) -> dict[int, TrafficLight]:
     """Creates traffic lights for nodes based on the adjacency matrix and a specified
     percentage of nodes.
@@ -600,25 +627,33 @@ def create_traffic_lights(
         adjacency_matrix (np.ndarray): The adjacency matrix of the map.
         percentage_of_nodes (float, optional): The percentage of nodes to have traffic
             lights. Defaults to 0.4.
+        nodes (list[int] | None, optional): The nodes to place traffic lights on.
+            Defaults to None, which picks random nodes according to
+            percentage_of_nodes.
 
     Returns:
         dict[int, TrafficLight]: A dictionary where keys are node IDs and values are
             TrafficLight objects.
     """
-    node_connections = {}
-    for node_id in range(adjacency_matrix.shape[0]):
-        n_of_connections = np.count_nonzero(~np.isnan(adjacency_matrix[node_id]))
-        node_connections[node_id] = n_of_connections
-
-    available_nodes = [
-        node_id for node_id in node_connections.keys() if node_connections[node_id] > 2
-    ]
-
-    traffic_light_nodes = np.random.choice(
-        available_nodes,
-        np.round(len(available_nodes) * percentage_of_nodes).astype(int),
-        replace=False,
-    )
+    if nodes is not None:
+        traffic_light_nodes = nodes
+    else:
+        node_connections = {}
+        for node_id in range(adjacency_matrix.shape[0]):
+            n_of_connections = np.count_nonzero(~np.isnan(adjacency_matrix[node_id]))
+            node_connections[node_id] = n_of_connections
+
+        available_nodes = [
+            node_id
+            for node_id in node_connections.keys()
+            if node_connections[node_id] > 2
+        ]
+
+        traffic_light_nodes = np.random.choice(
+            available_nodes,
+            np.round(len(available_nodes) * percentage_of_nodes).astype(int),
+            replace=False,
+        )
 
     traffic_lights = {}
     for node in traffic_light_nodes:
@@ -659,16 +694,32 @@ class MapState:
     rules of the environment.
     """
 
-    def __init__(self, random_seed: int, traffic_light_percentage: float = 0.4):
+    def __init__(
+        self,
+        random_seed: int,
+        traffic_light_percentage: float = 0.4,
+        map_array: np.ndarray | None = None,
+        traffic_light_nodes: list[int] | None = None,
+        vectorized_moves: bool = True,
+    ):
         """Initializes the MapState instance.
 
         Args:
             random_seed (int): The seed used for random number generation.
             traffic_light_percentage (float, optional): The percentage of nodes with
                 traffic lights. Defaults to 0.4.
+            map_array (np.ndarray | None, optional): Array representation of the map,
+                as returned by get_map(). Defaults to None, which loads the sample map.
+            traffic_light_nodes (list[int] | None, optional): The nodes with traffic
+                lights. Defaults to None, which picks random nodes according to
+                traffic_light_percentage.
+            vectorized_moves (bool, optional): Whether cars that are not at a road end
+                are moved all at once on the lane buffer. False moves them one by one,
+                which gives the same results and serves as the reference
+                implementation. Defaults to True.
         """
         self._random_seed = random_seed
-        self._map_array = get_map()
+        self._map_array = get_map() if map_array is None else map_array
         self._node_indices = get_node_indices(self._map_array)
         self._adjacency_matrix = create_adjacency_matrix(
             self._map_array, self._node_indices
@@ -680,11 +731,67 @@ class MapState:
         self._indices_road_keys = get_indices_road_keys(
             self._node_indices, self._adjacency_matrix
         )
+        # roads are numbered in the order of their keys, their arrays are consecutive
+        # views of one lane buffer so that cars can be moved with array operations
+        self._road_keys = list(self._roads)
+        self._road_indices = {key: idx for idx, key in enumerate(self._road_keys)}
+        self._road_lengths = np.array([road.length for road in self._roads.values()])
+        self._road_offsets = np.cumsum(self._road_lengths) - self._road_lengths
+        self._backward_road_indices = np.array(
+            [
+                self._road_indices[road.get_backward_road_key()]
+                for road in self._roads.values()
+            ]
+        )
+        self._set_lanes(np.zeros(int(self._road_lengths.sum())))
+        self._road_starts = np.zeros(len(self._lanes), dtype=bool)
+        self._road_starts[self._road_offsets] = True
+        self._vectorized_moves = vectorized_moves
         self._traffic_lights = create_traffic_lights(
-            self._edges, self._adjacency_matrix, traffic_light_percentage
+            self._edges,
+            self._adjacency_matrix,
+            traffic_light_percentage,
+            traffic_light_nodes,
         )
         self._cars: dict[int, tuple[tuple[int, int], int]] = {}
         self._points: dict[int, list[Point]] = {}
+        self._collected_points: list[tuple[int, Point]] = []
+        self._observation_grid = None
+        # mask of the roads blocked by traffic lights, built when needed
+        self._blocked_roads: np.ndarray | None = None
+        # bumped on every change of the dynamic state, for caches of derived data
+        self._version = 0
+        # Zobrist hash of the dynamic state, updated with every change of it
+        position_keys = zobrist.get_position_keys(len(self._lanes))
+        self._position_keys = {
+            road_key: position_keys[offset : offset + length]
+            for road_key, offset, length in zip(
+                self._road_keys, self._road_offsets, self._road_lengths
+            )
+        }
+        self._car_keys: dict[int, int] = {}
+        self._ticks_since_switch = 0
+        self._state_hash = self._compute_state_hash()
+
+    def __setstate__(self, state: dict):
+        self.__dict__.update(state)
+        # pickle copies the road arrays separately, they must share the buffer again
+        self._set_lanes(
+            np.concatenate([road.get_road() for road in self._roads.values()])
+        )
+
+    def _set_lanes(self, lanes: np.ndarray):
+        """Rebinds the road arrays to consecutive views of a lane buffer, in the order
+        of the road keys. The buffer is not filled with the current road arrays.
+
+        Args:
+            lanes (np.ndarray): The lane buffer, as long as all roads together.
+        """
+        for road, offset, length in zip(
+            self._roads.values(), self._road_offsets, self._road_lengths
+        ):
+            road._road = lanes[offset : offset + length]
+        self._lanes = lanes
 
     def _add_car(
         self, car_id: int, road_key: tuple[int, int], road_pos: int | None = None
@@ -700,6 +807,10 @@ class MapState:
             road_pos = np.random.randint(road.length)
         road.get_road()[road_pos] = car_id
         self._cars[car_id] = (road_key, road_pos)
+        self._state_hash ^= self._get_car_position_key(car_id, road_key, road_pos)
+        self._version += 1
+        if self._observation_grid is not None:
+            self._observation_grid.add_car(car_id, road_key, road_pos)
 
     def add_cars(self, n: int) -> dict[int, tuple[tuple[int, int], int]]:
         """Adds a specified number of cars to the map.
@@ -762,7 +873,12 @@ class MapState:
             points.append(point)
 
         for agent_idx in agents_idxs:
+            for point in self._points.get(agent_idx, []):
+                self._state_hash ^= zobrist.get_point_key(agent_idx, point.map_position)
             self._points[agent_idx] = deepcopy(points)
+            for point in points:
+                self._state_hash ^= zobrist.get_point_key(agent_idx, point.map_position)
+        self._version += 1
 
         return self._points
 
@@ -781,36 +897,51 @@ class MapState:
         """
         road_actions = {}
         node_actions = {}
-        results = []
+        self._collected_points = []
+        self._version += 1
+        self._state_hash ^= zobrist.get_tick_key(self._ticks_since_switch)
+        self._ticks_since_switch += 1
+        self._state_hash ^= zobrist.get_tick_key(self._ticks_since_switch)
 
         actions.sort(key=lambda x: x[1])  # sort by action
-        for car_id, action in actions:
-            car_road_key = self._cars[car_id][0]
-            car_road_pos = self._cars[car_id][1]
-            current_road = self.get_road(car_road_key)
-
-            if current_road.is_position_road_end(car_road_pos):
+        for car_id, action, *_ in actions:
+            car_road_key, car_road_pos = self._cars[car_id]
+            if self._roads[car_road_key].is_position_road_end(car_road_pos):
                 node_actions[car_id] = action
             else:
                 road_actions[car_id] = action
 
-        move_requests = []
+        # moves through nodes are decided before any car moves
+        node_move_requests = self._get_node_move_requests(node_actions)
 
-        for car_id, action in road_actions.items():
-            car_road_key = self._cars[car_id][0]
-            car_road_pos = self._cars[car_id][1]
-            current_road = self.get_road(car_road_key)
+        if self._vectorized_moves:
+            results = self._move_road_cars(road_actions)
+        else:
+            results = self._move_road_cars_one_by_one(road_actions)
 
-            if action == Action.FORWARD:
-                next_pos = car_road_pos + 1
-                move_requests.append((car_id, current_road, next_pos))
+        for car_id, road, road_pos in node_move_requests:
+            car_id, car_moved, car_road_key, car_road_pos = self._move_car(
+                car_id, road, road_pos
+            )
+            if car_moved:
+                results.append((car_id, car_road_key, car_road_pos))
 
-            elif action == Action.BACK:
-                inv_road_key = current_road.get_backward_road_key()
-                next_road = self.get_road(inv_road_key)
-                inv_pos = current_road.get_inverted_position(car_road_pos)
-                move_requests.append((car_id, next_road, inv_pos))
+        return results
+
+    def _get_node_move_requests(
+        self, node_actions: dict[int, Action]
+    ) -> list[tuple[int, Road, int]]:
+        """Decides which cars at road ends may drive through their node, following the
+        traffic lights and the right of way.
 
+        Args:
+            node_actions (dict[int, Action]): Actions of the cars at road ends.
+
+        Returns:
+            list[tuple[int, Road, int]]: The car ids with the road and position they
+                should move to.
+        """
+        move_requests = []
         for car_id, action in node_actions.items():
             car_road_key = self._cars[car_id][0]
             car_road_pos = self._cars[car_id][1]
@@ -866,13 +997,121 @@ class MapState:
 
             move_requests.append((car_id, next_road, 0))
 
-        for car_id, road, road_pos in move_requests:
+        return move_requests
+
+    def _move_road_cars_one_by_one(
+        self, road_actions: dict[int, Action]
+    ) -> list[tuple[int, tuple[int, int], int]]:
+        """Moves the cars that are not at a road end one by one, in order.
+
+        Args:
+            road_actions (dict[int, Action]): Actions of the cars, sorted by action.
+
+        Returns:
+            list[tuple[int, tuple[int, int], int]]: The cars that moved and their new
+                positions.
+        """
+        results = []
+        for car_id, action in road_actions.items():
+            car_road_key = self._cars[car_id][0]
+            car_road_pos = self._cars[car_id][1]
+            current_road = self.get_road(car_road_key)
+
+            if action == Action.FORWARD:
+                next_road = current_road
+                next_pos = car_road_pos + 1
+            elif action == Action.BACK:
+                next_road = self.get_road(current_road.get_backward_road_key())
+                next_pos = current_road.get_inverted_position(car_road_pos)
+            else:
+                continue
+
             car_id, car_moved, car_road_key, car_road_pos = self._move_car(
-                car_id, road, road_pos
+                car_id, next_road, next_pos
             )
             if car_moved:
                 results.append((car_id, car_road_key, car_road_pos))
+        return results
+
+    def _move_road_cars(
+        self, road_actions: dict[int, Action]
+    ) -> list[tuple[int, tuple[int, int], int]]:
+        """Moves the cars that are not at a road end all at once on the lane buffer,
+        with the same results as _move_road_cars_one_by_one().
 
+        Moving one by one, all FORWARD moves come before the BACK moves, as actions
+        are sorted. A car moving forward into a taken cell only succeeds if the car in
+        that cell moved forward before it, so cars moving forward are resolved per
+        platoon, from its front car backwards. A car turning back only succeeds into
+        an empty cell: the only car that could leave that cell would turn back into
+        the cell of this car.
+
+        Args:
+            road_actions (dict[int, Action]): Actions of the cars, sorted by action.
+
+        Returns:
+            list[tuple[int, tuple[int, int], int]]: The cars that moved and their new
+                positions.
+        """
+        if not road_actions:
+            return []
+        car_ids = list(road_actions)
+        road_idxs, road_pos = self._get_road_indices_and_positions(car_ids)
+        moves = np.array([int(action) for action in road_actions.values()])
+        if np.any(moves[1:] < moves[:-1]):
+            # a car listed twice keeps the place of its first action but takes its
+            # last action, so actions are not in order and the argument above fails
+            return self._move_road_cars_one_by_one(road_actions)
+        ids = np.array(car_ids, dtype=self._lanes.dtype)
+        lanes = self._lanes
+        cells = self._road_offsets[road_idxs] + road_pos
+        next_road_idxs = road_idxs.copy()
+        next_road_pos = road_pos + 1
+        moved = np.zeros(len(car_ids), dtype=bool)
+
+        forward = np.flatnonzero(moves == Action.FORWARD)
+        if len(forward):
+            # platoons of cars moving forward, each from its front car backwards;
+            # cells are unique, so they are sorted by scattering them on the lanes
+            mover = np.full(len(lanes), -1)
+            mover[cells[forward]] = forward
+            sources = np.flatnonzero(mover >= 0)[::-1]
+            forward = mover[sources]
+            starts = get_platoon_starts(sources, self._road_starts)
+            # the front car of a platoon is stuck if the position in front of it is
+            # taken, any other car if the car in front of it comes later in order
+            stuck = np.empty(len(forward), dtype=bool)
+            stuck[1:] = forward[:-1] > forward[1:]
+            stuck[starts] = lanes[sources[starts] + 1] != 0
+            # a car moves if no car up to the front of its platoon is stuck
+            n_stuck = np.cumsum(stuck)
+            n_stuck_before = np.maximum.accumulate(
+                np.where(starts, n_stuck - stuck, 0)
+            )
+            success = n_stuck == n_stuck_before
+            lanes[sources[success]] = 0
+            lanes[sources[success] + 1] = ids[forward[success]]
+            moved[forward[success]] = True
+
+        back = np.flatnonzero(moves == Action.BACK)
+        if len(back):
+            next_road_idxs[back] = self._backward_road_indices[road_idxs[back]]
+            next_road_pos[back] = (
+                self._road_lengths[road_idxs[back]] - 1 - road_pos[back]
+            )
+            sources = cells[back]
+            targets = self._road_offsets[next_road_idxs[back]] + next_road_pos[back]
+            success = lanes[targets] == 0
+            lanes[sources[success]] = 0
+            lanes[targets[success]] = ids[back[success]]
+            moved[back[success]] = True
+
+        results = []
+        for idx in np.flatnonzero(moved).tolist():
+            car_id = car_ids[idx]
+            next_road_key = self._road_keys[next_road_idxs[idx]]
+            self._place_car(car_id, next_road_key, int(next_road_pos[idx]))
+            results.append((car_id, next_road_key, int(next_road_pos[idx])))
         return results
 
     def _move_car(self, car_id: int, next_road: Road, next_road_pos: int):
@@ -894,13 +1133,34 @@ class MapState:
 
         next_road[next_road_pos] = car_id
         next_road_key = next_road.get_key()
-        self._cars[car_id] = (next_road_key, next_road_pos)
         prev_road = self.get_road(prev_road_key)
         prev_road[prev_road_pos] = 0
+        self._place_car(car_id, next_road_key, next_road_pos)
+        return car_id, True, next_road_key, next_road_pos
+
+    def _place_car(
+        self, car_id: int, next_road_key: tuple[int, int], next_road_pos: int
+    ):
+        """Records the new position of a car that was moved on the roads, updating the
+        observation grid and the collected points.
+
+        Args:
+            car_id (int): The ID of the car.
+            next_road_key (tuple[int, int]): The key of the road the car moved to.
+            next_road_pos (int): The position on the road the car moved to.
+        """
+        prev_road_key, prev_road_pos = self._cars[car_id]
+        self._cars[car_id] = (next_road_key, next_road_pos)
+        self._state_hash ^= self._get_car_position_key(
+            car_id, prev_road_key, prev_road_pos
+        ) ^ self._get_car_position_key(car_id, next_road_key, next_road_pos)
+        if self._observation_grid is not None:
+            self._observation_grid.move_car(
+                car_id, prev_road_key, prev_road_pos, next_road_key, next_road_pos
+            )
         self._update_collected_points(
             prev_road_key, next_road_key, next_road_pos, car_id
         )
-        return car_id, True, next_road_key, next_road_pos
 
     def _update_collected_points(
         self,
@@ -928,7 +1188,7 @@ class MapState:
             node_crossed = self._roads[prev_road_key]._front_node
             for agent_point in agent_points:
                 if agent_point.node == node_crossed:
-                    agent_points.remove(agent_point)
+                    self._collect_point(car_id, agent_point)
                     break
 
         car_map_position = self.get_map_position_by_road_position(
@@ -937,13 +1197,170 @@ class MapState:
 
         for agent_point in agent_points:
             if agent_point.map_position == car_map_position:
-                agent_points.remove(agent_point)
+                self._collect_point(car_id, agent_point)
                 break
 
+    def _collect_point(self, car_id: int, point: Point):
+        """Removes a point collected by an agent.
+
+        Args:
+            car_id (int): Id of the agent.
+            point (Point): The collected point.
+        """
+        self._points[car_id].remove(point)
+        self._collected_points.append((car_id, point))
+        self._state_hash ^= zobrist.get_point_key(car_id, point.map_position)
+        if self._observation_grid is not None:
+            self._observation_grid.remove_point(car_id, point)
+
     def _switch_traffic_lights(self):
         """Switches the state of all traffic lights on the map."""
-        for traffic_light in self._traffic_lights.values():
+        for node, traffic_light in self._traffic_lights.items():
+            self._state_hash ^= zobrist.get_light_key(
+                node, traffic_light._blocked_direction
+            )
             traffic_light.switch_lights()
+            self._state_hash ^= zobrist.get_light_key(
+                node, traffic_light._blocked_direction
+            )
+        self._state_hash ^= zobrist.get_tick_key(
+            self._ticks_since_switch
+        ) ^ zobrist.get_tick_key(0)
+        self._ticks_since_switch = 0
+        self._blocked_roads = None
+        self._version += 1
+        if self._observation_grid is not None:
+            self._observation_grid.update_traffic_lights(self)
+
+    def _get_car_position_key(
+        self, car_id: int, road_key: tuple[int, int], road_pos: int
+    ) -> int:
+        """Returns the Zobrist key of a car at a road position.
+
+        Args:
+            car_id (int): The ID of the car.
+            road_key (tuple[int, int]): The key of the road.
+            road_pos (int): The position on the road.
+
+        Returns:
+            int: The key.
+        """
+        car_key = self._car_keys.get(car_id)
+        if car_key is None:
+            car_key = self._car_keys[car_id] = zobrist.get_car_key(car_id)
+        return zobrist.get_car_position_key(
+            self._position_keys[road_key][road_pos], car_key
+        )
+
+    def _compute_state_hash(self) -> int:
+        """Computes the Zobrist hash of the dynamic state from scratch, the value
+        state_hash() keeps up to date.
+
+        Returns:
+            int: The hash.
+        """
+        state_hash = zobrist.get_tick_key(self._ticks_since_switch)
+        for car_id, (road_key, road_pos) in self._cars.items():
+            state_hash ^= self._get_car_position_key(car_id, road_key, road_pos)
+        for node, traffic_light in self._traffic_lights.items():
+            state_hash ^= zobrist.get_light_key(node, traffic_light._blocked_direction)
+        for car_id, agent_points in self._points.items():
+            for point in agent_points:
+                state_hash ^= zobrist.get_point_key(car_id, point.map_position)
+        return state_hash
+
+    def _get_blocked_roads(self) -> np.ndarray:
+        """Returns which roads are blocked by their traffic lights.
+
+        Returns:
+            np.ndarray: Boolean mask over the roads, in the order of the road keys.
+        """
+        if self._blocked_roads is None:
+            self._blocked_roads = np.zeros(len(self._road_keys), dtype=bool)
+            for traffic_light in self._traffic_lights.values():
+                for road_key in traffic_light.get_blocked_road_keys():
+                    self._blocked_roads[self._road_indices[road_key]] = True
+        return self._blocked_roads
+
+    def _get_road_indices_and_positions(
+        self, car_ids: list[int]
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Returns the road indices and road positions of cars.
+
+        Args:
+            car_ids (list[int]): Ids of the cars.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: Indices of the roads of the cars, in the
+                order of the road keys, and positions of the cars on them.
+        """
+        car_positions = [self._cars[car_id] for car_id in car_ids]
+        road_idxs = np.array([self._road_indices[key] for key, _ in car_positions])
+        road_pos = np.array([pos for _, pos in car_positions])
+        return road_idxs, road_pos
+
+    def get_cars_at_road_end(self, car_ids: list[int]) -> list[int]:
+        """Returns the cars, among the given ones, that are at a road end.
+
+        Args:
+            car_ids (list[int]): Ids of the cars to check.
+
+        Returns:
+            list[int]: Ids of the cars at a road end, in the given order.
+        """
+        if not car_ids:
+            return []
+        road_idxs, road_pos = self._get_road_indices_and_positions(car_ids)
+        at_road_end = road_pos == self._road_lengths[road_idxs] - 1
+        return [car_ids[idx] for idx in np.flatnonzero(at_road_end).tolist()]
+
+    def get_blocked_cars(self, car_ids: list[int]) -> list[int]:
+        """Returns the cars, among the given ones, that cannot drive forward at the
+        moment: the next position on their road is taken, or they are at the end of a
+        road blocked by its traffic light. A car blocked by the car in front of it
+        still moves in the next move_cars call if that car moves first.
+
+        Args:
+            car_ids (list[int]): Ids of the cars to check.
+
+        Returns:
+            list[int]: Ids of the blocked cars, in the given order.
+        """
+        if not car_ids:
+            return []
+        road_idxs, road_pos = self._get_road_indices_and_positions(car_ids)
+        at_road_end = road_pos == self._road_lengths[road_idxs] - 1
+        # the cell after a road end belongs to the next road, it is masked below
+        next_cells = np.minimum(
+            self._road_offsets[road_idxs] + road_pos + 1, len(self._lanes) - 1
+        )
+        blocked = np.where(
+            at_road_end,
+            self._get_blocked_roads()[road_idxs],
+            self._lanes[next_cells] != 0,
+        )
+        return [car_ids[idx] for idx in np.flatnonzero(blocked).tolist()]
+
+    def get_red_light_queues(self) -> list[list[int]]:
+        """Returns the queues of cars waiting at red lights. A car at the end of a road
+        blocked by its traffic light does not move in the next move_cars call,
+        whatever its action, and neither do the cars queued right behind it that
+        drive forward.
+
+        Returns:
+            list[list[int]]: For every blocked road whose last position is taken, the
+                ids of the cars on consecutive taken positions, from the road end
+                backwards.
+        """
+        road_idxs = np.flatnonzero(self._get_blocked_roads())
+        road_ends = self._road_offsets[road_idxs] + self._road_lengths[road_idxs] - 1
+        queues = []
+        for road_idx in road_idxs[self._lanes[road_ends] != 0].tolist():
+            road = self._roads[self._road_keys[road_idx]].get_road()
+            free = np.flatnonzero(road == 0)
+            start = free[-1] + 1 if len(free) else 0
+            queues.append(road[start:][::-1].astype(int).tolist())
+        return queues
 
     def get_road_tiles_map_positions(self) -> list[tuple[int, int]]:
         """Returns the positions of all road tiles on the map.
@@ -1070,6 +1487,61 @@ class MapState:
         """
         return self._points
 
+    def get_collected_points(self) -> list[tuple[int, Point]]:
+        """Returns the points collected during the last move_cars call.
+
+        Returns:
+            list[tuple[int, Point]]: Agent ids with the points they collected, in the
+                order they were collected.
+        """
+        return self._collected_points
+
+    def get_version(self) -> int:
+        """Returns a counter that changes whenever cars, points or traffic lights
+        change, so that data derived from the state can be cached until then.
+
+        Returns:
+            int: The version of the state.
+        """
+        return self._version
+
+    def state_hash(self) -> int:
+        """Returns a 64-bit Zobrist hash of the dynamic state: the positions of the
+        cars, the traffic lights, the points not collected yet and the number of
+        move_cars() calls since the traffic lights switched, i.e. the step modulo the
+        traffic light interval of Map. The hash is updated with every change, so this
+        takes constant time.
+
+        Equal states have equal hashes, also in different runs and processes, so it
+        can key transposition tables or compare runs. Different states have equal
+        hashes only by rare chance.
+
+        Returns:
+            int: The hash.
+        """
+        return self._state_hash
+
+    def get_observation_grid(self, padding: int = 0):
+        """Returns the observation grid of the map, creating it on the first call.
+        Once created, the grid is updated with every change of the map state.
+
+        Args:
+            padding (int, optional): Minimum number of empty cells around the map,
+                i.e. the largest crop radius that will be requested. The grid is
+                rebuilt if it has less padding. Defaults to 0.
+
+        Returns:
+            ObservationGrid: The observation grid.
+        """
+        # imported here, as the observation module depends on this one
+        from psi_environment.data.observation import DEFAULT_PADDING, ObservationGrid
+
+        grid = self._observation_grid
+        if grid is None or grid.get_padding() < padding:
+            grid = ObservationGrid(self, max(padding, DEFAULT_PADDING))
+            self._observation_grid = grid
+        return grid
+
     def get_number_of_node_connections(self, node_id: int) -> int:
         """Returns the number of connections for a specific node.
 
@@ -0,0 +1,102 @@
+from types import MappingProxyType
+from typing import Any, Callable
+
+import numpy as np
+
+from psi_environment.data.map_state import MapState, Road, TrafficLight
+
+GETTER_PREFIXES = ("get_", "is_")
+
+
+def _freeze(value: Any) -> Any:
+    """Returns a read-only version of a value returned by the map state. Dictionaries
+    and lists are frozen recursively, roads and traffic lights are wrapped in
+    read-only views and arrays become non-writeable views, so no array is copied."""
+    if isinstance(value, (Road, TrafficLight)):
+        return ReadOnlyView(value)
+    if isinstance(value, dict):
+        frozen = {key: _freeze(item) for key, item in value.items()}
+        if all(frozen[key] is item for key, item in value.items()):
+            # nothing mutable inside, the proxy can read the dictionary itself
+            frozen = value
+        return MappingProxyType(frozen)
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, np.ndarray) and value.flags.writeable:
+        value = value.view()
+        value.flags.writeable = False
+    return value
+
+
+class ReadOnlyView:
+    """Read-only view of an object of the map state, given to agents that are
+    evaluated in parallel.
+
+    Only the getters of the object (methods starting with get_ or is_) and indexing
+    are available. Their results are frozen: dictionaries become mapping proxies,
+    lists become tuples, roads and traffic lights become read-only views and arrays
+    become non-writeable views.
+    """
+
+    def __init__(self, target: Any):
+        """Initializes the view.
+
+        Args:
+            target (Any): The object to view.
+        """
+        self._target = target
+
+    def __getattr__(self, name: str) -> Callable:
+        if not name.startswith(GETTER_PREFIXES):
+            raise AttributeError(
+                f"{self.__class__.__name__} only provides getters, not {name!r}"
+            )
+        getter = getattr(self._target, name)
+
+        def frozen_getter(*args, **kwargs):
+            return _freeze(getter(*args, **kwargs))
+
+        frozen_getter.__doc__ = getter.__doc__
+        return frozen_getter
+
+    def __getitem__(self, key: Any) -> Any:
+        return _freeze(self._target[key])
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self._target!r})"
+
+
+class MapStateView(ReadOnlyView):
+    """Read-only view of a MapState, given to agents that are evaluated in parallel.
+
+    While agents are evaluated, the road arrays are also flagged non-writeable (see
+    freeze_roads), so modifying roads raises an error instead of corrupting the
+    state other agents read. The observation grid is not available, as it is built
+    lazily and its construction would race between agent threads.
+    """
+
+    def __init__(self, map_state: MapState):
+        """Initializes the view.
+
+        Args:
+            map_state (MapState): The map state to view.
+        """
+        super().__init__(map_state)
+
+    def __getattr__(self, name: str) -> Callable:
+        if name == "get_observation_grid":
+            raise AttributeError(
+                f"{self.__class__.__name__} does not provide the observation grid"
+            )
+        return super().__getattr__(name)
+
+
+def freeze_roads(map_state: MapState, frozen: bool):
+    """Flags the road arrays of the map state as non-writeable or writeable again.
+
+    Args:
+        map_state (MapState): The map state.
+        frozen (bool): True to forbid writing to the roads, False to allow it.
+    """
+    for road in map_state.get_roads().values():
+        road.get_road().flags.writeable = not frozen
@@ -0,0 +1,278 @@
+from enum import IntEnum
+
+import numpy as np
+
+from psi_environment.data.map_state import Direction, MapState, NODE_CHARACTER
+from psi_environment.data.point import Point
+
+# every map tile is split into 2x2 cells, one for every lane of a road
+CELLS_PER_TILE = 2
+DEFAULT_PADDING = 8
+
+
+class ObservationChannel(IntEnum):
+    """The ObservationChannel enum defines the channels of an observation
+
+    ROADS - road and node cells, static
+    CARS - cells occupied by any car
+    OWN_CAR - cell of the observing car
+    POINTS - cells of the points the observing car has not collected yet; for the
+        global observation, the number of cars that still need the point
+    RED_LIGHTS - last cells of roads blocked by traffic lights
+    """
+
+    ROADS = 0
+    CARS = 1
+    OWN_CAR = 2
+    POINTS = 3
+    RED_LIGHTS = 4
+
+
+def get_road_cells(
+    map_state: MapState,
+) -> dict[tuple[int, int], tuple[np.ndarray, np.ndarray]]:
+    """Computes the grid cell of every road position. Every map tile is split into
+    CELLS_PER_TILE x CELLS_PER_TILE cells and roads in opposite directions use
+    different lanes, so every road position has its own cell.
+
+    Args:
+        map_state (MapState): The map state.
+
+    Returns:
+        dict[tuple[int, int], tuple[np.ndarray, np.ndarray]]: Mapping from road key
+            to the rows and columns of the cells of its positions.
+    """
+    road_cells = {}
+    for road_key, road in map_state.get_roads().items():
+        x, y = map_state.get_node_map_position(road_key[0])
+        pos = np.arange(road.get_length())
+        match Direction(map_state._edges[road_key]):
+            case Direction.UP:
+                rows, cols = 2 * y - 1 - pos, np.full_like(pos, 2 * x + 1)
+            case Direction.DOWN:
+                rows, cols = 2 * y + 2 + pos, np.full_like(pos, 2 * x)
+            case Direction.LEFT:
+                rows, cols = np.full_like(pos, 2 * y), 2 * x - 1 - pos
+            case Direction.RIGHT:
+                rows, cols = np.full_like(pos, 2 * y + 1), 2 * x + 2 + pos
+        road_cells[road_key] = (rows, cols)
+    return road_cells
+
+
+class ObservationGrid:
+    """Grid image of the map for learning agents, with one (channels, height, width)
+    observation for every agent car and one global observation.
+
+    All observations are stacked in a single preallocated array. It is built once
+    and then updated in place with the changes made by the map state: moved cars,
+    collected points and switched traffic lights. The grid is padded with empty cells,
+    so that crops around cars near the map border are views as well.
+    """
+
+    def __init__(self, map_state: MapState, padding: int = DEFAULT_PADDING):
+        """Builds the grid from the current map state.
+
+        Args:
+            map_state (MapState): The map state.
+            padding (int, optional): Number of empty cells around the map, the
+                maximum crop radius. Defaults to DEFAULT_PADDING.
+        """
+        self._padding = padding
+        map_array = map_state.get_map_array()
+        self._height = map_array.shape[0] * CELLS_PER_TILE
+        self._width = map_array.shape[1] * CELLS_PER_TILE
+
+        # observer 0 is the global observation
+        self._observers = {None: 0}
+        for car_id in map_state.get_points():
+            self._observers[car_id] = len(self._observers)
+
+        self._grid = np.zeros(
+            (
+                len(self._observers),
+                len(ObservationChannel),
+                self._height + 2 * padding,
+                self._width + 2 * padding,
+            ),
+            dtype=np.float32,
+        )
+        # cell of the car of every observer, for crops
+        self._observer_cells: dict[int, tuple[int, int]] = {}
+        self._road_cells = {
+            road_key: (rows + padding, cols + padding)
+            for road_key, (rows, cols) in get_road_cells(map_state).items()
+        }
+
+        roads = self._grid[:, ObservationChannel.ROADS]
+        for rows, cols in self._road_cells.values():
+            roads[:, rows, cols] = 1
+        for y, x in zip(*np.nonzero(map_array == NODE_CHARACTER)):
+            rows, cols = self._get_tile_cells((x, y))
+            roads[:, rows, cols] = 1
+
+        for car_id, (road_key, road_pos) in map_state.get_cars().items():
+            self.add_car(car_id, road_key, road_pos)
+        for car_id, points in map_state.get_points().items():
+            for point in points:
+                self._update_point(car_id, point, 1)
+
+        self._red_light_cells = (np.zeros(0, np.intp), np.zeros(0, np.intp))
+        self.update_traffic_lights(map_state)
+
+    def get_padding(self) -> int:
+        """Returns the number of empty cells around the map.
+
+        Returns:
+            int: The padding.
+        """
+        return self._padding
+
+    def _get_cell(self, road_key: tuple[int, int], road_pos: int) -> tuple[int, int]:
+        rows, cols = self._road_cells[road_key]
+        return rows[road_pos], cols[road_pos]
+
+    def _get_tile_cells(self, map_position: tuple[int, int]) -> tuple[slice, slice]:
+        x, y = map_position
+        row = y * CELLS_PER_TILE + self._padding
+        col = x * CELLS_PER_TILE + self._padding
+        return slice(row, row + CELLS_PER_TILE), slice(col, col + CELLS_PER_TILE)
+
+    def _update_point(self, car_id: int, point: Point, value: int):
+        rows, cols = self._get_tile_cells(point.map_position)
+        self._grid[0, ObservationChannel.POINTS, rows, cols] += value
+        self._grid[self._observers[car_id], ObservationChannel.POINTS, rows, cols] = (
+            1 if value > 0 else 0
+        )
+
+    def add_car(self, car_id: int, road_key: tuple[int, int], road_pos: int):
+        """Marks a car placed on the map.
+
+        Args:
+            car_id (int): The id of the car.
+            road_key (tuple[int, int]): The road of the car.
+            road_pos (int): The position of the car on the road.
+        """
+        row, col = self._get_cell(road_key, road_pos)
+        self._grid[:, ObservationChannel.CARS, row, col] = 1
+        observer = self._observers.get(car_id)
+        if observer is not None:
+            self._grid[observer, ObservationChannel.OWN_CAR, row, col] = 1
+            self._observer_cells[observer] = (row, col)
+
+    def move_car(
+        self,
+        car_id: int,
+        prev_road_key: tuple[int, int],
+        prev_road_pos: int,
+        road_key: tuple[int, int],
+        road_pos: int,
+    ):
+        """Moves a car between two cells.
+
+        Args:
+            car_id (int): The id of the car.
+            prev_road_key (tuple[int, int]): The previous road of the car.
+            prev_road_pos (int): The previous position of the car.
+            road_key (tuple[int, int]): The new road of the car.
+            road_pos (int): The new position of the car.
+        """
+        prev_row, prev_col = self._get_cell(prev_road_key, prev_road_pos)
+        self._grid[:, ObservationChannel.CARS, prev_row, prev_col] = 0
+        observer = self._observers.get(car_id)
+        if observer is not None:
+            self._grid[observer, ObservationChannel.OWN_CAR, prev_row, prev_col] = 0
+        self.add_car(car_id, road_key, road_pos)
+
+    def remove_point(self, car_id: int, point: Point):
+        """Removes a point collected by an agent.
+
+        Args:
+            car_id (int): The id of the agent.
+            point (Point): The collected point.
+        """
+        self._update_point(car_id, point, -1)
+
+    def update_traffic_lights(self, map_state: MapState):
+        """Marks the roads currently blocked by traffic lights.
+
+        Args:
+            map_state (MapState): The map state.
+        """
+        rows, cols = self._red_light_cells
+        self._grid[:, ObservationChannel.RED_LIGHTS, rows, cols] = 0
+        cells = [
+            self._get_cell(road_key, -1)
+            for traffic_light in map_state.get_traffic_lights().values()
+            for road_key in traffic_light.get_blocked_road_keys()
+        ]
+        rows = np.array([row for row, _ in cells], dtype=np.intp)
+        cols = np.array([col for _, col in cells], dtype=np.intp)
+        self._grid[:, ObservationChannel.RED_LIGHTS, rows, cols] = 1
+        self._red_light_cells = (rows, cols)
+
+    def get_agent_ids(self) -> list[int]:
+        """Returns the ids of the agent cars in the order of get_observations().
+
+        Returns:
+            list[int]: The agent ids.
+        """
+        return [car_id for car_id in self._observers if car_id is not None]
+
+    def get_observations(self) -> np.ndarray:
+        """Returns a read-only view of the observations of all agent cars, e.g. for
+        batched inference.
+
+        Returns:
+            np.ndarray: Array of shape (agents, channels, height, width), agents are
+                ordered as in get_agent_ids().
+        """
+        top = left = self._padding
+        view = self._grid[1:, :, top : top + self._height, left : left + self._width]
+        view.flags.writeable = False
+        return view
+
+    def get_observation(
+        self, car_id: int | None = None, crop_radius: int | None = None
+    ) -> np.ndarray:
+        """Returns a read-only view of the observation of a car. The view is updated
+        in place when the map state changes, copy it to keep the current state.
+
+        Args:
+            car_id (int | None, optional): The id of an agent car. Defaults to None,
+                which returns the global observation.
+            crop_radius (int | None, optional): If set, only a square of
+                2 * crop_radius + 1 cells centred on the car is returned.
+                Defaults to None, which returns the whole map.
+
+        Raises:
+            ValueError: If the car is not an agent, if a crop is requested without
+                a car or if the crop radius is larger than the padding.
+
+        Returns:
+            np.ndarray: Array of shape (channels, height, width), see
+                ObservationChannel.
+        """
+        observer = self._observers.get(car_id)
+        if observer is None:
+            raise ValueError(f"Car {car_id} is not an agent")
+        grid = self._grid[observer]
+
+        if crop_radius is None:
+            top = left = self._padding
+            view = grid[:, top : top + self._height, left : left + self._width]
+        else:
+            if car_id is None:
+                raise ValueError("Crops are only available for agent cars")
+            if crop_radius > self._padding:
+                raise ValueError(
+                    f"Crop radius {crop_radius} is larger than padding {self._padding}"
+                )
+            row, col = self._observer_cells[observer]
+            view = grid[
+                :,
+                row - crop_radius : row + crop_radius + 1,
+                col - crop_radius : col + crop_radius + 1,
+            ]
+        view = view.view()
+        view.flags.writeable = False
+        return view
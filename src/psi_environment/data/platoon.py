@@ -0,0 +1,19 @@
+import numpy as np
+
+
+def get_platoon_starts(cells: np.ndarray, road_starts: np.ndarray) -> np.ndarray:
+    """Splits taken cells of a lane buffer into platoons, i.e. runs of consecutive
+    cells on the same road.
+
+    Args:
+        cells (np.ndarray): Indices of the cells in the lane buffer, in descending
+            order, so that every platoon starts with its front car.
+        road_starts (np.ndarray): Boolean mask of the cells of the lane buffer that
+            are the first position of a road.
+
+    Returns:
+        np.ndarray: Boolean mask of the cells that start a platoon.
+    """
+    starts = np.ones(len(cells), dtype=bool)
+    starts[1:] = (cells[1:] != cells[:-1] - 1) | road_starts[cells[:-1]]
+    return starts
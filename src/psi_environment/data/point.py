@@ -7,6 +7,8 @@ class PositionType(IntEnum):
 
 
 class Point:
+    __slots__ = ("map_position", "type", "road_positions", "node")
+
     def __init__(
         self,
         map_position: tuple[int, int],
@@ -0,0 +1,443 @@
+import bisect
+import json
+import struct
+import zlib
+from types import MappingProxyType
+from typing import BinaryIO, Iterator
+
+import numpy as np
+
+from psi_environment.data.map_state import Direction, MapState
+from psi_environment.data.snapshot import MapSnapshot
+
+MAGIC = b"PSIREC\x00\x01"
+INDEX_MAGIC = b"PSIINDEX"
+
+# every record in a chunk starts with a tag
+KEYFRAME = 0
+DELTA = 1
+
+_HEADER_SIZE = struct.Struct("<I")
+_RECORD = struct.Struct("<BIIIB")
+_CHUNK_SIZE = struct.Struct("<I")
+_INDEX_ENTRY = struct.Struct("<IQ")
+_FOOTER = struct.Struct("<QI8s")
+
+# car id, road index, road position
+CAR_DTYPE = np.dtype([("car", "<u4"), ("road", "<u4"), ("pos", "<u4")])
+# agent id, map position of the point
+POINT_DTYPE = np.dtype([("agent", "<u4"), ("x", "<i4"), ("y", "<i4")])
+
+
+class Recorder:
+    """Writes the course of a simulation to a compact binary log, so that it can be
+    replayed without running the agents.
+
+    The log stores only what changes in every step: the cars that moved, whether the
+    traffic lights switched and the points that were collected. Steps are grouped in
+    chunks of keyframe_interval steps, each compressed with zlib and starting with a
+    keyframe holding the full state, so that any step can be restored by decoding a
+    single chunk. An index of the chunks is written at the end of the file.
+
+    File layout:
+        magic, header size, zlib-compressed JSON header,
+        chunk size, zlib-compressed chunk, ...,
+        index entries (first step, file offset of the chunk) for every chunk,
+        footer (index offset, number of chunks, index magic).
+    """
+
+    def __init__(
+        self,
+        map_state: MapState,
+        file: BinaryIO,
+        keyframe_interval: int = 100,
+        step: int = 0,
+    ):
+        """Initializes the recorder and writes the header and the current state.
+
+        Args:
+            map_state (MapState): The map state to record.
+            file (BinaryIO): File opened for binary writing. It is closed by close().
+            keyframe_interval (int, optional): Number of steps between keyframes,
+                i.e. the number of steps in a chunk. Defaults to 100.
+            step (int, optional): Number of steps already taken. Defaults to 0.
+
+        Raises:
+            ValueError: If keyframe_interval is not positive.
+        """
+        if keyframe_interval < 1:
+            raise ValueError("Keyframe interval must be positive")
+        self._file = file
+        self._keyframe_interval = keyframe_interval
+        self._road_keys = list(map_state.get_roads())
+        self._road_indices = {key: idx for idx, key in enumerate(self._road_keys)}
+        self._traffic_light_nodes = [
+            int(node) for node in map_state.get_traffic_lights()
+        ]
+        self._index: list[tuple[int, int]] = []
+        self._chunk: list[bytes] = []
+        self._chunk_steps = 0
+
+        header = {
+            "map": ["".join(row) for row in map_state.get_map_array()],
+            "random_seed": map_state._random_seed,
+            "agents": [int(car_id) for car_id in map_state.get_points()],
+            "road_keys": [list(map(int, key)) for key in self._road_keys],
+            "traffic_light_nodes": self._traffic_light_nodes,
+            "keyframe_interval": keyframe_interval,
+        }
+        header_data = zlib.compress(json.dumps(header).encode())
+        file.write(MAGIC)
+        file.write(_HEADER_SIZE.pack(len(header_data)))
+        file.write(header_data)
+
+        self._write_keyframe(map_state, step)
+
+    def record_step(
+        self,
+        map_state: MapState,
+        step: int,
+        action_results: list[tuple[int, tuple[int, int], int]],
+        lights_switched: bool,
+    ):
+        """Records the changes made by a single step.
+
+        Args:
+            map_state (MapState): The map state after the step.
+            step (int): Number of steps taken, including this one.
+            action_results (list[tuple[int, tuple[int, int], int]]): The cars that
+                moved, as returned by MapState.move_cars.
+            lights_switched (bool): Whether the traffic lights switched in this step.
+        """
+        moves = np.array(
+            [
+                (car_id, self._road_indices[road_key], road_pos)
+                for car_id, road_key, road_pos in action_results
+            ],
+            dtype=CAR_DTYPE,
+        )
+        collected = np.array(
+            [
+                (car_id, *point.map_position)
+                for car_id, point in map_state.get_collected_points()
+            ],
+            dtype=POINT_DTYPE,
+        )
+        self._chunk.append(
+            _RECORD.pack(DELTA, step, len(moves), len(collected), lights_switched)
+        )
+        self._chunk.append(moves.tobytes())
+        self._chunk.append(collected.tobytes())
+        self._chunk_steps += 1
+
+        if self._chunk_steps == self._keyframe_interval:
+            self._flush_chunk()
+            self._write_keyframe(map_state, step)
+
+    def _write_keyframe(self, map_state: MapState, step: int):
+        cars = np.array(
+            [
+                (car_id, self._road_indices[road_key], road_pos)
+                for car_id, (road_key, road_pos) in map_state.get_cars().items()
+            ],
+            dtype=CAR_DTYPE,
+        )
+        points = np.array(
+            [
+                (car_id, *point.map_position)
+                for car_id, agent_points in map_state.get_points().items()
+                for point in agent_points
+            ],
+            dtype=POINT_DTYPE,
+        )
+        traffic_lights = map_state.get_traffic_lights()
+        blocked_directions = np.array(
+            [
+                traffic_lights[node]._blocked_direction
+                for node in self._traffic_light_nodes
+            ],
+            dtype=np.uint8,
+        )
+        self._index.append((step, self._file.tell()))
+        self._chunk.append(_RECORD.pack(KEYFRAME, step, len(cars), len(points), 0))
+        self._chunk.append(cars.tobytes())
+        self._chunk.append(points.tobytes())
+        self._chunk.append(blocked_directions.tobytes())
+
+    def _flush_chunk(self):
+        data = zlib.compress(b"".join(self._chunk))
+        self._file.write(_CHUNK_SIZE.pack(len(data)))
+        self._file.write(data)
+        self._chunk = []
+        self._chunk_steps = 0
+
+    def close(self):
+        """Writes the remaining steps and the index, then closes the file."""
+        if self._file.closed:
+            return
+        self._flush_chunk()
+        index_offset = self._file.tell()
+        for entry in self._index:
+            self._file.write(_INDEX_ENTRY.pack(*entry))
+        self._file.write(_FOOTER.pack(index_offset, len(self._index), INDEX_MAGIC))
+        self._file.close()
+
+
+class Recording:
+    """Reads a log written by Recorder. Any step can be restored in O(log n) time
+    with respect to the length of the recording: the chunk is found by a binary search
+    in the index and at most keyframe_interval steps of it are decoded.
+    """
+
+    def __init__(self, file: BinaryIO):
+        """Reads the header and the index of the recording.
+
+        Args:
+            file (BinaryIO): Seekable file opened for binary reading.
+
+        Raises:
+            ValueError: If the file is not a complete recording.
+        """
+        self._file = file
+        if file.read(len(MAGIC)) != MAGIC:
+            raise ValueError("Not a recording file")
+        (header_size,) = _HEADER_SIZE.unpack(file.read(_HEADER_SIZE.size))
+        header = json.loads(zlib.decompress(file.read(header_size)))
+
+        file.seek(-_FOOTER.size, 2)
+        index_offset, n_chunks, index_magic = _FOOTER.unpack(file.read(_FOOTER.size))
+        if index_magic != INDEX_MAGIC:
+            raise ValueError("Recording is incomplete, it was not closed")
+        file.seek(index_offset)
+        index = [
+            _INDEX_ENTRY.unpack(file.read(_INDEX_ENTRY.size)) for _ in range(n_chunks)
+        ]
+        self._chunk_steps = [step for step, _ in index]
+        self._chunk_offsets = [offset for _, offset in index]
+        self._cached_chunk: tuple[int, list] | None = None
+
+        self._map_array = np.array([list(row) for row in header["map"]])
+        self._random_seed = header["random_seed"]
+        self._agents = header["agents"]
+        self._road_keys = [tuple(key) for key in header["road_keys"]]
+        self._traffic_light_nodes = header["traffic_light_nodes"]
+        self._keyframe_interval = header["keyframe_interval"]
+        # the recording may have been started after some steps were taken
+        self._first_step = self._chunk_steps[0]
+        self._last_step = self._get_chunk(n_chunks - 1)[-1][1]
+
+    @classmethod
+    def open(cls, path: str) -> "Recording":
+        """Opens a recording file.
+
+        Args:
+            path (str): Path to the recording.
+
+        Returns:
+            Recording: The recording.
+        """
+        return cls(open(path, "rb"))
+
+    def close(self):
+        """Closes the recording file."""
+        self._file.close()
+
+    def __len__(self) -> int:
+        """Returns the number of recorded steps."""
+        return self._last_step - self._first_step
+
+    def get_first_step(self) -> int:
+        """Returns the step at which the recording was started, the first step that
+        can be restored.
+
+        Returns:
+            int: Number of steps taken before the recording was started.
+        """
+        return self._first_step
+
+    def get_agent_ids(self) -> list[int]:
+        """Returns the ids of the recorded agent cars.
+
+        Returns:
+            list[int]: The agent ids.
+        """
+        return self._agents
+
+    def get_random_seed(self) -> int:
+        """Returns the random seed of the recorded map.
+
+        Returns:
+            int: The random seed.
+        """
+        return self._random_seed
+
+    def create_map_state(self) -> MapState:
+        """Creates a map state with the static layout of the recorded map: roads and
+        traffic lights, without cars and points.
+
+        Returns:
+            MapState: The map state.
+        """
+        return MapState(
+            self._random_seed,
+            map_array=self._map_array,
+            traffic_light_nodes=self._traffic_light_nodes,
+        )
+
+    def _get_chunk(self, chunk_idx: int) -> list:
+        if self._cached_chunk is not None and self._cached_chunk[0] == chunk_idx:
+            return self._cached_chunk[1]
+
+        self._file.seek(self._chunk_offsets[chunk_idx])
+        (size,) = _CHUNK_SIZE.unpack(self._file.read(_CHUNK_SIZE.size))
+        data = zlib.decompress(self._file.read(size))
+
+        records = []
+        offset = 0
+        while offset < len(data):
+            tag, step, n_cars, n_points, flag = _RECORD.unpack_from(data, offset)
+            offset += _RECORD.size
+            cars = np.frombuffer(data, CAR_DTYPE, n_cars, offset)
+            offset += cars.nbytes
+            points = np.frombuffer(data, POINT_DTYPE, n_points, offset)
+            offset += points.nbytes
+            if tag == KEYFRAME:
+                n_lights = len(self._traffic_light_nodes)
+                blocked = np.frombuffer(data, np.uint8, n_lights, offset)
+                offset += blocked.nbytes
+                records.append((tag, step, cars, points, blocked))
+            else:
+                records.append((tag, step, cars, points, bool(flag)))
+
+        self._cached_chunk = (chunk_idx, records)
+        return records
+
+    def _replay(self, start: int, end: int) -> Iterator[MapSnapshot]:
+        """Yields snapshots of the steps from start to end inclusive."""
+        chunk_idx = bisect.bisect_right(self._chunk_steps, start) - 1
+        cars: dict[int, tuple[tuple[int, int], int]] = {}
+        points: dict[int, list[tuple[int, int]]] = {}
+        blocked_directions: dict[int, Direction] = {}
+        road_keys = self._road_keys
+
+        while chunk_idx < len(self._chunk_offsets):
+            for tag, step, moved, changed_points, extra in self._get_chunk(chunk_idx):
+                if tag == KEYFRAME:
+                    if cars:
+                        # the state is already known from the previous chunk
+                        continue
+                    cars = {
+                        car: (road_keys[road], pos)
+                        for car, road, pos in moved.tolist()
+                    }
+                    points = {agent: [] for agent in self._agents}
+                    for agent, x, y in changed_points.tolist():
+                        points[agent].append((x, y))
+                    blocked_directions = {
+                        node: Direction(direction)
+                        for node, direction in zip(
+                            self._traffic_light_nodes, extra.tolist()
+                        )
+                    }
+                    moved_cars = frozenset(cars)
+                else:
+                    for car, road, pos in moved.tolist():
+                        cars[car] = (road_keys[road], pos)
+                    for agent, x, y in changed_points.tolist():
+                        points[agent].remove((x, y))
+                    if extra:
+                        blocked_directions = {
+                            node: Direction((direction + 1) % 4)
+                            for node, direction in blocked_directions.items()
+                        }
+                    moved_cars = frozenset(moved["car"].tolist())
+
+                if step > end:
+                    return
+                if step >= start:
+                    yield MapSnapshot(
+                        step=step,
+                        cars=MappingProxyType(dict(cars)),
+                        moved_cars=moved_cars,
+                        blocked_directions=MappingProxyType(blocked_directions),
+                        points=MappingProxyType(
+                            {
+                                agent: tuple(positions)
+                                for agent, positions in points.items()
+                            }
+                        ),
+                    )
+            chunk_idx += 1
+
+    def _check_step(self, step: int):
+        if not self._first_step <= step <= self._last_step:
+            raise IndexError(
+                f"Step {step} is out of the recorded range "
+                f"{self._first_step}-{self._last_step}"
+            )
+
+    def seek(self, step: int) -> MapSnapshot:
+        """Restores the state after the given step. All cars are reported as moved,
+        as the previous state is not known.
+
+        Args:
+            step (int): Number of steps taken, from get_first_step() to
+                get_first_step() + len(recording).
+
+        Raises:
+            IndexError: If the step was not recorded.
+
+        Returns:
+            MapSnapshot: The state after the step.
+        """
+        self._check_step(step)
+        snapshot = next(self._replay(step, step))
+        return MapSnapshot(
+            step=snapshot.step,
+            cars=snapshot.cars,
+            moved_cars=frozenset(snapshot.cars),
+            blocked_directions=snapshot.blocked_directions,
+            points=snapshot.points,
+        )
+
+    def iter_snapshots(
+        self, start: int | None = None, end: int | None = None
+    ) -> Iterator[MapSnapshot]:
+        """Yields the states after consecutive steps. The first snapshot reports all
+        cars as moved, the following ones only the cars that moved in their step.
+
+        Args:
+            start (int | None, optional): The first step. Defaults to None, which
+                means the first recorded step.
+            end (int | None, optional): The last step, inclusive. Defaults to None,
+                which means the last recorded step.
+
+        Raises:
+            IndexError: If start is before the first recorded step.
+
+        Returns:
+            Iterator[MapSnapshot]: The states after every step.
+        """
+        if start is None:
+            start = self._first_step
+        if end is None:
+            end = self._last_step
+        if start < self._first_step:
+            raise IndexError(
+                f"Step {start} is before the first recorded step {self._first_step}"
+            )
+        return self._iter_snapshots(start, end)
+
+    def _iter_snapshots(self, start: int, end: int) -> Iterator[MapSnapshot]:
+        snapshots = self._replay(start, end)
+        first = next(snapshots, None)
+        if first is None:
+            return
+        yield MapSnapshot(
+            step=first.step,
+            cars=first.cars,
+            moved_cars=frozenset(first.cars),
+            blocked_directions=first.blocked_directions,
+            points=first.points,
+        )
+        yield from snapshots
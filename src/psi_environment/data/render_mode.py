@@ -0,0 +1,14 @@
+from enum import Enum
+
+
+class RenderMode(Enum):
+    """The RenderMode enum defines where the environment draws the simulation
+
+    WINDOW - draw in a window on the screen
+    OFFSCREEN - draw on an in-memory surface, no display is needed; frames can be
+        exported with frame_export_dir
+    NONE - do not draw at all; pygame is not even imported
+    """
+    WINDOW = 0
+    OFFSCREEN = 1
+    NONE = 2
@@ -0,0 +1,141 @@
+import numpy as np
+
+from psi_environment.data.action import Action
+
+
+class RouteTable:
+    """The RouteTable class stores the standing routes of cars, i.e. the actions they
+    take at their next road ends, which the map executes without asking the cars for
+    actions.
+
+    Routes are kept in compact arrays: the actions of all routes in one buffer of
+    bytes, and per car the cursor and end of its route in the buffer, the number of
+    steps it has been blocked and the number it tolerates.
+    """
+
+    def __init__(self, car_ids: list[int]):
+        """Initializes the RouteTable instance.
+
+        Args:
+            car_ids (list[int]): Ids of all cars that may get routes.
+        """
+        self._car_ids = np.array(car_ids, dtype=int)
+        self._rows = {car_id: row for row, car_id in enumerate(car_ids)}
+        self._actions = np.zeros(16, dtype=np.int8)
+        self._size = 0
+        self._cursors = np.zeros(len(car_ids), dtype=int)
+        self._ends = np.zeros(len(car_ids), dtype=int)
+        self._blocked_ticks = np.zeros(len(car_ids), dtype=int)
+        self._max_blocked_ticks = np.zeros(len(car_ids), dtype=int)
+        self._at_road_end = np.zeros(len(car_ids), dtype=bool)
+
+    def set_route(self, car_id: int, actions: list[Action], max_blocked_ticks: int):
+        """Sets the route of a car, replacing its previous route.
+
+        Args:
+            car_id (int): The id of the car.
+            actions (list[Action]): The actions at the next road ends. An empty list
+                removes the route.
+            max_blocked_ticks (int): Number of steps in a row the car may not move
+                before its route is dropped.
+        """
+        row = self._rows[car_id]
+        self._ends[row] = self._cursors[row]
+        if self._size + len(actions) > len(self._actions):
+            self._compact(len(actions))
+        self._actions[self._size : self._size + len(actions)] = actions
+        self._cursors[row] = self._size
+        self._size += len(actions)
+        self._ends[row] = self._size
+        self._blocked_ticks[row] = 0
+        self._max_blocked_ticks[row] = max_blocked_ticks
+
+    def _compact(self, n_actions: int):
+        """Moves the remaining actions of all routes to the start of a new buffer with
+        room for more actions.
+
+        Args:
+            n_actions (int): Number of actions that will be added.
+        """
+        rows = np.flatnonzero(self._cursors < self._ends)
+        n_remaining = int((self._ends[rows] - self._cursors[rows]).sum())
+        actions = np.zeros(max(2 * (n_remaining + n_actions), 16), dtype=np.int8)
+        size = 0
+        for row in rows.tolist():
+            route = self._actions[self._cursors[row] : self._ends[row]]
+            actions[size : size + len(route)] = route
+            self._cursors[row] = size
+            size += len(route)
+            self._ends[row] = size
+        self._actions = actions
+        self._size = size
+
+    def has_route(self, car_id: int) -> bool:
+        """Checks whether a car has a route.
+
+        Args:
+            car_id (int): The id of the car.
+
+        Returns:
+            bool: True if the car has a route with actions left.
+        """
+        row = self._rows[car_id]
+        return self._cursors[row] < self._ends[row]
+
+    def get_car_ids(self) -> list[int]:
+        """Returns the cars that have routes.
+
+        Returns:
+            list[int]: Ids of the cars with routes.
+        """
+        return self._car_ids[self._cursors < self._ends].tolist()
+
+    def get_actions(
+        self, car_ids: list[int], at_road_end: list[int]
+    ) -> dict[int, Action]:
+        """Returns the actions of cars with routes in this step: the next action of
+        the route at a road end and FORWARD elsewhere.
+
+        Args:
+            car_ids (list[int]): Ids of cars with routes.
+            at_road_end (list[int]): Ids of those of the cars that are at a road end.
+
+        Returns:
+            dict[int, Action]: The actions of the cars.
+        """
+        rows = np.array([self._rows[car_id] for car_id in car_ids], dtype=int)
+        self._at_road_end[rows] = False
+        self._at_road_end[[self._rows[car_id] for car_id in at_road_end]] = True
+        actions = np.where(
+            self._at_road_end[rows],
+            self._actions[np.minimum(self._cursors[rows], len(self._actions) - 1)],
+            int(Action.FORWARD),
+        )
+        return {
+            car_id: Action(action) for car_id, action in zip(car_ids, actions.tolist())
+        }
+
+    def update(self, moved_car_ids: set[int], collecting_car_ids: set[int]):
+        """Advances the routes after the cars moved. A car that left a road end
+        completed the action of its route there. Routes are dropped when they are
+        completed, when their car was blocked for too long or when it collected a
+        point.
+
+        Args:
+            moved_car_ids (set[int]): Ids of the cars that moved.
+            collecting_car_ids (set[int]): Ids of the cars that collected points.
+        """
+        rows = np.flatnonzero(self._cursors < self._ends)
+        if len(rows) == 0:
+            return
+        car_ids = self._car_ids[rows].tolist()
+        moved = np.array([car_id in moved_car_ids for car_id in car_ids])
+        self._cursors[rows[moved & self._at_road_end[rows]]] += 1
+        self._blocked_ticks[rows] = np.where(moved, 0, self._blocked_ticks[rows] + 1)
+
+        collected = np.array([car_id in collecting_car_ids for car_id in car_ids])
+        dropped = rows[
+            collected
+            | (self._blocked_ticks[rows] >= self._max_blocked_ticks[rows])
+        ]
+        self._ends[dropped] = self._cursors[dropped]
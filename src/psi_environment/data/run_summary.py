@@ -0,0 +1,44 @@
+from dataclasses import dataclass
+from typing import Mapping
+
+from psi_environment.data.stop_reason import StopReason
+
+
+@dataclass(frozen=True)
+class RunSummary:
+    """Summary of a run of the environment, returned by Environment.run.
+
+    Attributes:
+        stop_reason (StopReason): Why the run returned.
+        ticks (int): Number of ticks taken in the run.
+        timestep (int): The timestep of the environment after the run, i.e. the
+            cost so far.
+        elapsed (float): Wall-clock time of the run in seconds.
+        points_left (Mapping[int, int]): Mapping from agent id to the number of its
+            points not collected yet.
+        finish_ticks (Mapping[int, int | None]): Mapping from agent id to the tick in
+            which it collected its last point, None if it has not finished.
+    """
+
+    stop_reason: StopReason
+    ticks: int
+    timestep: int
+    elapsed: float
+    points_left: Mapping[int, int]
+    finish_ticks: Mapping[int, int | None]
+
+    def get_ticks_per_second(self) -> float:
+        """Returns the simulation speed of the run.
+
+        Returns:
+            float: Ticks per second of wall-clock time.
+        """
+        return self.ticks / self.elapsed if self.elapsed > 0 else float("inf")
+
+    def get_finished_agents(self) -> list[int]:
+        """Returns the agents that collected all their points.
+
+        Returns:
+            list[int]: Ids of the agents.
+        """
+        return [car_id for car_id, left in self.points_left.items() if left == 0]
@@ -0,0 +1,115 @@
+import time
+from dataclasses import dataclass
+
+from psi_environment.data.point import Point
+
+
+@dataclass(frozen=True)
+class AgentScore:
+    """Result of an agent in an episode.
+
+    Attributes:
+        points_left (int): Number of points the agent has not collected yet.
+        collection_ticks (tuple[int, ...]): Ticks in which the agent collected its
+            points, in order.
+        finish_tick (int | None): Tick in which the agent collected its last point,
+            None if it has not finished.
+    """
+
+    points_left: int
+    collection_ticks: tuple[int, ...]
+    finish_tick: int | None
+
+
+class Scoreboard:
+    """The Scoreboard class keeps the score of the agents of an episode, updated with
+    the points collected in every step, so that the state of the episode is known
+    without scanning the points of the map.
+    """
+
+    def __init__(self, points: dict[int, list[Point]]):
+        """Initializes the Scoreboard instance. The wall-clock time of the episode
+        starts now.
+
+        Args:
+            points (dict[int, list[Point]]): The points of the agents at the start of
+                the episode.
+        """
+        self._points_left = {car_id: len(p) for car_id, p in points.items()}
+        self._collection_ticks: dict[int, list[int]] = {car_id: [] for car_id in points}
+        self._finish_ticks = {
+            car_id: 0 for car_id, n_points in self._points_left.items() if not n_points
+        }
+        self._tick = 0
+        self._start_time = time.perf_counter()
+
+    def record_step(self, tick: int, collected_points: list[tuple[int, Point]]):
+        """Records the points collected in a step.
+
+        Args:
+            tick (int): The tick of the step, counted from 1.
+            collected_points (list[tuple[int, Point]]): Agent ids with the points
+                they collected in the step, see MapState.get_collected_points().
+        """
+        self._tick = tick
+        for car_id, _ in collected_points:
+            self._points_left[car_id] -= 1
+            self._collection_ticks[car_id].append(tick)
+            if self._points_left[car_id] == 0:
+                self._finish_ticks[car_id] = tick
+
+    def get_tick(self) -> int:
+        """Returns the tick of the last recorded step.
+
+        Returns:
+            int: The tick.
+        """
+        return self._tick
+
+    def get_elapsed(self) -> float:
+        """Returns the wall-clock time since the episode started.
+
+        Returns:
+            float: The time in seconds.
+        """
+        return time.perf_counter() - self._start_time
+
+    def get_n_agents(self) -> int:
+        """Returns the number of agents.
+
+        Returns:
+            int: The number of agents.
+        """
+        return len(self._points_left)
+
+    def get_n_finished(self) -> int:
+        """Returns the number of agents that collected all their points.
+
+        Returns:
+            int: The number of agents.
+        """
+        return len(self._finish_ticks)
+
+    def get_finish_ticks(self) -> dict[int, int]:
+        """Returns the agents that collected all their points, in the order they
+        finished.
+
+        Returns:
+            dict[int, int]: Mapping from agent id to the tick in which it finished.
+        """
+        return self._finish_ticks
+
+    def get_scores(self) -> dict[int, AgentScore]:
+        """Returns the results of all agents.
+
+        Returns:
+            dict[int, AgentScore]: Mapping from agent id to its result.
+        """
+        return {
+            car_id: AgentScore(
+                points_left=points_left,
+                collection_ticks=tuple(self._collection_ticks[car_id]),
+                finish_tick=self._finish_ticks.get(car_id),
+            )
+            for car_id, points_left in self._points_left.items()
+        }
@@ -0,0 +1,243 @@
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any
+
+import numpy as np
+
+from psi_environment.data.map_state import Direction, MapState
+from psi_environment.data.point import Point
+
+# arrays in the shared memory block, in order: name, dtype, shape key of the layout
+_ARRAYS = (
+    ("tick", np.int64, "n_ticks"),
+    ("lanes", np.float64, "n_lanes"),
+    ("cars", np.int32, "n_cars"),
+    ("blocked", np.uint8, "n_lights"),
+    ("points", np.uint8, "n_points"),
+)
+_ALIGNMENT = 8
+
+
+def _get_offsets(layout: dict[str, Any]) -> tuple[dict[str, int], int]:
+    offsets = {}
+    size = 0
+    for name, dtype, shape_key in _ARRAYS:
+        offsets[name] = size
+        nbytes = np.dtype(dtype).itemsize * layout[shape_key]
+        if name == "cars":
+            nbytes *= 2
+        size += -(-nbytes // _ALIGNMENT) * _ALIGNMENT
+    return offsets, max(size, 1)
+
+
+class SharedMapState:
+    """Compact copy of the dynamic map state in a multiprocessing.shared_memory block,
+    read by agents running in other processes without pickling the map state.
+
+    The block holds the current tick and the ticks since the traffic lights switched,
+    all road arrays concatenated into one lane buffer, the road index and position of
+    every car, the blocked direction of every traffic light and a mask of the points
+    not collected yet. The owner rebinds the road arrays of its map state to views of
+    the lane buffer, so moving cars writes directly to shared memory; the rest is
+    copied by update() before every tick.
+    The static part of the map is described by get_layout(), which is sent to the
+    agent processes once.
+    """
+
+    def __init__(
+        self,
+        shm: shared_memory.SharedMemory,
+        layout: dict[str, Any],
+        owner: bool,
+    ):
+        """Initializes the shared state, use create() or attach() instead.
+
+        Args:
+            shm (shared_memory.SharedMemory): The shared memory block.
+            layout (dict[str, Any]): The layout of the block.
+            owner (bool): Whether this process created the block.
+        """
+        self._shm = shm
+        self._layout = layout
+        self._owner = owner
+        offsets, _ = _get_offsets(layout)
+        self._arrays: dict[str, np.ndarray] = {}
+        for name, dtype, shape_key in _ARRAYS:
+            shape = (layout[shape_key], 2) if name == "cars" else layout[shape_key]
+            array = np.ndarray(shape, dtype, shm.buf, offsets[name])
+            array.flags.writeable = owner
+            self._arrays[name] = array
+
+        self._road_keys = [tuple(key) for key in layout["road_keys"]]
+        self._road_indices = {key: idx for idx, key in enumerate(self._road_keys)}
+        self._car_rows = {car_id: row for row, car_id in enumerate(layout["car_ids"])}
+        # points are identified by their agent and map position, unique per agent
+        self._point_rows = {
+            (car_id, tuple(point.map_position)): row
+            for row, (car_id, point) in enumerate(layout["points"])
+        }
+        self._loaded_points: np.ndarray | None = None
+
+    @classmethod
+    def create(cls, map_state: MapState) -> "SharedMapState":
+        """Creates the shared memory block for the map state and moves its road
+        arrays into it. The cars and points of the map must already be placed.
+
+        Args:
+            map_state (MapState): The map state to share.
+
+        Returns:
+            SharedMapState: The shared state, owning the block.
+        """
+        roads = map_state.get_roads()
+        points = [
+            (car_id, point)
+            for car_id, agent_points in map_state.get_points().items()
+            for point in agent_points
+        ]
+        layout = {
+            "map": ["".join(row) for row in map_state.get_map_array()],
+            "random_seed": map_state._random_seed,
+            "road_keys": [list(map(int, key)) for key in roads],
+            "traffic_light_nodes": [
+                int(node) for node in map_state.get_traffic_lights()
+            ],
+            "car_ids": [int(car_id) for car_id in map_state.get_cars()],
+            "points": points,
+            "n_ticks": 2,
+            "n_lanes": sum(road.get_length() for road in roads.values()),
+            "n_cars": len(map_state.get_cars()),
+            "n_lights": len(map_state.get_traffic_lights()),
+            "n_points": len(points),
+        }
+        _, size = _get_offsets(layout)
+        shm = shared_memory.SharedMemory(create=True, size=size)
+        layout["name"] = shm.name
+        shared = cls(shm, layout, owner=True)
+
+        lanes = shared._arrays["lanes"]
+        lanes[:] = map_state._lanes
+        map_state._set_lanes(lanes)
+        shared._arrays["points"][:] = 1
+        shared.update(map_state, 0)
+        return shared
+
+    @classmethod
+    def attach(cls, layout: dict[str, Any]) -> "SharedMapState":
+        """Attaches to a shared memory block created in another process.
+
+        Args:
+            layout (dict[str, Any]): The layout returned by get_layout() of the owner.
+
+        Returns:
+            SharedMapState: The shared state, with read-only arrays.
+        """
+        shm = shared_memory.SharedMemory(name=layout["name"])
+        # the block is unlinked by its owner, the tracker of this process must not
+        # unlink it when the process exits
+        resource_tracker.unregister(shm._name, "shared_memory")
+        return cls(shm, layout, owner=False)
+
+    def get_layout(self) -> dict[str, Any]:
+        """Returns the name and layout of the block with the static part of the map,
+        which is needed to attach to it.
+
+        Returns:
+            dict[str, Any]: The picklable layout.
+        """
+        return self._layout
+
+    def get_tick(self) -> int:
+        """Returns the tick of the state currently in the block.
+
+        Returns:
+            int: The tick.
+        """
+        return int(self._arrays["tick"][0])
+
+    def update(self, map_state: MapState, tick: int):
+        """Copies the cars, traffic lights and collected points of the map state into
+        the block. Roads are already shared.
+
+        Args:
+            map_state (MapState): The map state of the owner.
+            tick (int): The tick of the state.
+        """
+        cars = self._arrays["cars"]
+        for car_id, (road_key, road_pos) in map_state.get_cars().items():
+            cars[self._car_rows[car_id]] = (self._road_indices[road_key], road_pos)
+
+        traffic_lights = map_state.get_traffic_lights()
+        self._arrays["blocked"][:] = [
+            traffic_lights[node]._blocked_direction
+            for node in self._layout["traffic_light_nodes"]
+        ]
+        for car_id, point in map_state.get_collected_points():
+            row = self._point_rows[(car_id, tuple(point.map_position))]
+            self._arrays["points"][row] = 0
+        self._arrays["tick"][:] = (tick, map_state._ticks_since_switch)
+
+    def create_map_state(self) -> MapState:
+        """Creates a map state with the static layout of the shared map, whose roads
+        are read-only views of the lane buffer. Call load() to bring the rest of its
+        state up to date.
+
+        Returns:
+            MapState: The map state.
+        """
+        map_state = MapState(
+            self._layout["random_seed"],
+            map_array=np.array([list(row) for row in self._layout["map"]]),
+            traffic_light_nodes=self._layout["traffic_light_nodes"],
+        )
+        map_state._set_lanes(self._arrays["lanes"])
+        return map_state
+
+    def load(self, map_state: MapState):
+        """Updates the cars, traffic lights and points of a map state created with
+        create_map_state() from the block.
+
+        Args:
+            map_state (MapState): The map state.
+        """
+        map_state._cars = {
+            car_id: (self._road_keys[road_idx], int(road_pos))
+            for car_id, (road_idx, road_pos) in zip(
+                self._layout["car_ids"], self._arrays["cars"].tolist()
+            )
+        }
+        traffic_lights = map_state.get_traffic_lights()
+        for node, direction in zip(
+            self._layout["traffic_light_nodes"], self._arrays["blocked"].tolist()
+        ):
+            traffic_lights[node]._blocked_direction = Direction(direction)
+        map_state._blocked_roads = None
+        map_state._ticks_since_switch = int(self._arrays["tick"][1])
+
+        mask = self._arrays["points"]
+        if self._loaded_points is None or not np.array_equal(mask, self._loaded_points):
+            points: dict[int, list[Point]] = {}
+            for (car_id, point), collected in zip(self._layout["points"], mask == 0):
+                agent_points = points.setdefault(car_id, [])
+                if not collected:
+                    agent_points.append(point)
+            map_state._points = points
+            self._loaded_points = mask.copy()
+        # the grid is not updated by load(), it is rebuilt when requested
+        map_state._observation_grid = None
+        map_state._state_hash = map_state._compute_state_hash()
+        map_state._version += 1
+
+    def close(self, map_state: MapState | None = None):
+        """Detaches from the block and, in the owner, frees it.
+
+        Args:
+            map_state (MapState | None, optional): The map state whose roads are
+                views of the block. Its roads get private copies of their arrays, so
+                that it can still be used. Defaults to None.
+        """
+        if map_state is not None:
+            map_state._set_lanes(np.array(map_state._lanes))
+        self._arrays.clear()
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
@@ -0,0 +1,102 @@
+from dataclasses import dataclass, replace
+from types import MappingProxyType
+from typing import Mapping
+
+from psi_environment.data.map_state import Direction, MapState
+
+
+@dataclass(frozen=True)
+class MapSnapshot:
+    """Immutable copy of the dynamic part of the map state after a step. Snapshots
+    can be safely handed over to other threads, e.g. to a renderer.
+
+    Attributes:
+        step (int): Number of steps taken before the snapshot was made.
+        cars (Mapping[int, tuple[tuple[int, int], int]]): Mapping from car id to its
+            road key and road position.
+        moved_cars (frozenset[int]): Ids of the cars that moved since the previous
+            snapshot.
+        blocked_directions (Mapping[int, Direction]): Mapping from traffic light node
+            to its currently blocked direction.
+        points (Mapping[int, tuple[tuple[int, int], ...]]): Mapping from agent id to
+            the map positions of the points it has not collected yet.
+    """
+
+    step: int
+    cars: Mapping[int, tuple[tuple[int, int], int]]
+    moved_cars: frozenset[int]
+    blocked_directions: Mapping[int, Direction]
+    points: Mapping[int, tuple[tuple[int, int], ...]]
+
+    @classmethod
+    def from_map_state(
+        cls, map_state: MapState, step: int, moved_cars: frozenset[int]
+    ) -> "MapSnapshot":
+        """Creates a snapshot of the current map state.
+
+        Args:
+            map_state (MapState): The map state to copy.
+            step (int): Number of steps taken so far.
+            moved_cars (frozenset[int]): Ids of the cars that moved in the last step.
+
+        Returns:
+            MapSnapshot: The snapshot.
+        """
+        return cls(
+            step=step,
+            cars=MappingProxyType(dict(map_state.get_cars())),
+            moved_cars=moved_cars,
+            blocked_directions=MappingProxyType(
+                {
+                    node: traffic_light._blocked_direction
+                    for node, traffic_light in map_state.get_traffic_lights().items()
+                }
+            ),
+            points=MappingProxyType(
+                {
+                    car_id: tuple(point.map_position for point in points)
+                    for car_id, points in map_state.get_points().items()
+                }
+            ),
+        )
+
+    def __reduce__(self):
+        # mapping proxies cannot be pickled, so snapshots are sent as plain dicts
+        return (
+            _snapshot_from_dicts,
+            (
+                self.step,
+                dict(self.cars),
+                self.moved_cars,
+                dict(self.blocked_directions),
+                dict(self.points),
+            ),
+        )
+
+    def merge(self, older: "MapSnapshot") -> "MapSnapshot":
+        """Merges this snapshot with an older one that was never consumed, so that
+        the result also reports the cars that moved in the skipped snapshot.
+
+        Args:
+            older (MapSnapshot): The skipped snapshot.
+
+        Returns:
+            MapSnapshot: This snapshot with the moved cars of both snapshots.
+        """
+        return replace(self, moved_cars=self.moved_cars | older.moved_cars)
+
+
+def _snapshot_from_dicts(
+    step: int,
+    cars: dict[int, tuple[tuple[int, int], int]],
+    moved_cars: frozenset[int],
+    blocked_directions: dict[int, Direction],
+    points: dict[int, tuple[tuple[int, int], ...]],
+) -> MapSnapshot:
+    return MapSnapshot(
+        step=step,
+        cars=MappingProxyType(cars),
+        moved_cars=moved_cars,
+        blocked_directions=MappingProxyType(blocked_directions),
+        points=MappingProxyType(points),
+    )
@@ -6,6 +6,12 @@ class StopMode(Enum):
 
     ALL_FINISHED - check if every car collected every point
     ONE_FINISHED - check if at least one car collected every point
+    FIRST_K_FINISHED - check if n_finished cars collected every point
+    MAX_TICKS - check if max_ticks ticks were taken
+    WALL_BUDGET - check if wall_budget seconds passed since the map was created
     """
     ALL_FINISHED = 0
     ONE_FINISHED = 1
+    FIRST_K_FINISHED = 2
+    MAX_TICKS = 3
+    WALL_BUDGET = 4
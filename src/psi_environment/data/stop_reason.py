@@ -0,0 +1,17 @@
+from enum import Enum
+
+
+class StopReason(Enum):
+    """The StopReason enum defines why Environment.run returned
+
+    GAME_OVER - the stop mode of the environment is fulfilled; it is closed
+    CONDITION - the until condition of the run is fulfilled
+    MAX_TICKS - the run took its maximum number of ticks
+    TIME_LIMIT - the run used up its wall-clock time
+    CLOSED - the environment was closed, e.g. its window
+    """
+    GAME_OVER = 0
+    CONDITION = 1
+    MAX_TICKS = 2
+    TIME_LIMIT = 3
+    CLOSED = 4
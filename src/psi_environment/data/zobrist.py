@@ -0,0 +1,118 @@
+import numpy as np
+
+MASK64 = (1 << 64) - 1
+# keys must not depend on the random seed of the map, so that the hashes of map
+# states can be compared between runs
+_KEY_SEED = 0x5A0B
+
+_CAR = 1
+_LIGHT = 2
+_POINT = 3
+_TICK = 4
+
+
+def mix64(value: int) -> int:
+    """Scrambles an integer into a 64-bit key with the splitmix64 finalizer.
+
+    Args:
+        value (int): The integer.
+
+    Returns:
+        int: The key.
+    """
+    value = (value + 0x9E3779B97F4A7C15) & MASK64
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & MASK64
+    return value ^ (value >> 31)
+
+
+def get_key(kind: int, *values: int) -> int:
+    """Returns the key of a part of the state, e.g. a traffic light in a direction.
+
+    Args:
+        kind (int): The kind of the part, one of the constants of this module.
+        *values (int): The integers identifying the part.
+
+    Returns:
+        int: The key.
+    """
+    key = mix64(kind)
+    for value in values:
+        key = mix64(key ^ int(value))
+    return key
+
+
+def get_position_keys(n: int) -> list[int]:
+    """Returns random keys of the cells of a lane buffer.
+
+    Args:
+        n (int): The number of cells.
+
+    Returns:
+        list[int]: The keys.
+    """
+    rng = np.random.default_rng(_KEY_SEED)
+    return rng.integers(0, MASK64, size=n, dtype=np.uint64, endpoint=True).tolist()
+
+
+def get_car_key(car_id: int) -> int:
+    """Returns the key of a car, which multiplies the key of its cell.
+
+    Args:
+        car_id (int): The id of the car.
+
+    Returns:
+        int: The odd key of the car.
+    """
+    return get_key(_CAR, car_id) | 1
+
+
+def get_car_position_key(position_key: int, car_key: int) -> int:
+    """Returns the key of a car at a position.
+
+    Args:
+        position_key (int): The key of the cell.
+        car_key (int): The key of the car.
+
+    Returns:
+        int: The key.
+    """
+    return (position_key * car_key) & MASK64
+
+
+def get_light_key(node: int, direction: int) -> int:
+    """Returns the key of a traffic light blocking a direction.
+
+    Args:
+        node (int): The node of the traffic light.
+        direction (int): The blocked direction.
+
+    Returns:
+        int: The key.
+    """
+    return get_key(_LIGHT, node, direction)
+
+
+def get_point_key(car_id: int, map_position: tuple[int, int]) -> int:
+    """Returns the key of a point that was not collected yet.
+
+    Args:
+        car_id (int): The id of the agent of the point.
+        map_position (tuple[int, int]): The map position of the point.
+
+    Returns:
+        int: The key.
+    """
+    return get_key(_POINT, car_id, *map_position)
+
+
+def get_tick_key(ticks: int) -> int:
+    """Returns the key of the number of ticks since the traffic lights switched.
+
+    Args:
+        ticks (int): The number of ticks.
+
+    Returns:
+        int: The key.
+    """
+    return get_key(_TICK, ticks)
@@ -1,12 +1,18 @@
 import random
-from typing import Type
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Mapping, Type
 
 import numpy as np
 
-from psi_environment.game.game import Game
+from psi_environment.data.agent_server import AgentServer
 from psi_environment.data.map import Map
-from psi_environment.data.car import Car
+from psi_environment.data.action import Action
+from psi_environment.data.car import Car, ExternalAgent
+from psi_environment.data.render_mode import RenderMode
+from psi_environment.data.run_summary import RunSummary
 from psi_environment.data.stop_mode import StopMode
+from psi_environment.data.stop_reason import StopReason
 
 
 class Environment:
@@ -21,6 +27,19 @@ class Environment:
         traffic_lights_length: int = 10,
         random_seed: int = None,
         stop_mode: StopMode = StopMode.ALL_FINISHED,
+        speed_multiplier: float | None = 1.0,
+        background_rendering: bool = False,
+        recording_path: str | None = None,
+        render_mode: RenderMode = RenderMode.WINDOW,
+        frame_export_dir: str | None = None,
+        frame_stride: int = 1,
+        frame_format: str = "png",
+        action_deadline: float | None = None,
+        agent_executor: ThreadPoolExecutor | None = None,
+        agent_server: AgentServer | None = None,
+        n_finished: int = 1,
+        max_ticks: int | None = None,
+        wall_budget: float | None = None,
     ):
         """Environment class to simulate the problem of a small traffic simulation. The
         goal of the simulation is to collect all points on the map in the minimum number
@@ -45,9 +64,52 @@ class Environment:
                 lights switch. Defaults to 10.
             random_seed (int, optional): random seed for the environment.
                 Defaults to None.
+            stop_mode (StopMode, optional): condition for ending the simulation.
+                Defaults to StopMode.ALL_FINISHED.
+            speed_multiplier (float | None, optional): the simulation runs at
+                ticks_per_second * speed_multiplier ticks per second. None runs it as
+                fast as possible. Runs that are not drawn in a window
+                (RenderMode.OFFSCREEN or RenderMode.NONE) are never paced.
+                Defaults to 1.0.
+            background_rendering (bool, optional): if True, the simulation is drawn
+                by a separate process at display frame rate, skipping intermediate
+                states, so rendering does not slow down the simulation.
+                Defaults to False.
+            recording_path (str | None, optional): if set, the simulation is recorded
+                to this file and can be replayed later with ReplayPlayer.
+                Defaults to None.
+            render_mode (RenderMode, optional): where the simulation is drawn. The
+                rendering modules and pygame are imported only if it is drawn at
+                all, so RenderMode.NONE starts quickly. Defaults to RenderMode.WINDOW.
+            frame_export_dir (str | None, optional): if set, rendered frames are
+                saved to this directory. Defaults to None.
+            frame_stride (int, optional): only every frame_stride-th tick is saved.
+                Defaults to 1.
+            frame_format (str, optional): format of the saved frames, "png" for
+                images or "npy" for raw RGB arrays. Defaults to "png".
+            action_deadline (float | None, optional): time in seconds that agents with
+                an async get_action have in every tick. Agents that miss it repeat
+                their last action, or drive forward if they have none. Defaults to
+                None, which waits for all agents.
+            agent_executor (ThreadPoolExecutor | None, optional): thread pool that
+                evaluates agents in parallel on a read-only view of the map state.
+                Defaults to None, which evaluates agents one by one.
+            agent_server (AgentServer | None, optional): server of the agents of type
+                RemoteAgent, which run in separate processes. It is not closed by the
+                environment. Defaults to None.
+            n_finished (int, optional): number of agents that must collect all their
+                points with StopMode.FIRST_K_FINISHED. Defaults to 1.
+            max_ticks (int | None, optional): number of ticks after which the game is
+                over, with StopMode.MAX_TICKS or in addition to any other stop mode.
+                Defaults to None.
+            wall_budget (float | None, optional): wall-clock time in seconds after
+                which the game is over, with StopMode.WALL_BUDGET or in addition to
+                any other stop mode. Defaults to None.
 
         Raises:
-            ValueError: If both agent_type and agent_types are set.
+            ValueError: If both agent_type and agent_types are set, if frames are
+                exported or drawn offscreen with background rendering, or if frames
+                are exported without rendering.
         """
         if random_seed is None:
             random_seed = random.randint(0, 2137)
@@ -56,6 +118,12 @@ class Environment:
 
         if agent_type is not None and agent_types is not None:
             raise ValueError("Only one of agent_type and agent_types can be set.")
+        if background_rendering and (
+            render_mode != RenderMode.WINDOW or frame_export_dir is not None
+        ):
+            raise ValueError("Background rendering only supports drawing in a window.")
+        if render_mode == RenderMode.NONE and frame_export_dir is not None:
+            raise ValueError("Frames cannot be exported without rendering.")
         if agent_type is not None:
             agent_types = [agent_type]
         if agent_types is None:
@@ -68,11 +136,48 @@ class Environment:
             n_points=n_points,
             traffic_lights_percentage=traffic_lights_percentage,
             traffic_lights_length=traffic_lights_length,
-            stop_mode=stop_mode
-        )
-        self._game = Game(
-            self._map, random_seed=random_seed, ticks_per_second=ticks_per_second
+            stop_mode=stop_mode,
+            action_deadline=action_deadline,
+            agent_executor=agent_executor,
+            agent_server=agent_server,
+            n_finished=n_finished,
+            max_ticks=max_ticks,
+            wall_budget=wall_budget,
         )
+        if recording_path is not None:
+            self._map.start_recording(recording_path)
+        tick_rate = 0
+        # nobody watches a run that is not drawn in a window, e.g. one exporting
+        # frames on a server, it is not slowed down to real time
+        if speed_multiplier is not None and render_mode == RenderMode.WINDOW:
+            tick_rate = ticks_per_second * speed_multiplier
+
+        self._game = None
+        self._renderer = None
+        self._frame_exporter = None
+        self._tick_period = 1 / tick_rate if tick_rate else 0
+        self._next_tick_time = time.perf_counter()
+        # rendering modules are imported only when needed, as importing pygame is
+        # slow and headless runs do not need it
+        if background_rendering:
+            from psi_environment.game.renderer import BackgroundRenderer
+
+            self._renderer = BackgroundRenderer(self._map, random_seed=random_seed)
+        elif render_mode != RenderMode.NONE:
+            from psi_environment.game.game import Game
+
+            self._game = Game(
+                self._map,
+                random_seed=random_seed,
+                ticks_per_second=tick_rate,
+                offscreen=render_mode == RenderMode.OFFSCREEN,
+            )
+        if frame_export_dir is not None:
+            from psi_environment.game.export import FrameExporter
+
+            self._frame_exporter = FrameExporter(
+                frame_export_dir, frame_stride, frame_format
+            )
         self._is_running = True
 
     def step(self) -> tuple[int, bool]:
@@ -82,13 +187,179 @@ class Environment:
         Returns:
             tuple[int, bool]: Current cost and if the game is still running
         """
+        self._advance()
+        return self.get_timestep(), self.is_running()
+
+    def run(
+        self,
+        max_ticks: int | None = None,
+        until: StopMode | Callable[["Environment"], bool] | None = None,
+        callback: Callable[["Environment"], Any] | None = None,
+        callback_every: int = 1,
+        max_seconds: float | None = None,
+    ) -> RunSummary:
+        """Advances the simulation until the game is over or another stop condition
+        is fulfilled. It is faster than calling step() in a loop, as nothing is
+        returned or checked per step besides the stop conditions.
+
+        Args:
+            max_ticks (int | None, optional): Maximum number of ticks to take in this
+                run. Defaults to None, which sets no limit besides the limits of the
+                environment.
+            until (StopMode | Callable[[Environment], bool] | None, optional): Stops
+                the run without closing the environment, when this stop mode is
+                fulfilled or this function returns True after a tick. Defaults to
+                None, which only stops when the game is over.
+            callback (Callable[[Environment], Any] | None, optional): Called with the
+                environment after every callback_every-th tick of the run, e.g. to
+                log progress. Defaults to None.
+            callback_every (int, optional): Number of ticks between callbacks.
+                Defaults to 1.
+            max_seconds (float | None, optional): Wall-clock time after which the
+                run stops, checked after every tick. Defaults to None, which sets no
+                limit.
+
+        Raises:
+            ValueError: If callback_every is less than 1.
+
+        Returns:
+            RunSummary: Why the run stopped, how many ticks it took, how long, how
+                many points are left and when the agents finished.
+        """
+        if callback_every < 1:
+            raise ValueError("callback_every must be at least 1")
+        stop_mode = until if isinstance(until, StopMode) else None
+        condition = until if stop_mode is None else None
+        start = time.perf_counter()
+        deadline = start + max_seconds if max_seconds is not None else None
+        ticks = 0
+        stop_reason = StopReason.CLOSED
+        while self.is_running():
+            if max_ticks is not None and ticks >= max_ticks:
+                stop_reason = StopReason.MAX_TICKS
+                break
+            game_over = self._advance()
+            ticks += 1
+            if callback is not None and ticks % callback_every == 0:
+                callback(self)
+            if game_over:
+                stop_reason = StopReason.GAME_OVER
+                break
+            if (stop_mode is not None and self._map.is_game_over(stop_mode)) or (
+                condition is not None and condition(self)
+            ):
+                stop_reason = StopReason.CONDITION
+                break
+            if deadline is not None and time.perf_counter() >= deadline:
+                stop_reason = StopReason.TIME_LIMIT
+                break
+
+        scores = self._map.get_scoreboard().get_scores()
+        return RunSummary(
+            stop_reason=stop_reason,
+            ticks=ticks,
+            timestep=self.get_timestep(),
+            elapsed=time.perf_counter() - start,
+            points_left={car_id: score.points_left for car_id, score in scores.items()},
+            finish_ticks={
+                car_id: score.finish_tick for car_id, score in scores.items()
+            },
+        )
+
+    def step_batch(
+        self, actions: Mapping[int, Action] | np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray, dict[str, Any]]:
+        """Sets the actions of the ExternalAgent cars and advances the simulation by
+        one step, e.g. with actions decided by a single batched model call for all
+        agents. Bots are always driven by the simulation.
+
+        Args:
+            actions (Mapping[int, Action] | np.ndarray): Actions of the ExternalAgent
+                cars, either a mapping from car id to action or an array of actions
+                ordered as info["agent_ids"]. Agents without an action drive forward.
+
+        Raises:
+            ValueError: If an action is given for a car that is not an ExternalAgent,
+                or if the array does not have one action per agent.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray, np.ndarray, dict[str, Any]]: Observations
+                of shape (agents, channels, height, width) as in
+                EnvironmentAPI.get_observation, rewards (points collected in this
+                step), done flags (all points collected) and info with "agent_ids",
+                "timestep" and "running".
+        """
+        self._set_actions(actions)
+        self._advance()
+        return self._get_transition()
+
+    def _advance(self) -> bool:
         self._map.step()
-        self._game.step()
+        if self._game is not None:
+            self._game.step()
+            if self._frame_exporter is not None:
+                self._frame_exporter.submit(
+                    self.get_timestep(), self._game.get_surface()
+                )
+        else:
+            if self._renderer is not None:
+                self._renderer.submit(self._map.get_snapshot())
+            self._wait_for_next_tick()
         if self._map.is_game_over():
+            self.close()
+            return True
+        return False
+
+    def close(self):
+        """Stops the simulation and releases its resources: finishes the recording,
+        writes the remaining exported frames and stops the renderer and the game
+        window. It is called when the game is over; call it when a run ends in any
+        other way, e.g. after the window was closed. Calling it again has no effect.
+        """
+        self._is_running = False
+        self._map.close()
+        if self._frame_exporter is not None:
+            self._frame_exporter.close()
+            self._frame_exporter = None
+        if self._renderer is not None:
+            self._renderer.stop()
+        if self._game is not None:
             self._game.stop()
-            print("Game over!")
-            print(f"Cost: {self.get_timestep()}")
-        return self.get_timestep(), self.is_running()
+
+    def _set_actions(self, actions: Mapping[int, Action] | np.ndarray):
+        agents = self._map._agents
+        if not isinstance(actions, Mapping):
+            agent_ids = list(agents)
+            if len(actions) != len(agent_ids):
+                raise ValueError(
+                    f"Expected {len(agent_ids)} actions, got {len(actions)}."
+                )
+            actions = dict(zip(agent_ids, actions))
+        for car_id, action in actions.items():
+            agent = agents.get(car_id)
+            if not isinstance(agent, ExternalAgent):
+                raise ValueError(f"Car {car_id} is not an ExternalAgent.")
+            agent.set_action(action)
+
+    def _get_transition(
+        self,
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray, dict[str, Any]]:
+        map_state = self._map.get_map_state()
+        grid = map_state.get_observation_grid()
+        agent_ids = grid.get_agent_ids()
+        agent_indices = {car_id: idx for idx, car_id in enumerate(agent_ids)}
+
+        rewards = np.zeros(len(agent_ids))
+        for car_id, _ in map_state.get_collected_points():
+            rewards[agent_indices[car_id]] += 1
+        points = map_state.get_points()
+        dones = np.array([len(points[car_id]) == 0 for car_id in agent_ids])
+        info = {
+            "agent_ids": agent_ids,
+            "timestep": self.get_timestep(),
+            "running": self.is_running(),
+        }
+        return grid.get_observations(), rewards, dones, info
 
     def get_timestep(self) -> int:
         """Returns the current timestep.
@@ -96,7 +367,20 @@ class Environment:
         Returns:
             int: Current timestep
         """
-        return self._game.get_timestep()
+        return self._map.get_timestep()
+
+    def _wait_for_next_tick(self):
+        """Sleeps until the next tick is due, to keep the simulation speed when no
+        game window paces it."""
+        if self._tick_period == 0:
+            return
+        self._next_tick_time += self._tick_period
+        delay = self._next_tick_time - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        else:
+            # the simulation fell behind; do not try to catch up with a burst
+            self._next_tick_time = time.perf_counter()
 
     def reset(self):
         """Resets the environment. Not implemented yet.
@@ -113,5 +397,8 @@ class Environment:
         Returns:
             bool: True if the game is running, False otherwise
         """
-        self._is_running = self._game.is_running()
+        if self._renderer is not None:
+            self._is_running = self._is_running and self._renderer.is_running()
+        if self._game is not None:
+            self._is_running = self._is_running and self._game.is_running()
         return self._is_running
@@ -0,0 +1,93 @@
+import importlib.resources
+
+import numpy as np
+import pygame
+
+RESOURCES_PACKAGE = "psi_environment.game.resources"
+
+# Loaded images and derived sprites are shared by all Game instances.
+_images: dict[str, pygame.Surface] = {}
+_sprites: dict[
+    tuple[str, tuple[int, int, int] | None, float, tuple[int, int] | None],
+    pygame.Surface,
+] = {}
+
+
+def load_image(name: str) -> pygame.Surface:
+    """Loads an image from the package resources. Every image is loaded only once,
+    later calls return the cached surface.
+
+    Args:
+        name (str): File name of the image in the resources package.
+
+    Returns:
+        pygame.Surface: The loaded image.
+    """
+    image = _images.get(name)
+    if image is None:
+        resource = importlib.resources.files(RESOURCES_PACKAGE).joinpath(name)
+        with resource.open("rb") as f:
+            image = pygame.image.load(f, name)
+        _images[name] = image
+    return image
+
+
+def tint(
+    image: pygame.Surface, color: tuple[int, int, int], blend_factor: float
+) -> pygame.Surface:
+    """Blends every visible pixel of the image with the given color.
+
+    Args:
+        image (pygame.Surface): The image to tint. It is not modified.
+        color (tuple[int, int, int]): RGB color to blend with.
+        blend_factor (float): Weight of the new color, from 0 to 1.
+
+    Returns:
+        pygame.Surface: Tinted copy of the image.
+    """
+    new_image = image.copy()
+    rgb = pygame.surfarray.pixels3d(new_image)
+    blended = rgb * (1 - blend_factor) + np.asarray(color) * blend_factor
+    if new_image.get_flags() & pygame.SRCALPHA:
+        visible = pygame.surfarray.pixels_alpha(new_image) != 0
+        rgb[visible] = blended[visible]
+    else:
+        rgb[...] = blended
+    # surfarray views lock the surface until they are released
+    del rgb
+    return new_image
+
+
+def get_sprite(
+    name: str,
+    color: tuple[int, int, int] | None = None,
+    blend_factor: float = 0.7,
+    size: tuple[int, int] | None = None,
+) -> pygame.Surface:
+    """Returns an optionally tinted and scaled version of a resource image. Results
+    are cached by (name, color, blend factor, size).
+
+    Args:
+        name (str): File name of the image in the resources package.
+        color (tuple[int, int, int] | None, optional): Tint color. Defaults to None,
+            which keeps the original colors.
+        blend_factor (float, optional): Weight of the tint color. Defaults to 0.7.
+        size (tuple[int, int] | None, optional): Target size in pixels. Defaults to
+            None, which keeps the original size.
+
+    Returns:
+        pygame.Surface: The sprite.
+    """
+    key = (name, color, blend_factor, size)
+    sprite = _sprites.get(key)
+    if sprite is None:
+        if size is not None:
+            sprite = pygame.transform.scale(
+                get_sprite(name, color, blend_factor), size
+            )
+        elif color is not None:
+            sprite = tint(load_image(name), color, blend_factor)
+        else:
+            sprite = load_image(name)
+        _sprites[key] = sprite
+    return sprite
@@ -0,0 +1,155 @@
+import os
+import struct
+import zlib
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import numpy as np
+import pygame
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+IMAGE_FORMATS = ("png", "npy")
+
+
+def _png_chunk(chunk_type: bytes, data: bytes) -> bytes:
+    return (
+        struct.pack(">I", len(data))
+        + chunk_type
+        + data
+        + struct.pack(">I", zlib.crc32(chunk_type + data))
+    )
+
+
+def encode_png(rgb: np.ndarray, compression_level: int = 6) -> bytes:
+    """Encodes an RGB image as PNG.
+
+    The encoder is written with zlib, which releases the GIL while compressing, so
+    several images can be encoded in parallel threads.
+
+    Args:
+        rgb (np.ndarray): (height, width, 3) uint8 array with the image.
+        compression_level (int, optional): zlib compression level, from 0 to 9.
+            Defaults to 6.
+
+    Returns:
+        bytes: The PNG file content.
+    """
+    height, width, _ = rgb.shape
+    # every scanline starts with its filter type, 0 means no filter
+    scanlines = np.zeros((height, width * 3 + 1), dtype=np.uint8)
+    scanlines[:, 1:] = rgb.reshape(height, width * 3)
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (
+        PNG_SIGNATURE
+        + _png_chunk(b"IHDR", header)
+        + _png_chunk(b"IDAT", zlib.compress(scanlines.tobytes(), compression_level))
+        + _png_chunk(b"IEND", b"")
+    )
+
+
+class FrameExporter:
+    """Saves rendered frames to a directory as PNG images or raw RGB arrays (.npy),
+    e.g. for thumbnails or for encoding a video.
+
+    Only every stride-th frame is saved. The frame is copied on the calling thread
+    and encoded and written by a pool of worker threads, so that exporting does not
+    slow down the simulation loop.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        stride: int = 1,
+        image_format: str = "png",
+        workers: int | None = None,
+        max_pending: int | None = None,
+        compression_level: int = 1,
+    ):
+        """Initializes the exporter and creates the output directory.
+
+        Args:
+            directory (str): Directory for the frames. Files are named
+                frame_<step>.<format>.
+            stride (int, optional): Only steps divisible by stride are saved.
+                Defaults to 1.
+            image_format (str, optional): "png" or "npy". Defaults to "png".
+            workers (int | None, optional): Number of encoding threads. Defaults to
+                None, which means one per CPU.
+            max_pending (int | None, optional): Maximum number of frames waiting for
+                encoding; submit() blocks when it is reached, to bound memory use.
+                Defaults to None, which means 4 frames per worker.
+            compression_level (int, optional): zlib compression level of PNG frames,
+                from 0 to 9. Higher levels give smaller files but take much longer
+                to encode. Defaults to 1.
+
+        Raises:
+            ValueError: If stride is not positive or the format is not supported.
+        """
+        if stride < 1:
+            raise ValueError("Stride must be positive")
+        if image_format not in IMAGE_FORMATS:
+            raise ValueError(f"Image format must be one of {IMAGE_FORMATS}")
+        os.makedirs(directory, exist_ok=True)
+        self._directory = directory
+        self._stride = stride
+        if workers is None:
+            workers = os.cpu_count() or 1
+        self._image_format = image_format
+        self._compression_level = compression_level
+        self._max_pending = max_pending if max_pending is not None else 4 * workers
+        self._executor = ThreadPoolExecutor(workers, thread_name_prefix="frame-export")
+        self._pending: deque[Future] = deque()
+
+    def get_frame_path(self, step: int) -> str:
+        """Returns the path of the file for the frame of the given step.
+
+        Args:
+            step (int): The step of the frame.
+
+        Returns:
+            str: The file path.
+        """
+        return os.path.join(self._directory, f"frame_{step:06d}.{self._image_format}")
+
+    def submit(self, step: int, surface: pygame.Surface) -> bool:
+        """Schedules saving the surface as the frame of the given step, if the step
+        falls on the stride.
+
+        Args:
+            step (int): The step of the frame.
+            surface (pygame.Surface): The surface with the frame.
+
+        Returns:
+            bool: True if the frame will be saved, False if it was skipped.
+        """
+        if step % self._stride != 0:
+            return False
+        while len(self._pending) >= self._max_pending:
+            self._pending.popleft().result()
+
+        width, height = surface.get_size()
+        rgb = np.frombuffer(pygame.image.tobytes(surface, "RGB"), dtype=np.uint8)
+        rgb = rgb.reshape(height, width, 3)
+        self._pending.append(
+            self._executor.submit(self._write, self.get_frame_path(step), rgb)
+        )
+        return True
+
+    def _write(self, path: str, rgb: np.ndarray):
+        if self._image_format == "png":
+            with open(path, "wb") as f:
+                f.write(encode_png(rgb, self._compression_level))
+        else:
+            np.save(path, rgb)
+
+    def close(self):
+        """Waits until all frames are written and stops the worker threads.
+
+        Raises:
+            Exception: The first error raised while writing a frame.
+        """
+        try:
+            while self._pending:
+                self._pending.popleft().result()
+        finally:
+            self._executor.shutdown()
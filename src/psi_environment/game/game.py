@@ -1,8 +1,10 @@
-from typing import Any
-import random
+from typing import Any, Iterable, Mapping
 import pygame
-import importlib.resources
 from psi_environment.data.map import Map
+from psi_environment.data.map_state import MapState
+from psi_environment.data.snapshot import MapSnapshot
+from psi_environment.game.assets import get_sprite, load_image, tint
+from psi_environment.game.particles import ParticleSystem
 from enum import IntEnum
 
 
@@ -25,6 +27,9 @@ PRE_COLOR = [
 ]
 
 
+BLEND_RATE = 0.7
+
+
 class Direction(IntEnum):
     UP = 0
     RIGHT = 1
@@ -32,128 +37,145 @@ class Direction(IntEnum):
     LEFT = 3
 
 
-class Particle:
-    def __init__(self, pos, direction, color, lifespan):
-        self.pos = pos
-        self.direction = direction
-        self.color = color
-        self.lifespan = lifespan
-        self.age = 0
-
-    def update(self):
-        self.age += 1
-        if self.age < self.lifespan:
-            self.pos[0] += self.direction[0]
-            self.pos[1] += self.direction[1]
-            alpha = int((1 - self.age / self.lifespan) * 255)
-            self.color = (self.color[0], self.color[1], self.color[2], alpha)
-        else:
-            self.color = (self.color[0], self.color[1], self.color[2], 0)
+CAR_IMAGES = {
+    Direction.UP: "car_up_white.png",
+    Direction.DOWN: "car_down_white.png",
+    Direction.LEFT: "car_left_white.png",
+    Direction.RIGHT: "car_right_white.png",
+}
+STAR_IMAGE = "star.png"
+LIGHT_COLOR_RED = (255, 0, 0)
+LIGHT_COLOR_GREEN = (0, 255, 0)
+PARTICLE_DIRECTIONS = {
+    Direction.UP: [0, -1],
+    Direction.DOWN: [0, 1],
+    Direction.LEFT: [-1, 0],
+    Direction.RIGHT: [1, 0],
+}
 
-    def is_alive(self):
-        return self.age < self.lifespan
+
+# number of games that were created and not stopped yet
+_live_games = 0
 
 
 class Game:
-    def __init__(self, map: Map, random_seed: int = None, ticks_per_second: int = 10):
+    def __init__(
+        self,
+        map: Map,
+        random_seed: int = None,
+        ticks_per_second: int = 10,
+        offscreen: bool = False,
+    ):
+        self._map = map
+        self._setup(
+            map.get_map_state(),
+            map._agents.keys(),
+            map._random_seed,
+            random_seed,
+            ticks_per_second,
+            offscreen,
+        )
+
+    @classmethod
+    def from_map_state(
+        cls,
+        map_state: MapState,
+        agent_ids: Iterable[int],
+        map_seed: int,
+        random_seed: int = None,
+        ticks_per_second: int = 10,
+        offscreen: bool = False,
+    ) -> "Game":
+        """Creates a game that draws the given map without a Map instance, so no car
+        agents are created. Such a game can only render snapshots passed to render().
+
+        Args:
+            map_state (MapState): Map state with the static layout of the map.
+            agent_ids (Iterable[int]): Ids of the agent cars.
+            map_seed (int): Random seed of the map, used to pick grass tiles.
+            random_seed (int, optional): Random seed of the game. Defaults to None.
+            ticks_per_second (int, optional): Frame rate limit. Defaults to 10.
+            offscreen (bool, optional): If True, frames are drawn on an in-memory
+                surface instead of a window. Defaults to False.
+
+        Returns:
+            Game: The game.
+        """
+        game = cls.__new__(cls)
+        game._map = None
+        game._setup(
+            map_state, agent_ids, map_seed, random_seed, ticks_per_second, offscreen
+        )
+        return game
+
+    def _setup(
+        self,
+        map_state: MapState,
+        agent_ids: Iterable[int],
+        map_seed: int,
+        random_seed: int,
+        ticks_per_second: int,
+        offscreen: bool,
+    ):
         self._random_seed = random_seed
         self._timestep = 0
-        self._map = map
-        self._crossroads = map.get_map_state().get_map_array()
-        
+        self._map_state = map_state
+        self._crossroads = map_state.get_map_array()
+        self.map_seed = map_seed
+
+        global _live_games
+        _live_games += 1
+        self._released = False
         pygame.init()
-        pygame.display.set_caption("Traffic simulation")
+        pygame.font.init()
         self.aspect_ratio = 1280 / 720
-        self._screen = pygame.display.set_mode((1280, 720), pygame.RESIZABLE)
-        self.tile_size = 1280 // 30
-        self.car_size = self.tile_size // 2
+        self._offscreen = offscreen
+        if offscreen:
+            self._screen = pygame.Surface((1280, 720))
+        else:
+            pygame.display.set_caption("Traffic simulation")
+            self._screen = pygame.display.set_mode((1280, 720), pygame.RESIZABLE)
+        self._font = pygame.font.SysFont("Comic Sans MS", 10)
         self._clock = pygame.time.Clock()
         self._ticks_per_second = ticks_per_second
         self._running = True
-        self._agents = self._map._agents
-        self.particles = []
+        self._agents = list(agent_ids)
+        self.particles = ParticleSystem.for_emitters(
+            len(self._agents), PRE_COLOR, 0, random_seed
+        )
         self._init_images()
         self._crossroads_positions = dict()
-        cros_id = 0
-        for idy, y in enumerate(self._crossroads):
-            for idx, x in enumerate(y):
-                if x == "x":
-                    self._crossroads_positions[cros_id] = [
-                        idx * self.tile_size,
-                        idy * self.tile_size,
-                    ]
-                    cros_id += 1
+        self._background = None
+        self._update_layout(*self._screen.get_size())
 
     def _init_images(self):
         # road tiles
-        with importlib.resources.path(
-            "psi_environment.game.resources", "road_vertical1.png"
-        ) as road_vert_path:
-            self.road_vert = pygame.image.load(str(road_vert_path))
-        with importlib.resources.path(
-            "psi_environment.game.resources", "road_horizontal1.png"
-        ) as road_hori_path:
-            self.road_hori = pygame.image.load(str(road_hori_path))
-        with importlib.resources.path(
-            "psi_environment.game.resources", "crossroad1.png"
-        ) as crossroad_path:
-            self.crossroad = pygame.image.load(str(crossroad_path))
+        self.road_vert = load_image("road_vertical1.png")
+        self.road_hori = load_image("road_horizontal1.png")
+        self.crossroad = load_image("crossroad1.png")
 
         # env  tiles
-        with importlib.resources.path(
-            "psi_environment.game.resources", "grass_flower_yellow.png"
-        ) as grass_flower_yellow_path:
-            self.grass_flower_yellow = pygame.image.load(str(grass_flower_yellow_path))
-        with importlib.resources.path(
-            "psi_environment.game.resources", "grass_flower.png"
-        ) as grass_flower_path:
-            self.grass_flower = pygame.image.load(str(grass_flower_path))
-        with importlib.resources.path(
-            "psi_environment.game.resources", "grass_hay.png"
-        ) as grass_hay_path:
-            self.grass_hay = pygame.image.load(str(grass_hay_path))
-        with importlib.resources.path(
-            "psi_environment.game.resources", "grass_hay_2.png"
-        ) as grass_hay2_path:
-            self.grass_hay2 = pygame.image.load(str(grass_hay2_path))
-        with importlib.resources.path(
-            "psi_environment.game.resources", "grass_no_stalk.png"
-        ) as grass_no_stalk_path:
-            self.grass_no_stalk = pygame.image.load(str(grass_no_stalk_path))
-        with importlib.resources.path(
-            "psi_environment.game.resources", "brick_tile.png"
-        ) as gbrick_tile_path:
-            self.brick_tile = pygame.image.load(str(gbrick_tile_path))
+        self.grass_flower_yellow = load_image("grass_flower_yellow.png")
+        self.grass_flower = load_image("grass_flower.png")
+        self.grass_hay = load_image("grass_hay.png")
+        self.grass_hay2 = load_image("grass_hay_2.png")
+        self.grass_no_stalk = load_image("grass_no_stalk.png")
+        self.brick_tile = load_image("brick_tile.png")
 
         # car tiles
-        with importlib.resources.path(
-            "psi_environment.game.resources", "car_left_white.png"
-        ) as car_left_path:
-            self.car_left = pygame.image.load(str(car_left_path))
-        with importlib.resources.path(
-            "psi_environment.game.resources", "car_right_white.png"
-        ) as car_right_path:
-            self.car_right = pygame.image.load(str(car_right_path))
-        with importlib.resources.path(
-            "psi_environment.game.resources", "car_up_white.png"
-        ) as car_up_path:
-            self.car_up = pygame.image.load(str(car_up_path))
-        with importlib.resources.path(
-            "psi_environment.game.resources", "car_down_white.png"
-        ) as car_down_path:
-            self.car_down = pygame.image.load(str(car_down_path))
+        self.car_left = load_image(CAR_IMAGES[Direction.LEFT])
+        self.car_right = load_image(CAR_IMAGES[Direction.RIGHT])
+        self.car_up = load_image(CAR_IMAGES[Direction.UP])
+        self.car_down = load_image(CAR_IMAGES[Direction.DOWN])
 
         # additional tiles
-        with importlib.resources.path(
-            "psi_environment.game.resources", "star.png"
-        ) as star_path:
-            self.star = pygame.image.load(str(star_path))
+        self.star = load_image(STAR_IMAGE)
 
         self.colored_cars = {}
-        self.create_colored_cars(self._agents.keys())
-        
+        self.create_colored_cars(self._agents)
+
         self.colored_stars = {}
-        self.create_colored_stars(self._agents.keys())
+        self.create_colored_stars(self._agents)
 
         self.env_tiles = [
             self.grass_flower_yellow,
@@ -164,26 +186,22 @@ class Game:
             self.brick_tile,
         ]
 
-        self.map_seed = self._map._random_seed
-
 
     def update_particles(self):
-        for particle in self.particles:
-            particle.update()
-        self.particles = [p for p in self.particles if p.is_alive()]
-
-    def create_particles(self, car_pos, direction, color):
-        for _ in range(5):  # Create 5 particles per update
-            offset = [random.randint(-5, 5), random.randint(-5, 5)]
-            particle_pos = [car_pos[0] + self.car_size // 2 + offset[0], car_pos[1] + self.car_size // 2 + offset[1]]
-            particle_direction = [direction[0] * random.uniform(0.5, 1.5), direction[1] * random.uniform(0.5, 1.5)]
-            particle_color = color
-            lifespan = random.randint(3, 10)  # Lifespan between 20 and 40 frames
-            self.particles.append(Particle(particle_pos, particle_direction, particle_color, lifespan))
-
+        self.particles.update()
 
     def __del__(self):
-        pygame.quit()
+        self._release()
+
+    def _release(self):
+        # pygame is shared by all games, so it is closed only with the last one
+        global _live_games
+        if getattr(self, "_released", True):
+            return
+        self._released = True
+        _live_games -= 1
+        if _live_games == 0:
+            pygame.quit()
 
     def step(self):
         self._timestep += 1
@@ -194,12 +212,29 @@ class Game:
     def get_timestep(self) -> int:
         return self._timestep
 
+    def get_surface(self) -> pygame.Surface:
+        """Returns the surface the frames are drawn on: the window surface or, in
+        offscreen mode, the in-memory surface.
+
+        Returns:
+            pygame.Surface: The surface with the last drawn frame.
+        """
+        return self._screen
+
+    def set_ticks_per_second(self, ticks_per_second: float):
+        """Changes the frame rate limit, 0 disables it.
+
+        Args:
+            ticks_per_second (float): Maximum number of frames per second.
+        """
+        self._ticks_per_second = ticks_per_second
+
     def reset(self):
         raise NotImplementedError
 
     def stop(self):
         self._running = False
-        pygame.quit()
+        self._release()
 
     def blend_colors(self, color1, color2, blend_factor):
         blended_color = (
@@ -211,307 +246,385 @@ class Game:
         return blended_color
 
     def change_color(self, image, new_color, blend_factor):
-        new_image = image.copy()
-        new_image.lock()
-        width, height = new_image.get_size()
-
-        for x in range(width):
-            for y in range(height):
-                pixel_color = new_image.get_at((x, y))
-
-                if pixel_color.a != 0:
-                    blended_color = self.blend_colors(
-                        pixel_color, new_color, blend_factor
-                    )
-                    new_image.set_at((x, y), blended_color)
-
-        new_image.unlock()
-        return new_image
+        return tint(image, new_color, blend_factor)
 
     def create_colored_cars(self, agent_car_list):
-        BLEND_RATE = 0.7
         for car_id in agent_car_list:
             new_color = PRE_COLOR[car_id % len(PRE_COLOR)]
             self.colored_cars[car_id] = {
-                Direction.UP: self.change_color(self.car_up, new_color, BLEND_RATE),
-                Direction.DOWN: self.change_color(self.car_down, new_color, BLEND_RATE),
-                Direction.LEFT: self.change_color(self.car_left, new_color, BLEND_RATE),
-                Direction.RIGHT: self.change_color(
-                    self.car_right, new_color, BLEND_RATE
-                ),
-            } 
-   
+                direction: get_sprite(name, new_color, BLEND_RATE)
+                for direction, name in CAR_IMAGES.items()
+            }
+
     def create_colored_stars(self, agent_car_list):
-        BLEND_RATE = 0.7
         for car_id in agent_car_list:
             new_color = PRE_COLOR[car_id % len(PRE_COLOR)]
-            self.colored_stars[car_id] = self.change_color(self.star, new_color, BLEND_RATE)
-
+            self.colored_stars[car_id] = get_sprite(STAR_IMAGE, new_color, BLEND_RATE)
+
+    def get_car_sprite(self, car_id: int, direction: Direction) -> pygame.Surface:
+        """Returns the car sprite scaled to the current car size, tinted with the
+        agent color for agent cars.
+
+        Args:
+            car_id (int): Id of the car.
+            direction (Direction): Direction the car is facing.
+
+        Returns:
+            pygame.Surface: The car sprite.
+        """
+        color = None
+        if car_id in self.colored_cars:
+            color = PRE_COLOR[car_id % len(PRE_COLOR)]
+        size = (self.car_size, self.car_size)
+        return get_sprite(CAR_IMAGES[direction], color, BLEND_RATE, size)
+
+    def _update_layout(self, width: int, height: int):
+        """Recomputes tile sizes and positions for the given window size and rebuilds
+        the cached background.
+
+        Args:
+            width (int): Window width in pixels.
+            height (int): Window height in pixels.
+        """
+        self.tile_size = width // self._crossroads.shape[1]
+        self.car_size = self.tile_size // 2
+        self.particles.set_size(self.car_size // 8)
+        cros_id = 0
+        for idy, y in enumerate(self._crossroads):
+            for idx, x in enumerate(y):
+                if x == "x":
+                    self._crossroads_positions[cros_id] = [
+                        idx * self.tile_size,
+                        idy * self.tile_size,
+                    ]
+                    cros_id += 1
+        self._background = self._build_background(width, height)
+        self._build_car_tables()
+        self._node_tiles = {
+            node: (x // self.tile_size, y // self.tile_size)
+            for node, (x, y) in self._crossroads_positions.items()
+        }
+        self._full_redraw = True
+
+    def _build_car_tables(self):
+        """Precomputes pixel coordinates and direction of every road position and
+        scales car sprites for the current car size."""
+        map_state = self._map_state
+        self._car_cells = {}
+        self._cell_tiles = {}
+        self._tile_cells = {}
+        for road_key, road in map_state.get_roads().items():
+            x, y = map_state.get_node_map_position(road_key[0])
+            direction = Direction(map_state._edges[road_key])
+            for road_pos in range(road.get_length()):
+                match direction:
+                    case Direction.UP:
+                        car_pos = (
+                            x * self.tile_size + self.car_size,
+                            (y - 1) * self.tile_size - (road_pos - 1) * self.car_size,
+                        )
+                    case Direction.DOWN:
+                        car_pos = (
+                            x * self.tile_size,
+                            (y + 1) * self.tile_size + road_pos * self.car_size,
+                        )
+                    case Direction.LEFT:
+                        car_pos = (
+                            x * self.tile_size - (road_pos + 1) * self.car_size,
+                            y * self.tile_size,
+                        )
+                    case Direction.RIGHT:
+                        car_pos = (
+                            (x + 1) * self.tile_size + road_pos * self.car_size,
+                            y * self.tile_size + self.car_size,
+                        )
+                self._car_cells[(road_key, road_pos)] = (*car_pos, direction)
+                tile = (car_pos[0] // self.tile_size, car_pos[1] // self.tile_size)
+                self._cell_tiles[(road_key, road_pos)] = tile
+                self._tile_cells.setdefault(tile, []).append((road_key, road_pos))
+
+        # bot car ids are never in colored_cars, so 0 gives the untinted sprites
+        self._bot_sprites = {
+            direction: self.get_car_sprite(0, direction) for direction in Direction
+        }
+        self._agent_sprites = {
+            car_id: {
+                direction: self.get_car_sprite(car_id, direction)
+                for direction in Direction
+            }
+            for car_id in self.colored_cars
+        }
+
+    def _build_background(self, width: int, height: int) -> pygame.Surface:
+        """Pre-renders the static layers of the map: road, crossroad and grass tiles
+        together with node labels.
+
+        Args:
+            width (int): Width of the background in pixels.
+            height (int): Height of the background in pixels.
+
+        Returns:
+            pygame.Surface: Surface with the static part of the frame.
+        """
+        background = pygame.Surface((width, height))
+        background.fill((115, 116, 27))
+
+        tile_size = (self.tile_size, self.tile_size)
+        crossroad = pygame.transform.scale(self.crossroad, tile_size)
+        road_hori = pygame.transform.scale(self.road_hori, tile_size)
+        road_vert = pygame.transform.scale(self.road_vert, tile_size)
+        env_tiles = [pygame.transform.scale(tile, tile_size) for tile in self.env_tiles]
 
-    def render(self):
+        count = 0
+        for idy, y in enumerate(self._crossroads):
+            for idx, x in enumerate(y):
+                pos = [idx * self.tile_size, idy * self.tile_size]
+                if x == "x":
+                    text_surface = self._font.render(f"{count}", False, (255, 255, 255))
+                    count += 1
+                    background.blit(crossroad, pos)
+                    background.blit(text_surface, pos)
+                elif x == "=":
+                    background.blit(road_hori, pos)
+                elif x == "|":
+                    background.blit(road_vert, pos)
+                elif x == "#":
+                    tile = env_tiles[(self.map_seed + (idx * idy + 1)) % len(env_tiles)]
+                    background.blit(tile, pos)
+        return background
+
+    def handle_events(self):
+        """Processes window events: closing and resizing the window."""
+        if self._offscreen:
+            return
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 self._running = False
             elif event.type == pygame.VIDEORESIZE:
                 new_width = event.w
                 new_height = int(new_width / self.aspect_ratio)
-                self.tile_size = new_width // 30
-                self.car_size = self.tile_size // 2
                 self._screen = pygame.display.set_mode(
                     (new_width, new_height), pygame.RESIZABLE
                 )
-                cros_id = 0
-                for idy, y in enumerate(self._crossroads):
-                    for idx, x in enumerate(y):
-                        if x == "x":
-                            self._crossroads_positions[cros_id] = [
-                                idx * self.tile_size,
-                                idy * self.tile_size,
-                            ]
-                            cros_id += 1
-
-        self._screen.fill((115,116,27))
-        pygame.font.init()
-        my_font = pygame.font.SysFont("Comic Sans MS", 10)
-        count = 0
-        for idy, y in enumerate(self._crossroads):
-            for idx, x in enumerate(y):
-                if x == "x":
-                    self.crossroad = pygame.transform.scale(
-                        self.crossroad, (self.tile_size, self.tile_size)
-                    )
-                    text_surface = my_font.render(f"{count}", False, (255, 255, 255))
-                    count += 1
-                    self._screen.blit(
-                        self.crossroad, [idx * self.tile_size, idy * self.tile_size]
-                    )
-                    self._screen.blit(
-                        text_surface, [idx * self.tile_size, idy * self.tile_size]
-                    )
+                self._update_layout(new_width, new_height)
+
+    def render(self, snapshot: MapSnapshot | None = None):
+        """Draws a frame and waits to keep the configured frame rate.
+
+        Args:
+            snapshot (MapSnapshot | None, optional): The state to draw. Defaults to
+                None, which draws the current state of the map.
+        """
+        if snapshot is None:
+            snapshot = self._map.get_snapshot()
+        self.handle_events()
+
+        emitters = [self._car_cells[snapshot.cars[car_id]] for car_id in self._agents]
+        self.particles.emit(
+            [(x + self.car_size // 2, y + self.car_size // 2) for x, y, _ in emitters],
+            [PARTICLE_DIRECTIONS[direction] for _, _, direction in emitters],
+            [car_id % len(PRE_COLOR) for car_id in self._agents],
+        )
+        particle_tiles = self.particles.get_tiles(self.tile_size)
+
+        # past this many changed tiles a full redraw is cheaper
+        max_dirty_tiles = self._crossroads.size // 8
+        dirty_tiles = None
+        if not self._full_redraw and len(snapshot.moved_cars) < max_dirty_tiles:
+            dirty_tiles = self._get_dirty_tiles(snapshot, particle_tiles)
+            if len(dirty_tiles) > max_dirty_tiles:
+                dirty_tiles = None
+
+        if dirty_tiles is None:
+            self._drawn_cars = dict(snapshot.cars)
+            self._cell_cars = {cell: car_id for car_id, cell in snapshot.cars.items()}
+            self._screen.blit(self._background, (0, 0))
+            self._draw_traffic_lights(snapshot.blocked_directions)
+            self._draw_points(snapshot.points)
+            self._draw_cars(snapshot.cars.items())
+        else:
+            self._update_drawn_cars(snapshot)
+            dirty_rects = [self._get_tile_rect(tile) for tile in dirty_tiles]
+            self._screen.blits(
+                [(self._background, rect, rect) for rect in dirty_rects],
+                doreturn=False,
+            )
+            self._draw_traffic_lights(
+                {
+                    node: blocked_direction
+                    for node, blocked_direction in snapshot.blocked_directions.items()
+                    if self._node_tiles[node] in dirty_tiles
+                }
+            )
+            point_tiles = {
+                (x + dx, y + dy)
+                for positions in snapshot.points.values()
+                for (x, y) in positions
+                for dx in (-1, 0, 1)
+                for dy in (-1, 0, 1)
+            }
+            for tile, rect in zip(dirty_tiles, dirty_rects):
+                if tile in point_tiles:
+                    self._screen.set_clip(rect)
+                    self._draw_points(snapshot.points, tile)
+            self._screen.set_clip(None)
+            self._draw_cars(
+                (self._cell_cars[cell], cell)
+                for tile in dirty_tiles
+                for cell in self._tile_cells.get(tile, ())
+                if cell in self._cell_cars
+            )
+
+        self.particles.draw(self._screen)
+
+        self._drawn_lights = snapshot.blocked_directions
+        self._drawn_points = snapshot.points
+        self._drawn_particle_tiles = particle_tiles
+
+        if dirty_tiles is None:
+            self._full_redraw = False
+            if not self._offscreen:
+                pygame.display.update()
+        elif not self._offscreen:
+            pygame.display.update(dirty_rects)
 
-                elif x == "=":
-                    self.road_hori = pygame.transform.scale(
-                        self.road_hori, (self.tile_size, self.tile_size)
-                    )
-                    self._screen.blit(
-                        self.road_hori, [idx * self.tile_size, idy * self.tile_size]
-                    )
-                elif x == "|":
-                    self.road_vert = pygame.transform.scale(
-                        self.road_vert, (self.tile_size, self.tile_size)
-                    )
-                    self._screen.blit(
-                        self.road_vert, [idx * self.tile_size, idy * self.tile_size]
-                    )
-                elif x == "#":
-                    tile = self.env_tiles[
-                        (self.map_seed + (idx * idy + 1)) % len(self.env_tiles)
-                    ]
-                    tile = pygame.transform.scale(
-                        tile, (self.tile_size, self.tile_size)
-                    )
-                    self._screen.blit(
-                        tile, [idx * self.tile_size, idy * self.tile_size]
-                    )
+        self._clock.tick(self._ticks_per_second)
 
-        cross_lights = self._map._map_state.get_traffic_lights()
-        cross_lights = cross_lights.items()
+    def _get_dirty_tiles(
+        self, snapshot: MapSnapshot, particle_tiles: set[tuple[int, int]]
+    ) -> set[tuple[int, int]]:
+        """Finds map tiles whose content changed since the last rendered frame: lane
+        cells of cars that moved, traffic lights that switched, points that were
+        collected and tiles covered by particles.
+
+        Args:
+            snapshot (MapSnapshot): The state to draw.
+            particle_tiles (set[tuple[int, int]]): Tiles covered by the particles that
+                will be drawn in this frame.
+
+        Returns:
+            set[tuple[int, int]]: Map positions of the tiles to redraw.
+        """
+        dirty_tiles = set()
+
+        for car_id in snapshot.moved_cars:
+            if car_id in self._drawn_cars:
+                dirty_tiles.add(self._cell_tiles[self._drawn_cars[car_id]])
+            dirty_tiles.add(self._cell_tiles[snapshot.cars[car_id]])
+
+        for node, blocked_direction in snapshot.blocked_directions.items():
+            if self._drawn_lights[node] != blocked_direction:
+                dirty_tiles.add(self._node_tiles[node])
+
+        for car_id, positions in snapshot.points.items():
+            drawn_positions = self._drawn_points[car_id]
+            if len(drawn_positions) != len(positions):
+                dirty_tiles.update(drawn_positions)
+
+        dirty_tiles |= particle_tiles
+        dirty_tiles |= self._drawn_particle_tiles
+
+        return dirty_tiles
+
+    def _update_drawn_cars(self, snapshot: MapSnapshot):
+        """Moves the cars that changed position in the lookup tables of drawn cars.
+
+        Args:
+            snapshot (MapSnapshot): The state to draw.
+        """
+        for car_id in snapshot.moved_cars:
+            prev_cell = self._drawn_cars.get(car_id)
+            # another car may have already moved into the previous cell
+            if self._cell_cars.get(prev_cell) == car_id:
+                del self._cell_cars[prev_cell]
+            cell = snapshot.cars[car_id]
+            self._drawn_cars[car_id] = cell
+            self._cell_cars[cell] = car_id
+
+    def _get_tile_rect(self, tile: tuple[int, int]) -> pygame.Rect:
+        return pygame.Rect(
+            tile[0] * self.tile_size,
+            tile[1] * self.tile_size,
+            self.tile_size,
+            self.tile_size,
+        )
 
+    def _draw_traffic_lights(self, blocked_directions: Mapping[int, Direction]):
         lights_radius = self.tile_size // 6
         lights_offset = self.tile_size // 2 - lights_radius
-
-        CIRCLE_COLOR_RED = (255, 0, 0)
-        CIRCLE_COLOR_GREEN = (0, 255, 0)
-
-        for cross, light in cross_lights:
-            cross_pos = self._crossroads_positions[cross]
-            if (
-                light._blocked_direction == Direction.UP
-                or light._blocked_direction == Direction.DOWN
-            ):
-                if light._up_node is not None:
-                    pygame.draw.circle(
-                        self._screen,
-                        CIRCLE_COLOR_RED,
-                        (
-                            cross_pos[0] + self.tile_size // 2,
-                            cross_pos[1] + self.tile_size // 2 - lights_offset,
-                        ),
-                        lights_radius,
-                    )
-                if light._down_node is not None:
-                    pygame.draw.circle(
-                        self._screen,
-                        CIRCLE_COLOR_RED,
-                        (
-                            cross_pos[0] + self.tile_size // 2,
-                            cross_pos[1] + self.tile_size // 2 + lights_offset,
-                        ),
-                        lights_radius,
-                    )
-                if light._left_node is not None:
-                    pygame.draw.circle(
-                        self._screen,
-                        CIRCLE_COLOR_GREEN,
-                        (
-                            cross_pos[0] + self.tile_size // 2 - lights_offset,
-                            cross_pos[1] + self.tile_size // 2,
-                        ),
-                        lights_radius,
-                    )
-                if light._right_node is not None:
-                    pygame.draw.circle(
-                        self._screen,
-                        CIRCLE_COLOR_GREEN,
-                        (
-                            cross_pos[0] + self.tile_size // 2 + lights_offset,
-                            cross_pos[1] + self.tile_size // 2,
-                        ),
-                        lights_radius,
-                    )
-            if (
-                light._blocked_direction == Direction.LEFT
-                or light._blocked_direction == Direction.RIGHT
-            ):
-                if light._up_node is not None:
-                    pygame.draw.circle(
-                        self._screen,
-                        CIRCLE_COLOR_GREEN,
-                        (
-                            cross_pos[0] + self.tile_size // 2,
-                            cross_pos[1] + self.tile_size // 2 - lights_offset,
-                        ),
-                        lights_radius,
-                    )
-                if light._down_node is not None:
-                    pygame.draw.circle(
-                        self._screen,
-                        CIRCLE_COLOR_GREEN,
-                        (
-                            cross_pos[0] + self.tile_size // 2,
-                            cross_pos[1] + self.tile_size // 2 + lights_offset,
-                        ),
-                        lights_radius,
-                    )
-                if light._left_node is not None:
-                    pygame.draw.circle(
-                        self._screen,
-                        CIRCLE_COLOR_RED,
-                        (
-                            cross_pos[0] + self.tile_size // 2 - lights_offset,
-                            cross_pos[1] + self.tile_size // 2,
-                        ),
-                        lights_radius,
-                    )
-                if light._right_node is not None:
+        traffic_lights = self._map_state.get_traffic_lights()
+
+        for cross, blocked_direction in blocked_directions.items():
+            light = traffic_lights[cross]
+            center_x = self._crossroads_positions[cross][0] + self.tile_size // 2
+            center_y = self._crossroads_positions[cross][1] + self.tile_size // 2
+            if blocked_direction in (Direction.UP, Direction.DOWN):
+                vertical_color, horizontal_color = LIGHT_COLOR_RED, LIGHT_COLOR_GREEN
+            else:
+                vertical_color, horizontal_color = LIGHT_COLOR_GREEN, LIGHT_COLOR_RED
+
+            lights = [
+                (light._up_node, vertical_color, (0, -lights_offset)),
+                (light._down_node, vertical_color, (0, lights_offset)),
+                (light._left_node, horizontal_color, (-lights_offset, 0)),
+                (light._right_node, horizontal_color, (lights_offset, 0)),
+            ]
+            for node, color, (dx, dy) in lights:
+                if node is not None:
                     pygame.draw.circle(
                         self._screen,
-                        CIRCLE_COLOR_RED,
-                        (
-                            cross_pos[0] + self.tile_size // 2 + lights_offset,
-                            cross_pos[1] + self.tile_size // 2,
-                        ),
+                        color,
+                        (center_x + dx, center_y + dy),
                         lights_radius,
                     )
-                    
-        for car_id, agent_points in zip(self._map._map_state._points ,self._map._map_state._points.values()):
-            colored_star = self.colored_stars[car_id]
-            for point_id, point in enumerate(agent_points):
-                (x, y) = point.map_position
+
+    def _draw_points(
+        self,
+        points: Mapping[int, tuple[tuple[int, int], ...]],
+        tile: tuple[int, int] | None = None,
+    ):
+        """Draws the points of all agents. If a tile is given, only points on that
+        tile and its neighbours are drawn, as their labels can reach into the tile.
+
+        Args:
+            points (Mapping[int, tuple[tuple[int, int], ...]]): Map positions of the
+                remaining points of each agent.
+            tile (tuple[int, int] | None, optional): Map position of the tile to
+                redraw. Defaults to None, which draws all points.
+        """
+        for car_id, positions in points.items():
+            colored_star = get_sprite(
+                STAR_IMAGE,
+                PRE_COLOR[car_id % len(PRE_COLOR)],
+                BLEND_RATE,
+                (self.tile_size, self.tile_size),
+            )
+            for point_id, (x, y) in enumerate(positions):
+                if tile is not None and (abs(x - tile[0]) > 1 or abs(y - tile[1]) > 1):
+                    continue
                 self._screen.blit(
-                    pygame.transform.scale(colored_star, (self.tile_size, self.tile_size)),
+                    colored_star,
                     [x * self.tile_size, y * self.tile_size],
-                )  
-                text_surface = my_font.render(f"{point_id}", False, (0, 0, 0))
-                self._screen.blit(text_surface, [x * self.tile_size + self.tile_size // 2.2, y * self.tile_size + self.tile_size // 2.3])
-
-        for car in self._map._cars.values():
-            pos = self._map._map_state._node_indices[car.get_road_key()[0]]
-            direction = self._map._map_state._edges[car.get_road_key()]
-            x, y = pos
-
-            if car._car_id in self.colored_cars:
-                car_images = self.colored_cars[car._car_id]
-            else:
-                car_images = {
-                    Direction.UP: self.car_up,
-                    Direction.DOWN: self.car_down,
-                    Direction.LEFT: self.car_left,
-                    Direction.RIGHT: self.car_right,
-                }
-
-            match direction:
-                case Direction.UP:
-                    car_pos =[
-                        (x + 0) * self.tile_size + 1 * self.car_size,
-                        (y - 1) * self.tile_size
-                        - (car.get_road_pos() - 1) * self.car_size,
-                    ]
-                    self._screen.blit(
-                        pygame.transform.scale(
-                            car_images[Direction.UP], (self.car_size, self.car_size)
-                        ),
-                        car_pos
-                    )
-                    if car._car_id in self._map._agents:
-                        self.create_particles(car_pos, [0, -1], PRE_COLOR[car._car_id % len(PRE_COLOR)])
-                        
-                case Direction.DOWN:
-                    car_pos = [
-                        (x + 0) * self.tile_size + 0 * self.car_size,
-                        (y + 1) * self.tile_size
-                        + (car.get_road_pos()) * self.car_size,
-                    ]
-                    self._screen.blit(
-                        pygame.transform.scale(
-                            car_images[Direction.DOWN], (self.car_size, self.car_size)
-                        ),
-                        car_pos
-                    )
-                    if car._car_id in self._map._agents:
-                        self.create_particles(car_pos, [0, 1], PRE_COLOR[car._car_id % len(PRE_COLOR)])
-                    
-                case Direction.LEFT:
-                    car_pos = [
-                            (x - 0) * self.tile_size
-                            - (car.get_road_pos() + 1) * self.car_size,
-                            (y + 0) * self.tile_size + 0 * self.car_size,
-                        ]
-                    self._screen.blit(
-                        pygame.transform.scale(
-                            car_images[Direction.LEFT], (self.car_size, self.car_size)
-                        ),
-                        car_pos
-                    )
-                    if car._car_id in self._map._agents:
-                        self.create_particles(car_pos, [-1, 0], PRE_COLOR[car._car_id % len(PRE_COLOR)])
-                        
-                case Direction.RIGHT:
-                    car_pos = [
-                            (x + 1) * self.tile_size
-                            + (car.get_road_pos()) * self.car_size,
-                            (y + 0) * self.tile_size + 1 * self.car_size,
-                        ]
-                    self._screen.blit(
-                        pygame.transform.scale(
-                            car_images[Direction.RIGHT], (self.car_size, self.car_size)
-                        ),
-                        car_pos
-                    )
-                    if car._car_id in self._map._agents:
-                        self.create_particles(car_pos, [1, 0], PRE_COLOR[car._car_id % len(PRE_COLOR)])
-
-        for particle in self.particles:
-            if particle.is_alive():
-                s = pygame.Surface((self.car_size // 8, self.car_size // 8), pygame.SRCALPHA)
-                s.fill(particle.color)
-                self._screen.blit(s, particle.pos)
-
-
-        pygame.display.update()
-        pygame.display.flip()
+                )
+                text_surface = self._font.render(f"{point_id}", False, (0, 0, 0))
+                self._screen.blit(
+                    text_surface,
+                    [
+                        x * self.tile_size + self.tile_size // 2.2,
+                        y * self.tile_size + self.tile_size // 2.3,
+                    ],
+                )
 
-        self._clock.tick(self._ticks_per_second)
+    def _draw_cars(self, cars):
+        car_cells = self._car_cells
+        bot_sprites = self._bot_sprites
+        agent_sprites = self._agent_sprites
+        car_blits = []
+        for car_id, car_cell in cars:
+            x, y, direction = car_cells[car_cell]
+            sprites = agent_sprites.get(car_id, bot_sprites)
+            car_blits.append((sprites[direction], (x, y)))
+        self._screen.blits(car_blits, doreturn=False)
 
     def is_running(self):
         return self._running
@@ -0,0 +1,167 @@
+import numpy as np
+import pygame
+
+PARTICLES_PER_EMITTER = 5
+MIN_LIFESPAN = 3
+MAX_LIFESPAN = 10
+MAX_OFFSET = 5
+
+
+class ParticleSystem:
+    """Fixed-capacity ring buffer of square particles that move in a straight line
+    and fade out.
+
+    Particle state is kept in NumPy arrays and updated for all particles at once.
+    Particles are drawn with one blits() call from pre-filled surfaces, one per
+    color and alpha value, which are created once and reused in later frames.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        palette: list[tuple[int, int, int]],
+        size: int,
+        random_seed: int = None,
+    ):
+        """Initializes an empty particle system.
+
+        Args:
+            capacity (int): Maximum number of live particles. When the buffer is
+                full, new particles replace the oldest ones.
+            palette (list[tuple[int, int, int]]): RGB colors that particles can use,
+                referenced by index in emit().
+            size (int): Side of a particle in pixels.
+            random_seed (int, optional): Seed of the random offsets, speeds and
+                lifespans of new particles. Defaults to None.
+        """
+        self._capacity = capacity
+        self._palette = palette
+        self._rng = np.random.default_rng(random_seed)
+        self._head = 0
+
+        self._pos = np.zeros((capacity, 2))
+        self._velocity = np.zeros((capacity, 2))
+        self._color = np.zeros(capacity, dtype=np.intp)
+        self._age = np.zeros(capacity, dtype=np.intp)
+        self._lifespan = np.zeros(capacity, dtype=np.intp)
+
+        # keyed by color index * 256 + alpha
+        self._surfaces: dict[int, pygame.Surface] = {}
+        self.set_size(size)
+
+    @classmethod
+    def for_emitters(
+        cls,
+        n_emitters: int,
+        palette: list[tuple[int, int, int]],
+        size: int,
+        random_seed: int = None,
+    ) -> "ParticleSystem":
+        """Creates a particle system large enough to never drop live particles when
+        every emitter emits once per update.
+
+        Args:
+            n_emitters (int): Number of emitters, e.g. agent cars.
+            palette (list[tuple[int, int, int]]): RGB colors of the particles.
+            size (int): Side of a particle in pixels.
+            random_seed (int, optional): Seed of the particles. Defaults to None.
+
+        Returns:
+            ParticleSystem: The particle system.
+        """
+        capacity = max(n_emitters, 1) * PARTICLES_PER_EMITTER * (MAX_LIFESPAN + 1)
+        return cls(capacity, palette, size, random_seed)
+
+    def set_size(self, size: int):
+        """Changes the side of the particles, e.g. after the window was resized.
+
+        Args:
+            size (int): Side of a particle in pixels.
+        """
+        self._size = size
+        self._surfaces.clear()
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self._age < self._lifespan))
+
+    def emit(self, origins: np.ndarray, directions: np.ndarray, colors: np.ndarray):
+        """Emits PARTICLES_PER_EMITTER particles around every origin.
+
+        Args:
+            origins (np.ndarray): (n, 2) pixel positions of the emitters.
+            directions (np.ndarray): (n, 2) unit directions the particles move in.
+            colors (np.ndarray): (n,) palette indices of the particle colors.
+        """
+        origins = np.repeat(np.asarray(origins), PARTICLES_PER_EMITTER, axis=0)
+        directions = np.repeat(np.asarray(directions), PARTICLES_PER_EMITTER, axis=0)
+        count = len(origins)
+        if count == 0:
+            return
+        slots = (self._head + np.arange(count)) % self._capacity
+        self._head = (self._head + count) % self._capacity
+
+        rng = self._rng
+        self._pos[slots] = origins + rng.integers(
+            -MAX_OFFSET, MAX_OFFSET + 1, (count, 2)
+        )
+        self._velocity[slots] = directions * rng.uniform(0.5, 1.5, (count, 2))
+        self._color[slots] = np.repeat(np.asarray(colors), PARTICLES_PER_EMITTER)
+        self._age[slots] = 0
+        self._lifespan[slots] = rng.integers(MIN_LIFESPAN, MAX_LIFESPAN + 1, count)
+
+    def update(self):
+        """Ages all particles by one frame and moves the ones that are still alive."""
+        self._age += 1
+        alive = self._age < self._lifespan
+        self._pos[alive] += self._velocity[alive]
+
+    def _get_alive(self) -> np.ndarray:
+        # oldest first, so that newer particles are drawn on top
+        order = (self._head + np.arange(self._capacity)) % self._capacity
+        return order[self._age[order] < self._lifespan[order]]
+
+    def get_tiles(self, tile_size: int) -> set[tuple[int, int]]:
+        """Returns the map tiles covered by live particles.
+
+        Args:
+            tile_size (int): Side of a map tile in pixels.
+
+        Returns:
+            set[tuple[int, int]]: Map positions of the covered tiles.
+        """
+        corners = self._pos[self._get_alive()].astype(np.intp)
+        # particles are smaller than tiles, so their corners cover all their tiles
+        far = max(self._size - 1, 0)
+        tiles = np.concatenate(
+            [
+                (corners + offset) // tile_size
+                for offset in ((0, 0), (far, 0), (0, far), (far, far))
+            ]
+        )
+        # tiles left of or above the screen are never drawn
+        tiles = tiles[(tiles >= 0).all(axis=1)]
+        # unique on a single integer key is much faster than on rows
+        keys = np.unique(tiles[:, 0] << 32 | (tiles[:, 1] & 0xFFFFFFFF))
+        return set(zip((keys >> 32).tolist(), (keys & 0xFFFFFFFF).tolist()))
+
+    def draw(self, surface: pygame.Surface):
+        """Draws live particles, faded according to their age.
+
+        Args:
+            surface (pygame.Surface): The surface to draw on.
+        """
+        alive = self._get_alive()
+        if len(alive) == 0:
+            return
+        alpha = ((1 - self._age[alive] / self._lifespan[alive]) * 255).astype(np.intp)
+        keys = self._color[alive] * 256 + alpha
+        surfaces = self._surfaces
+        for key in np.unique(keys).tolist():
+            if key not in surfaces:
+                particle = pygame.Surface((self._size, self._size), pygame.SRCALPHA)
+                particle.fill((*self._palette[key // 256], key % 256))
+                surfaces[key] = particle
+        positions = self._pos[alive].astype(np.intp).tolist()
+        surface.blits(
+            zip(map(surfaces.__getitem__, keys.tolist()), positions), doreturn=False
+        )
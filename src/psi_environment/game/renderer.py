@@ -0,0 +1,146 @@
+import multiprocessing
+import queue
+
+from psi_environment.data.map import Map
+from psi_environment.data.map_state import MapState
+from psi_environment.data.snapshot import MapSnapshot
+from psi_environment.game.game import Game
+
+
+class BackgroundRenderer:
+    """Renders the simulation in a separate process, so that drawing does not slow
+    down the simulation.
+
+    The simulation submits a snapshot after every step. The renderer process draws at
+    its own frame rate and the intermediate states are skipped: a snapshot that the
+    renderer has not taken yet is replaced by the next one, merged with it so that
+    the moved cars are still reported. In the rare case that it cannot be replaced
+    because the renderer is just taking it, the new snapshot is kept pending and sent
+    with the next submit.
+    """
+
+    def __init__(self, map: Map, random_seed: int = None, fps: int = 60):
+        """Initializes the renderer and starts its process.
+
+        Args:
+            map (Map): The map to render. Only its map state is sent to the renderer
+                process, agents stay in the simulation process.
+            random_seed (int, optional): Random seed passed to the game.
+                Defaults to None.
+            fps (int, optional): Frame rate of the renderer. Defaults to 60.
+        """
+        # spawn does not inherit the state of the simulation process, e.g. threads
+        context = multiprocessing.get_context("spawn")
+        self._queue = context.Queue(maxsize=1)
+        self._closed = context.Event()
+        self._rendered_frames = context.Value("i", 0)
+        self._pending: MapSnapshot | None = None
+        self._process = context.Process(
+            target=_render_loop,
+            args=(
+                map.get_map_state(),
+                list(map._agents.keys()),
+                map._random_seed,
+                random_seed,
+                fps,
+                self._queue,
+                self._closed,
+                self._rendered_frames,
+            ),
+            name="psi-environment-renderer",
+            daemon=True,
+        )
+        self._process.start()
+        self.submit(map.get_snapshot())
+
+    def submit(self, snapshot: MapSnapshot):
+        """Hands over a new snapshot to the renderer. Never blocks; if the renderer
+        has not taken the previous snapshot yet, it is replaced by the new one.
+
+        Args:
+            snapshot (MapSnapshot): The state to draw.
+        """
+        if self._pending is not None:
+            snapshot = snapshot.merge(self._pending)
+            self._pending = None
+        try:
+            self._queue.put_nowait(snapshot)
+            return
+        except queue.Full:
+            pass
+        try:
+            snapshot = snapshot.merge(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        try:
+            self._queue.put_nowait(snapshot)
+        except queue.Full:
+            self._pending = snapshot
+
+    def get_rendered_frames(self) -> int:
+        """Returns the number of frames drawn so far.
+
+        Returns:
+            int: The number of frames.
+        """
+        return self._rendered_frames.value
+
+    def is_running(self) -> bool:
+        """Checks if the renderer is still running, i.e. it was not stopped and its
+        window was not closed.
+
+        Returns:
+            bool: True if the renderer is running, False otherwise.
+        """
+        return self._process.is_alive() and not self._closed.is_set()
+
+    def stop(self, timeout: float = 5.0):
+        """Draws the last submitted state, then stops the renderer process.
+
+        Args:
+            timeout (float, optional): Seconds to wait for the renderer to finish
+                before it is terminated. Defaults to 5.0.
+        """
+        if self.is_running():
+            try:
+                if self._pending is not None:
+                    self._queue.put(self._pending, timeout=timeout)
+                    self._pending = None
+                self._queue.put(None, timeout=timeout)
+            except queue.Full:
+                pass
+        self._process.join(timeout)
+        if self._process.is_alive():
+            self._process.terminate()
+            self._process.join()
+
+
+def _render_loop(
+    map_state: MapState,
+    agent_ids: list[int],
+    map_seed: int,
+    random_seed: int,
+    fps: int,
+    snapshots: multiprocessing.Queue,
+    closed,
+    rendered_frames,
+):
+    game = Game.from_map_state(
+        map_state, agent_ids, map_seed, random_seed=random_seed, ticks_per_second=fps
+    )
+    try:
+        while game.is_running():
+            try:
+                snapshot = snapshots.get(timeout=1 / fps)
+            except queue.Empty:
+                game.handle_events()
+                continue
+            if snapshot is None:
+                break
+            game.update_particles()
+            game.render(snapshot)
+            with rendered_frames.get_lock():
+                rendered_frames.value += 1
+    finally:
+        closed.set()
+        game.stop()
@@ -0,0 +1,96 @@
+from psi_environment.data.recording import Recording
+from psi_environment.game.game import Game
+
+MAX_FPS = 60
+
+
+class ReplayPlayer:
+    """Plays back a recording made with Map.start_recording. No cars or agents are
+    created, the game only draws the recorded states.
+    """
+
+    def __init__(self, path: str, ticks_per_second: int = 10, random_seed: int = None):
+        """Opens the recording and creates the game window.
+
+        Args:
+            path (str): Path to the recording.
+            ticks_per_second (int, optional): Number of recorded steps played per
+                second at speed 1. Defaults to 10.
+            random_seed (int, optional): Random seed of the game, used for particles.
+                Defaults to None.
+        """
+        self._recording = Recording.open(path)
+        self._ticks_per_second = ticks_per_second
+        self._game = Game.from_map_state(
+            self._recording.create_map_state(),
+            self._recording.get_agent_ids(),
+            self._recording.get_random_seed(),
+            random_seed=random_seed,
+        )
+        self._step = self._recording.get_first_step()
+
+    def __len__(self) -> int:
+        """Returns the number of recorded steps."""
+        return len(self._recording)
+
+    def get_step(self) -> int:
+        """Returns the step that is currently shown.
+
+        Returns:
+            int: The step.
+        """
+        return self._step
+
+    def seek(self, step: int):
+        """Shows the state after the given step.
+
+        Args:
+            step (int): The step, from the first recorded step to the first recorded
+                step + len(player).
+        """
+        self._game.set_ticks_per_second(0)
+        self._game.render(self._recording.seek(step))
+        self._step = step
+
+    def play(
+        self, speed: float = 1.0, start: int | None = None, end: int | None = None
+    ):
+        """Plays the recording until its end or until the window is closed.
+
+        At most MAX_FPS frames are drawn per second. At higher speeds several steps
+        are drawn in a single frame.
+
+        Args:
+            speed (float, optional): Playback speed multiplier. Defaults to 1.0.
+            start (int | None, optional): The first step to play. Defaults to None,
+                which continues from the current step.
+            end (int | None, optional): The last step to play. Defaults to None,
+                which means the end of the recording.
+        """
+        if start is None:
+            start = self._step
+        steps_per_second = self._ticks_per_second * speed
+        steps_per_frame = max(1, round(steps_per_second / MAX_FPS))
+        self._game.set_ticks_per_second(steps_per_second / steps_per_frame)
+
+        pending = None
+        for snapshot in self._recording.iter_snapshots(start, end):
+            if pending is not None:
+                snapshot = snapshot.merge(pending)
+            if (snapshot.step - start) % steps_per_frame != 0 and snapshot.step != end:
+                pending = snapshot
+                continue
+            pending = None
+            self._game.update_particles()
+            self._game.render(snapshot)
+            self._step = snapshot.step
+            if not self._game.is_running():
+                return
+        if pending is not None:
+            self._game.render(pending)
+            self._step = pending.step
+
+    def stop(self):
+        """Closes the game window and the recording."""
+        self._game.stop()
+        self._recording.close()
@@ -0,0 +1,10 @@
+from psi_environment.data.car import DummyAgent
+
+
+class SeededAgent(DummyAgent):
+    """DummyAgent with a fixed random seed, so that it can be passed in agent_types,
+    which creates agents from the road key, road position and car id only.
+    """
+
+    def __init__(self, road_key, road_pos, car_id):
+        super().__init__(road_key, road_pos, 5, car_id)
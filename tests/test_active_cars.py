@@ -0,0 +1,70 @@
+import numpy as np
+
+from psi_environment.data.action import Action
+from psi_environment.data.car import Car
+from psi_environment.data.map import Map
+from psi_environment.data.map_state import MapState
+
+from conftest import SeededAgent
+
+
+class ForwardAgent(Car):
+    def __init__(self, road_key, road_pos, car_id):
+        super().__init__(road_key, road_pos, car_id)
+        self.n_calls = 0
+
+    def get_action(self, map_state: MapState) -> Action:
+        self.n_calls += 1
+        return Action.FORWARD
+
+
+class WaitingForwardAgent(ForwardAgent):
+    forward_while_blocked = True
+
+
+def run_map(agent_types, skip_waiting_cars=True, steps=100):
+    np.random.seed(0)
+    game_map = Map(
+        random_seed=0,
+        n_bots=60,
+        agent_types=agent_types,
+        skip_waiting_cars=skip_waiting_cars,
+    )
+    positions = []
+    for _ in range(steps):
+        game_map.step()
+        positions.append(dict(game_map.get_map_state().get_cars()))
+    return game_map, positions
+
+
+def test_skipping_waiting_cars_does_not_change_moves():
+    agent_types = [SeededAgent, ForwardAgent] * 3
+    _, positions = run_map(agent_types)
+    _, reference_positions = run_map(agent_types, skip_waiting_cars=False)
+    assert positions == reference_positions
+
+
+def test_blocked_cars_are_not_asked():
+    waiting_map, positions = run_map([WaitingForwardAgent] * 20)
+    asked_map, reference_positions = run_map([ForwardAgent] * 20)
+    assert positions == reference_positions
+
+    n_calls = sum(car.n_calls for car in waiting_map._agents.values())
+    reference_n_calls = sum(car.n_calls for car in asked_map._agents.values())
+    assert reference_n_calls == 20 * 100
+    assert n_calls < reference_n_calls
+
+
+def test_red_light_queues_and_blocked_cars():
+    map_state = MapState(0, traffic_light_percentage=1)
+    node, traffic_light = next(iter(map_state.get_traffic_lights().items()))
+    road_key = traffic_light.get_blocked_road_keys()[0]
+    road_end = map_state.get_road(road_key).get_length() - 1
+    for car_id, road_pos in ((1, road_end), (2, road_end - 1), (3, road_end - 3)):
+        map_state._add_car(car_id, road_key, road_pos)
+
+    assert [1, 2] in map_state.get_red_light_queues()
+    assert map_state.get_blocked_cars([3, 2, 1]) == [2, 1]
+    map_state.move_cars([(car_id, Action.FORWARD) for car_id in (1, 2, 3)])
+    assert map_state.get_cars()[1] == (road_key, road_end)
+    assert map_state.get_cars()[3] == (road_key, road_end - 2)
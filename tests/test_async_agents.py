@@ -0,0 +1,67 @@
+import asyncio
+import time
+
+import numpy as np
+
+from psi_environment.data.action import Action
+from psi_environment.data.car import Car
+from psi_environment.data.map import Map
+from psi_environment.data.map_state import MapState
+
+
+class SlowAgent(Car):
+    delay = 0.05
+
+    async def get_action(self, map_state: MapState) -> Action:
+        await asyncio.sleep(self.delay)
+        return Action.BACK
+
+
+class StuckAgent(Car):
+    async def get_action(self, map_state: MapState) -> Action:
+        await asyncio.sleep(10)
+        return Action.BACK
+
+
+def test_async_agents_are_awaited_concurrently():
+    np.random.seed(0)
+    game_map = Map(random_seed=0, n_bots=2, agent_types=[SlowAgent] * 5)
+
+    start = time.perf_counter()
+    game_map.step()
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 3 * SlowAgent.delay
+    assert game_map.get_deadline_misses() == []
+
+
+def test_agents_missing_deadline_fall_back():
+    np.random.seed(0)
+    game_map = Map(
+        random_seed=0,
+        n_bots=2,
+        agent_types=[SlowAgent, StuckAgent],
+        action_deadline=0.2,
+    )
+
+    start = time.perf_counter()
+    actions = dict(game_map._get_actions())
+    game_map.step()
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 1
+    assert actions[1] == Action.BACK
+    assert actions[2] == Action.FORWARD
+    assert game_map.get_deadline_misses() == [(1, 2), (1, 2)]
+
+
+def test_close_closes_event_loop():
+    np.random.seed(0)
+    game_map = Map(random_seed=0, n_bots=2, agent_types=[SlowAgent])
+    game_map.step()
+    event_loop = game_map._event_loop
+
+    game_map.close()
+    game_map.close()
+
+    assert event_loop.is_closed()
@@ -0,0 +1,67 @@
+import numpy as np
+
+from psi_environment.api.environment_api import EnvironmentAPI
+from psi_environment.data.action import Action
+from psi_environment.data.callback_policy import CallbackPolicy
+from psi_environment.data.car import Car
+from psi_environment.data.map import Map
+from psi_environment.data.map_state import MapState
+
+
+class TurningAgent(Car):
+    """Drives forward and turns at road ends, by a rule that depends only on its
+    position, so it moves the same however often it is asked."""
+
+    def __init__(self, road_key, road_pos, car_id):
+        super().__init__(road_key, road_pos, car_id)
+        self.calls = []
+
+    def get_action(self, map_state: MapState) -> Action:
+        api = EnvironmentAPI.for_map_state(map_state)
+        at_road_end = api.is_position_road_end(self._road_key, self._road_pos)
+        self.calls.append(at_road_end)
+        if not at_road_end:
+            return Action.FORWARD
+        turns = api.get_available_turns(self._road_key)
+        return turns[sum(self._road_key) % len(turns)]
+
+
+class RoadEndAgent(TurningAgent):
+    callback_policy = CallbackPolicy.ROAD_END
+
+
+class IntervalAgent(TurningAgent):
+    callback_policy = CallbackPolicy.EVERY_N_TICKS
+    callback_interval = 5
+    default_action = Action.BACK
+
+
+def run_map(agent_type, steps=100):
+    np.random.seed(0)
+    game_map = Map(random_seed=0, n_bots=10, agent_types=[agent_type] * 4)
+    positions = []
+    for _ in range(steps):
+        game_map.step()
+        positions.append(dict(game_map.get_map_state().get_cars()))
+    return game_map, positions
+
+
+def test_road_end_agents_are_asked_only_at_road_ends():
+    game_map, positions = run_map(RoadEndAgent)
+    _, reference_positions = run_map(TurningAgent)
+    assert positions == reference_positions
+
+    for agent in game_map._agents.values():
+        assert all(agent.calls)
+        assert 0 < len(agent.calls) < 100
+
+
+def test_interval_agents_take_default_action_between_calls():
+    game_map, _ = run_map(IntervalAgent, steps=12)
+    for agent in game_map._agents.values():
+        assert len(agent.calls) == 3
+
+    game_map._step = 13
+    actions = dict(game_map._get_actions(game_map._get_default_actions()))
+    assert actions[1] == Action.BACK
+    assert len(game_map._agents[1].calls) == 3
@@ -0,0 +1,47 @@
+from psi_environment.data.action import Action
+from psi_environment.data.differential import (
+    Scenario,
+    compare_engines,
+    fuzz_engines,
+)
+from psi_environment.data.map_state import MapState
+
+
+class ReversedPriorityEngine(MapState):
+    """Moves cars through nodes in the opposite order, breaking right of way."""
+
+    def _get_node_move_requests(self, node_actions):
+        return super()._get_node_move_requests(node_actions)[::-1]
+
+
+def test_engines_agree_on_random_intersections():
+    assert fuzz_engines(50, seed=1, n_nodes=6, n_ticks=10) is None
+
+
+def test_divergence_is_reported_with_cars_and_intersection():
+    # both cars leave node 7 towards road (7, 6) in the first tick
+    scenario = Scenario(
+        random_seed=0,
+        cars={1: ((1, 7), 1), 2: ((6, 7), 9)},
+        actions=(
+            ((1, Action.RIGHT), (2, Action.BACK)),
+            ((1, Action.FORWARD), (2, Action.FORWARD)),
+        ),
+    )
+    assert compare_engines(scenario) is None
+
+    divergence = compare_engines(scenario, candidate=ReversedPriorityEngine)
+    assert divergence.tick == 1
+    assert set(divergence.cars) == {1, 2}
+    assert divergence.intersections == {
+        7: {1: ((1, 7), Action.RIGHT), 2: ((6, 7), Action.BACK)}
+    }
+    assert divergence.traffic_lights == {}
+    assert "node 7" in str(divergence)
+
+
+def test_fuzzer_shrinks_divergent_scenarios():
+    scenario, divergence = fuzz_engines(100, candidate=ReversedPriorityEngine)
+    assert len(scenario.cars) <= 3
+    assert set(divergence.cars) <= set(scenario.cars)
+    assert divergence.intersections
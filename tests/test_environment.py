@@ -0,0 +1,166 @@
+import time
+
+import numpy as np
+import pytest
+
+from psi_environment.data.action import Action
+from psi_environment.data.car import ExternalAgent
+from psi_environment.data.render_mode import RenderMode
+from psi_environment.data.stop_mode import StopMode
+from psi_environment.data.stop_reason import StopReason
+from psi_environment.environment import Environment
+
+from conftest import SeededAgent
+
+
+def make_environment(n_agents=3):
+    return Environment(
+        agent_types=[ExternalAgent] * n_agents,
+        n_bots=10,
+        n_points=30,
+        random_seed=3,
+        render_mode=RenderMode.NONE,
+        speed_multiplier=None,
+    )
+
+
+def test_step_batch_returns_batched_transition():
+    env = make_environment()
+    map_state = env._map.get_map_state()
+    rng = np.random.default_rng(0)
+    total_rewards = np.zeros(3)
+
+    for _ in range(40):
+        actions = rng.choice([Action.FORWARD, Action.LEFT, Action.RIGHT], size=3)
+        observations, rewards, dones, info = env.step_batch(actions)
+        total_rewards += rewards
+
+    assert info["agent_ids"] == [1, 2, 3]
+    assert info["timestep"] == 40
+    assert observations.shape[0] == 3
+    grid = map_state.get_observation_grid()
+    np.testing.assert_array_equal(observations[1], grid.get_observation(2))
+    assert total_rewards.sum() > 0
+    remaining = [len(map_state.get_points()[car_id]) for car_id in (1, 2, 3)]
+    np.testing.assert_array_equal(total_rewards, 30 - np.array(remaining))
+    np.testing.assert_array_equal(dones, np.array(remaining) == 0)
+
+
+def test_step_batch_with_action_mapping_moves_agent():
+    env = make_environment(1)
+    map_state = env._map.get_map_state()
+    road_key, road_pos = map_state.get_cars()[1]
+    if map_state.get_road(road_key).is_position_road_end(road_pos):
+        pytest.skip("agent starts at the end of a road")
+
+    env.step_batch({1: Action.BACK})
+
+    backward_road_key = map_state.get_road(road_key).get_backward_road_key()
+    assert map_state.get_cars()[1][0] == backward_road_key
+
+
+def test_step_batch_rejects_actions_for_bots():
+    env = make_environment(1)
+
+    with pytest.raises(ValueError):
+        env.step_batch({2: Action.FORWARD})
+    with pytest.raises(ValueError):
+        env.step_batch([Action.FORWARD, Action.FORWARD])
+
+
+def test_headless_run_is_not_paced():
+    env = Environment(n_bots=10, random_seed=3, render_mode=RenderMode.NONE)
+
+    start = time.perf_counter()
+    for _ in range(20):
+        env.step()
+
+    assert time.perf_counter() - start < 1
+
+
+def test_offscreen_run_is_not_paced(tmp_path):
+    env = Environment(
+        agent_types=[SeededAgent],
+        n_bots=10,
+        random_seed=3,
+        ticks_per_second=10,
+        render_mode=RenderMode.OFFSCREEN,
+        frame_export_dir=str(tmp_path),
+        frame_format="npy",
+    )
+
+    start = time.perf_counter()
+    for _ in range(20):
+        env.step()
+    env.close()
+
+    # 20 ticks at 10 ticks per second would take 2 seconds
+    assert time.perf_counter() - start < 1
+    assert len(list(tmp_path.iterdir())) == 20
+
+
+def test_step_returns_cost_and_running():
+    env = make_environment(1)
+
+    assert env.step() == (1, True)
+
+
+def make_seeded_environment(n_points=2):
+    return Environment(
+        agent_types=[SeededAgent] * 2,
+        n_bots=10,
+        n_points=n_points,
+        random_seed=3,
+        render_mode=RenderMode.NONE,
+    )
+
+
+def test_run_stops_after_max_ticks():
+    env = make_environment(1)
+    calls = []
+
+    summary = env.run(max_ticks=50, callback=calls.append, callback_every=20)
+
+    assert summary.stop_reason == StopReason.MAX_TICKS
+    assert summary.ticks == 50
+    assert summary.timestep == 50
+    assert calls == [env, env]
+    assert env.is_running()
+    assert env.run(max_ticks=10).timestep == 60
+    with pytest.raises(ValueError):
+        env.run(max_ticks=10, callback=calls.append, callback_every=0)
+    assert env.get_timestep() == 60
+
+
+def test_run_until_stop_mode_matches_stepping(capsys):
+    env = make_seeded_environment()
+    summary = env.run(until=StopMode.ONE_FINISHED, max_ticks=5000)
+    assert summary.stop_reason == StopReason.CONDITION
+    assert env.is_running()
+    assert 0 in summary.points_left.values()
+
+    stepped = make_seeded_environment()
+    while not stepped._map.is_game_over(StopMode.ONE_FINISHED):
+        stepped.step()
+    assert stepped.get_timestep() == summary.timestep
+
+    summary = env.run()
+    assert summary.stop_reason == StopReason.GAME_OVER
+    assert not env.is_running()
+    assert summary.get_finished_agents() == [1, 2]
+    assert capsys.readouterr().out == ""
+
+
+def test_run_stops_on_condition_and_time_limit():
+    env = make_environment(1)
+    summary = env.run(until=lambda env: env.get_timestep() == 7)
+    assert summary.stop_reason == StopReason.CONDITION
+    assert summary.timestep == 7
+
+    summary = env.run(max_seconds=0.05)
+    assert summary.stop_reason == StopReason.TIME_LIMIT
+    assert 0.05 <= summary.elapsed < 1
+    assert summary.ticks > 0
+
+    env.close()
+    assert env.run().stop_reason == StopReason.CLOSED
@@ -0,0 +1,74 @@
+import numpy as np
+
+from psi_environment.api.environment_api import EnvironmentAPI
+from psi_environment.data.action import Action
+from psi_environment.data.map import Map
+
+
+def make_map():
+    np.random.seed(0)
+    return Map(random_seed=0, n_bots=20)
+
+
+def test_shared_api_is_reused():
+    map_state = make_map().get_map_state()
+
+    api = EnvironmentAPI.for_map_state(map_state)
+
+    assert EnvironmentAPI.for_map_state(map_state) is api
+    assert EnvironmentAPI(map_state) is not api
+
+
+def test_static_answers_are_cached():
+    map_state = make_map().get_map_state()
+    api = EnvironmentAPI(map_state)
+    road_key = next(iter(map_state.get_roads()))
+
+    turns = api.get_available_turns(road_key)
+    turns.append(Action.LEFT)
+
+    assert api.get_available_turns(road_key) == (
+        map_state.get_road(road_key).get_available_turns()
+    )
+    assert api.get_next_road(road_key, Action.BACK) is api.get_next_road(
+        road_key, Action.BACK
+    )
+    assert api.get_cache_stats()["get_available_turns"] == (1, 1)
+    assert api.get_cache_stats()["get_next_road"] == (1, 1)
+
+
+def test_dynamic_answers_are_cached_until_the_next_move():
+    game_map = make_map()
+    map_state = game_map.get_map_state()
+    api = EnvironmentAPI(map_state)
+
+    for _ in range(20):
+        for road_key, road in map_state.get_roads().items():
+            assert api.get_road_traffic(road_key) == road.get_number_of_cars()
+            assert api.get_road_traffic(road_key) == road.get_number_of_cars()
+        version = map_state.get_version()
+        game_map.step()
+        assert map_state.get_version() != version
+
+    n_roads = len(map_state.get_roads())
+    assert api.get_cache_stats()["get_road_traffic"] == (20 * n_roads, 20 * n_roads)
+
+
+def test_traffic_matrix_counts_cars_per_road():
+    game_map = make_map()
+    map_state = game_map.get_map_state()
+    api = EnvironmentAPI(map_state)
+
+    for _ in range(5):
+        traffic = api.get_traffic()
+        roads = map_state.get_roads()
+        for road_key, road in roads.items():
+            assert traffic[road_key] == road.get_number_of_cars()
+            assert api.get_specific_traffic(*road_key) == road.get_number_of_cars()
+        assert np.nansum(traffic) == len(map_state.get_cars())
+        assert np.count_nonzero(~np.isnan(traffic)) == len(roads)
+
+        # callers get their own copy of the cached matrix
+        traffic[:] = -1
+        assert np.nansum(api.get_traffic()) == len(map_state.get_cars())
+        game_map.step()
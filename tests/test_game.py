@@ -0,0 +1,188 @@
+import os
+import pickle
+import random
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import numpy as np
+import pygame
+import pytest
+
+from psi_environment.data.map import Map
+from psi_environment.game import assets
+from psi_environment.game.export import FrameExporter
+from psi_environment.game.game import CAR_IMAGES, PRE_COLOR, STAR_IMAGE, Game
+from psi_environment.game.particles import (
+    MAX_LIFESPAN,
+    PARTICLES_PER_EMITTER,
+    ParticleSystem,
+)
+
+from conftest import SeededAgent
+
+
+def tint_per_pixel(image, color, blend_factor):
+    new_image = image.copy()
+    for x in range(new_image.get_width()):
+        for y in range(new_image.get_height()):
+            pixel = new_image.get_at((x, y))
+            if pixel.a != 0:
+                new_image.set_at(
+                    (x, y),
+                    (
+                        int(pixel[0] * (1 - blend_factor) + color[0] * blend_factor),
+                        int(pixel[1] * (1 - blend_factor) + color[1] * blend_factor),
+                        int(pixel[2] * (1 - blend_factor) + color[2] * blend_factor),
+                        pixel.a,
+                    ),
+                )
+    return new_image
+
+
+@pytest.mark.parametrize(
+    "name,color",
+    [
+        (STAR_IMAGE, (220, 20, 60)),
+        (STAR_IMAGE, (0, 255, 255)),
+        (CAR_IMAGES[0], (255, 105, 180)),
+        ("crossroad1.png", (128, 128, 0)),
+    ],
+)
+def test_tint_matches_per_pixel_blending(name, color):
+    image = assets.load_image(name)
+
+    expected = tint_per_pixel(image, color, 0.7)
+    result = assets.tint(image, color, 0.7)
+
+    assert pygame.image.tobytes(result, "RGBA") == pygame.image.tobytes(
+        expected, "RGBA"
+    )
+
+
+def test_sprites_are_cached():
+    assert assets.load_image(STAR_IMAGE) is assets.load_image(STAR_IMAGE)
+
+    sprite = assets.get_sprite(STAR_IMAGE, (0, 0, 128), 0.7, (20, 20))
+    assert sprite.get_size() == (20, 20)
+    assert sprite is assets.get_sprite(STAR_IMAGE, (0, 0, 128), 0.7, (20, 20))
+
+
+def test_dirty_rect_frames_match_full_redraw():
+    def render_frames(full_redraw):
+        np.random.seed(3)
+        game_map = Map(
+            random_seed=3,
+            n_bots=40,
+            agent_types=[SeededAgent] * 3,
+            n_points=20,
+        )
+        game = Game(game_map, random_seed=3, ticks_per_second=0)
+        frames = []
+        for i in range(60):
+            random.seed(i)
+            game_map.step()
+            if full_redraw:
+                game._full_redraw = True
+            game.step()
+            frames.append(pygame.image.tobytes(game._screen, "RGB"))
+        game.stop()
+        return frames
+
+    assert render_frames(False) == render_frames(True)
+
+
+def test_snapshot_survives_pickling():
+    np.random.seed(3)
+    game_map = Map(
+        random_seed=3,
+        n_bots=10,
+        agent_types=[SeededAgent] * 2,
+        n_points=5,
+    )
+    random.seed(0)
+    game_map.step()
+
+    snapshot = game_map.get_snapshot()
+    restored = pickle.loads(pickle.dumps(snapshot))
+
+    assert restored == snapshot
+    assert restored.step == game_map.get_timestep() == 1
+
+
+def test_particles_fade_out_and_are_culled():
+    particles = ParticleSystem(capacity=20, palette=PRE_COLOR, size=4, random_seed=0)
+    particles.emit([(100, 100)], [(1, 0)], [0])
+    assert len(particles) == PARTICLES_PER_EMITTER
+
+    start = particles._pos.copy()
+    particles.update()
+    moved = particles._pos[:PARTICLES_PER_EMITTER] - start[:PARTICLES_PER_EMITTER]
+    assert np.all(moved[:, 0] >= 0.5) and np.all(moved[:, 1] == 0)
+
+    for _ in range(MAX_LIFESPAN):
+        particles.update()
+    assert len(particles) == 0
+    assert particles.get_tiles(40) == set()
+
+
+def test_particles_overwrite_oldest_when_full():
+    particles = ParticleSystem(capacity=7, palette=PRE_COLOR, size=4, random_seed=0)
+    particles.emit([(10, 10)], [(1, 0)], [0])
+    particles.emit([(500, 500)], [(0, 1)], [1])
+
+    assert len(particles) == 7
+    assert np.count_nonzero(particles._color == 1) == PARTICLES_PER_EMITTER
+    assert (12, 12) in particles.get_tiles(40)
+
+
+def test_offscreen_frames_match_window_frames():
+    def render_frames(offscreen):
+        np.random.seed(4)
+        game_map = Map(
+            random_seed=4,
+            n_bots=20,
+            agent_types=[SeededAgent] * 2,
+            n_points=10,
+        )
+        game = Game(game_map, random_seed=4, ticks_per_second=0, offscreen=offscreen)
+        frames = []
+        for i in range(10):
+            random.seed(i)
+            game_map.step()
+            game.step()
+            frames.append(pygame.image.tobytes(game.get_surface(), "RGB"))
+        game.stop()
+        return frames
+
+    assert render_frames(True) == render_frames(False)
+
+
+@pytest.mark.parametrize("image_format", ["png", "npy"])
+def test_frame_exporter_saves_every_nth_frame(tmp_path, image_format):
+    np.random.seed(4)
+    game_map = Map(
+        random_seed=4,
+        n_bots=20,
+        agent_types=[SeededAgent] * 2,
+        n_points=10,
+    )
+    game = Game(game_map, random_seed=4, ticks_per_second=0, offscreen=True)
+    exporter = FrameExporter(str(tmp_path), stride=3, image_format=image_format)
+    frames = {}
+    for step in range(1, 8):
+        game_map.step()
+        game.step()
+        if exporter.submit(step, game.get_surface()):
+            frames[step] = pygame.image.tobytes(game.get_surface(), "RGB")
+    exporter.close()
+    game.stop()
+
+    assert sorted(frames) == [3, 6]
+    assert len(os.listdir(tmp_path)) == 2
+    for step, expected in frames.items():
+        path = exporter.get_frame_path(step)
+        if image_format == "png":
+            saved = pygame.image.tobytes(pygame.image.load(path), "RGB")
+        else:
+            saved = np.load(path).tobytes()
+        assert saved == expected
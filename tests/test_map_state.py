@@ -0,0 +1,123 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from psi_environment.data.action import Action
+from psi_environment.data.map import Map
+from psi_environment.data.map_state import MapState
+
+from conftest import SeededAgent
+
+
+def test_map_objects_use_slots_and_pickle():
+    np.random.seed(0)
+    game_map = Map(random_seed=0, n_bots=10, agent_types=[SeededAgent] * 2)
+    for _ in range(20):
+        game_map.step()
+    map_state = game_map.get_map_state()
+    road = next(iter(map_state.get_roads().values()))
+    traffic_light = next(iter(map_state.get_traffic_lights().values()))
+    point = map_state.get_points()[1][0]
+    # car 3 is a bot, a DummyAgent
+    car = game_map._cars[3]
+
+    for obj in (road, traffic_light, point, car):
+        assert not hasattr(obj, "__dict__")
+
+    copy = pickle.loads(pickle.dumps(map_state))
+    assert copy.get_cars() == map_state.get_cars()
+    road_key = road.get_key()
+    np.testing.assert_array_equal(copy.get_road(road_key).get_road(), road.get_road())
+    assert copy.get_road(road_key).get_available_turns() == road.get_available_turns()
+    assert [p.map_position for p in copy.get_points()[1]] == [
+        p.map_position for p in map_state.get_points()[1]
+    ]
+
+
+def create_crowded_map_state(seed: int, n_cars: int) -> MapState:
+    np.random.seed(seed)
+    map_state = MapState(seed)
+    cells = [
+        (road_key, pos)
+        for road_key, road in map_state.get_roads().items()
+        for pos in range(road.get_length())
+    ]
+    for car_id, idx in enumerate(
+        np.random.choice(len(cells), n_cars, replace=False), start=1
+    ):
+        map_state._add_car(car_id, *cells[idx])
+    map_state.add_points(5, list(range(1, n_cars + 1, 7)))
+    return map_state
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_vectorized_moves_match_moving_one_by_one(seed):
+    vectorized = create_crowded_map_state(seed, n_cars=150 + 50 * seed)
+    one_by_one = pickle.loads(pickle.dumps(vectorized))
+    one_by_one._vectorized_moves = False
+    rng = np.random.default_rng(seed)
+    car_ids = list(vectorized.get_cars())
+
+    for tick in range(100):
+        # mostly forward, in random order and with some duplicated cars
+        order = rng.permutation(car_ids + car_ids[: tick % 20 == 0])
+        moves = rng.choice(4, size=len(order), p=[0.1, 0.7, 0.1, 0.1]) + 1
+        actions = [
+            (int(car_id), Action(move)) for car_id, move in zip(order, moves)
+        ]
+        results = vectorized.move_cars(list(actions))
+        assert results == one_by_one.move_cars(list(actions))
+        assert vectorized.get_cars() == one_by_one.get_cars()
+        np.testing.assert_array_equal(vectorized._lanes, one_by_one._lanes)
+        assert vectorized.state_hash() == one_by_one.state_hash()
+        assert [
+            (car_id, point.map_position)
+            for car_id, point in vectorized.get_collected_points()
+        ] == [
+            (car_id, point.map_position)
+            for car_id, point in one_by_one.get_collected_points()
+        ]
+        if tick % 10 == 0:
+            vectorized._switch_traffic_lights()
+            one_by_one._switch_traffic_lights()
+
+    for road_key, road in vectorized.get_roads().items():
+        np.testing.assert_array_equal(
+            road.get_road(), one_by_one.get_road(road_key).get_road()
+        )
+
+
+def test_state_hash_is_updated_incrementally():
+    np.random.seed(0)
+    game_map = Map(random_seed=0, n_bots=10, agent_types=[SeededAgent] * 3)
+    np.random.seed(0)
+    other_map = Map(random_seed=0, n_bots=10, agent_types=[SeededAgent] * 3)
+    map_state = game_map.get_map_state()
+    hashes = {map_state.state_hash()}
+
+    for _ in range(200):
+        game_map.step()
+        other_map.step()
+        assert map_state.state_hash() == map_state._compute_state_hash()
+        assert map_state.state_hash() == other_map.get_map_state().state_hash()
+        hashes.add(map_state.state_hash())
+
+    assert len(map_state.get_points()[1]) < 3
+    assert len(hashes) > 190
+    copy = pickle.loads(pickle.dumps(map_state))
+    assert copy.state_hash() == map_state.state_hash()
+
+    # the hash covers every part of the dynamic state
+    car_id, (road_key, road_pos) = next(iter(map_state.get_cars().items()))
+    node = next(iter(map_state.get_traffic_lights()))
+    changes = [
+        lambda state: setattr(state, "_ticks_since_switch", 1),
+        lambda state: state.get_points()[1].pop(),
+        lambda state: state.get_traffic_lights()[node].switch_lights(),
+        lambda state: state.get_cars().update({car_id: (road_key, road_pos + 1)}),
+    ]
+    for change in changes:
+        copy = pickle.loads(pickle.dumps(map_state))
+        change(copy)
+        assert copy._compute_state_hash() != map_state.state_hash()
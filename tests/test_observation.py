@@ -0,0 +1,74 @@
+import random
+
+import numpy as np
+import pytest
+
+from psi_environment.api.environment_api import EnvironmentAPI
+from psi_environment.data.map import Map
+from psi_environment.data.observation import ObservationChannel, ObservationGrid
+
+from conftest import SeededAgent
+
+
+@pytest.fixture
+def game_map():
+    np.random.seed(11)
+    random.seed(11)
+    return Map(
+        random_seed=11,
+        n_bots=30,
+        agent_types=[SeededAgent] * 3,
+        n_points=40,
+        traffic_lights_length=3,
+    )
+
+
+def test_observation_is_updated_incrementally(game_map):
+    map_state = game_map.get_map_state()
+    api = EnvironmentAPI(map_state)
+    observation = api.get_observation(1)
+    grid = map_state.get_observation_grid()
+
+    for _ in range(60):
+        game_map.step()
+
+    assert map_state.get_observation_grid() is grid
+    rebuilt = ObservationGrid(map_state, grid.get_padding())
+    for car_id in (None, 1, 2, 3):
+        np.testing.assert_array_equal(
+            api.get_observation(car_id), rebuilt.get_observation(car_id)
+        )
+    # views returned earlier follow the state
+    np.testing.assert_array_equal(observation, rebuilt.get_observation(1))
+
+
+def test_observation_channels(game_map):
+    map_state = game_map.get_map_state()
+    observation = EnvironmentAPI(map_state).get_observation(2)
+
+    cars = observation[ObservationChannel.CARS]
+    assert cars.sum() == len(map_state.get_cars())
+    assert np.all(observation[ObservationChannel.ROADS][cars == 1] == 1)
+    assert observation[ObservationChannel.OWN_CAR].sum() == 1
+    n_points = len(map_state.get_points()[2])
+    assert observation[ObservationChannel.POINTS].sum() == 4 * n_points
+    assert observation.shape[1:] == tuple(2 * np.array(map_state.get_map_array().shape))
+
+
+def test_observation_is_read_only(game_map):
+    observation = EnvironmentAPI(game_map.get_map_state()).get_observation()
+
+    with pytest.raises(ValueError):
+        observation[ObservationChannel.CARS, 0, 0] = 1
+
+
+def test_observation_crop_is_centred_on_car(game_map):
+    api = EnvironmentAPI(game_map.get_map_state())
+
+    crop = api.get_observation(3, crop_radius=12)
+
+    assert crop.shape == (len(ObservationChannel), 25, 25)
+    assert crop[ObservationChannel.OWN_CAR, 12, 12] == 1
+    assert crop[ObservationChannel.OWN_CAR].sum() == 1
+    with pytest.raises(ValueError):
+        api.get_observation(None, crop_radius=2)
@@ -0,0 +1,103 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from types import MappingProxyType
+
+import numpy as np
+import pytest
+
+from psi_environment.data.action import Action
+from psi_environment.data.car import Car
+from psi_environment.data.map import Map
+from psi_environment.data.map_state import MapState
+from psi_environment.data.map_state_view import MapStateView, ReadOnlyView
+
+
+class WritingAgent(Car):
+    def get_action(self, map_state: MapState) -> Action:
+        road = map_state.get_road(self.get_road_key())
+        road.get_road()[0] = 0
+        return Action.FORWARD
+
+
+def run_map(agent_executor: ThreadPoolExecutor | None, steps: int = 50):
+    np.random.seed(0)
+    game_map = Map(
+        random_seed=0,
+        n_bots=20,
+        agent_executor=agent_executor,
+    )
+    for _ in range(steps):
+        game_map.step()
+    return game_map.get_map_state().get_cars()
+
+
+def test_thread_pool_matches_sequential_evaluation():
+    with ThreadPoolExecutor(4) as executor:
+        parallel_cars = run_map(executor)
+    assert parallel_cars == run_map(None)
+
+
+def test_agents_cannot_modify_roads():
+    np.random.seed(0)
+    with ThreadPoolExecutor(2) as executor:
+        game_map = Map(
+            random_seed=0,
+            n_bots=2,
+            agent_types=[WritingAgent],
+            agent_executor=executor,
+        )
+        with pytest.raises(ValueError):
+            game_map.step()
+
+    road = next(iter(game_map.get_map_state().get_roads().values()))
+    assert road.get_road().flags.writeable
+
+
+def test_view_is_read_only():
+    np.random.seed(0)
+    game_map = Map(random_seed=0, n_bots=2)
+    view = MapStateView(game_map.get_map_state())
+
+    assert isinstance(view.get_cars(), MappingProxyType)
+    assert not view.get_adjacency_matrix().flags.writeable
+    with pytest.raises(AttributeError):
+        view.move_cars
+    with pytest.raises(AttributeError):
+        view._edges
+
+
+def test_process_pool_is_rejected():
+    with ProcessPoolExecutor(1) as executor:
+        with pytest.raises(ValueError):
+            Map(random_seed=0, n_bots=2, agent_executor=executor)
+
+
+def test_view_freezes_points_and_traffic_lights():
+    np.random.seed(0)
+    game_map = Map(random_seed=0, n_bots=2, agent_types=[Car])
+    map_state = game_map.get_map_state()
+    view = MapStateView(map_state)
+
+    points = view.get_points()
+    assert isinstance(points[1], tuple)
+    with pytest.raises(AttributeError):
+        points[1].clear()
+    assert len(map_state.get_points()[1]) == 3
+
+    node, traffic_light = next(iter(view.get_traffic_lights().items()))
+    assert isinstance(traffic_light, ReadOnlyView)
+    assert traffic_light.get_blocked_road_keys() == tuple(
+        map_state.get_traffic_light(node).get_blocked_road_keys()
+    )
+    with pytest.raises(AttributeError):
+        traffic_light.switch_lights()
+
+    road_key = next(iter(map_state.get_roads()))
+    road = view.get_road(road_key)
+    assert road.get_length() == map_state.get_road(road_key).get_length()
+    with pytest.raises(TypeError):
+        road[0] = 1
+    with pytest.raises(ValueError):
+        road.get_road()[0] = 1
+
+    with pytest.raises(AttributeError):
+        view.get_observation_grid()
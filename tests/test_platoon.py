@@ -0,0 +1,16 @@
+import numpy as np
+
+from psi_environment.data.platoon import get_platoon_starts
+
+
+def test_platoons_split_at_gaps_and_road_starts():
+    # two roads of five cells, the second one starts at cell 5
+    road_starts = np.zeros(10, dtype=bool)
+    road_starts[[0, 5]] = True
+    cells = np.array([9, 8, 6, 5, 4, 3, 1])
+
+    starts = get_platoon_starts(cells, road_starts)
+
+    # a gap between cells 8 and 6, a new road at cell 4 and a gap before cell 1
+    np.testing.assert_array_equal(starts, [1, 0, 1, 0, 1, 0, 1])
+    assert get_platoon_starts(np.array([], dtype=int), road_starts).shape == (0,)
@@ -0,0 +1,119 @@
+import os
+import random
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import numpy as np
+import pytest
+
+from psi_environment.data.map import Map
+from psi_environment.data.recording import Recording
+from psi_environment.data.render_mode import RenderMode
+from psi_environment.environment import Environment
+from psi_environment.game.replay import ReplayPlayer
+
+from conftest import SeededAgent
+
+
+def record(path, n_steps, keyframe_interval, start_step=0):
+    np.random.seed(7)
+    random.seed(7)
+    game_map = Map(
+        random_seed=7,
+        n_bots=30,
+        agent_types=[SeededAgent] * 2,
+        n_points=40,
+        traffic_lights_length=3,
+    )
+    for _ in range(start_step):
+        game_map.step()
+    game_map.start_recording(path, keyframe_interval)
+    snapshots = [game_map.get_snapshot()]
+    for _ in range(n_steps):
+        game_map.step()
+        snapshots.append(game_map.get_snapshot())
+    game_map.stop_recording()
+    return snapshots
+
+
+@pytest.mark.parametrize("keyframe_interval", [1, 7, 100])
+def test_replay_matches_simulation(tmp_path, keyframe_interval):
+    path = tmp_path / "run.rec"
+    snapshots = record(path, 50, keyframe_interval)
+
+    recording = Recording.open(path)
+    assert len(recording) == 50
+    replayed = list(recording.iter_snapshots())
+    assert replayed[1:] == snapshots[1:]
+    assert replayed[0].cars == snapshots[0].cars
+    # some points were collected, so the test covers point events
+    assert replayed[-1].points != replayed[0].points
+
+    for step in (50, 0, 13, 14, 7, 49):
+        snapshot = recording.seek(step)
+        assert snapshot.cars == snapshots[step].cars
+        assert snapshot.blocked_directions == snapshots[step].blocked_directions
+        assert snapshot.points == snapshots[step].points
+    recording.close()
+
+
+def test_seek_out_of_range(tmp_path):
+    path = tmp_path / "run.rec"
+    record(path, 5, 2)
+
+    recording = Recording.open(path)
+    with pytest.raises(IndexError):
+        recording.seek(6)
+    recording.close()
+
+
+def test_recording_started_mid_run(tmp_path):
+    path = tmp_path / "run.rec"
+    snapshots = record(path, 25, 10, start_step=30)
+
+    recording = Recording.open(path)
+    assert recording.get_first_step() == 30
+    assert len(recording) == 25
+    assert recording.seek(42).cars == snapshots[12].cars
+    assert [snapshot.step for snapshot in recording.iter_snapshots()] == list(
+        range(30, 56)
+    )
+    with pytest.raises(IndexError):
+        recording.seek(10)
+    with pytest.raises(IndexError):
+        recording.seek(56)
+    with pytest.raises(IndexError):
+        recording.iter_snapshots(start=10)
+    recording.close()
+
+
+def test_environment_close_finishes_recording(tmp_path):
+    path = tmp_path / "run.rec"
+    env = Environment(
+        agent_types=[SeededAgent],
+        random_seed=7,
+        render_mode=RenderMode.NONE,
+        speed_multiplier=None,
+        recording_path=str(path),
+    )
+    for _ in range(5):
+        env.step()
+    env.close()
+    env.close()
+
+    assert not env.is_running()
+    recording = Recording.open(path)
+    assert len(recording) == 5
+    recording.close()
+
+
+def test_replay_player_plays_without_agents(tmp_path):
+    path = tmp_path / "run.rec"
+    record(path, 20, 8)
+
+    player = ReplayPlayer(str(path), ticks_per_second=0)
+    player.seek(10)
+    assert player.get_step() == 10
+    player.play(speed=4.0, start=3)
+    assert player.get_step() == 20
+    player.stop()
@@ -0,0 +1,117 @@
+import multiprocessing
+import time
+
+import numpy as np
+
+from psi_environment.data.action import Action
+from psi_environment.data.agent_server import AgentServer, run_agent_client
+from psi_environment.data.car import RemoteAgent
+from psi_environment.data.map import Map
+from psi_environment.data.map_state import MapState
+from psi_environment.data.shared_state import SharedMapState
+
+from conftest import SeededAgent
+
+
+class SlowAgent(SeededAgent):
+    def get_action(self, map_state: MapState) -> Action:
+        time.sleep(0.5)
+        return Action.BACK
+
+
+def start_clients(server: AgentServer, agent_types: list) -> list:
+    processes = [
+        multiprocessing.Process(
+            target=run_agent_client, args=(server.get_address(), agent_type)
+        )
+        for agent_type in agent_types
+    ]
+    for process in processes:
+        process.start()
+    return processes
+
+
+def test_remote_agents_match_local_agents():
+    np.random.seed(0)
+    local_map = Map(random_seed=0, n_bots=5, agent_types=[SeededAgent] * 2)
+    for _ in range(30):
+        local_map.step()
+
+    server = AgentServer()
+    processes = start_clients(server, [SeededAgent] * 2)
+    np.random.seed(0)
+    remote_map = Map(
+        random_seed=0,
+        n_bots=5,
+        agent_types=[RemoteAgent] * 2,
+        agent_server=server,
+    )
+    for _ in range(30):
+        remote_map.step()
+    server.close()
+    for process in processes:
+        process.join(5)
+
+    assert remote_map.get_map_state().get_cars() == local_map.get_map_state().get_cars()
+    assert remote_map.get_map_state().get_points().keys() == {1, 2}
+    assert all(process.exitcode == 0 for process in processes)
+    # the roads stay usable after the shared memory is freed
+    remote_map.step()
+
+
+def test_remote_agents_missing_deadline_fall_back():
+    server = AgentServer()
+    processes = start_clients(server, [SlowAgent])
+    np.random.seed(0)
+    game_map = Map(
+        random_seed=0,
+        n_bots=2,
+        agent_types=[RemoteAgent],
+        action_deadline=0.1,
+        agent_server=server,
+    )
+    actions = dict(game_map._get_actions())
+    time.sleep(0.5)
+    # the late reply to the first request must not answer the second one
+    assert dict(game_map._get_actions())[1] == Action.FORWARD
+    server.close()
+    for process in processes:
+        process.join(5)
+
+    assert actions[1] == Action.FORWARD
+    assert game_map.get_deadline_misses() == [(1, 1), (1, 1)]
+
+
+def test_shared_state_matches_map_state():
+    np.random.seed(0)
+    game_map = Map(random_seed=0, n_bots=10, agent_types=[SeededAgent] * 3)
+    map_state = game_map.get_map_state()
+    shared = SharedMapState.create(map_state)
+    reader = SharedMapState.attach(shared.get_layout())
+    copy = reader.create_map_state()
+
+    for tick in range(1, 300):
+        game_map.step()
+        shared.update(map_state, tick)
+        reader.load(copy)
+
+        assert reader.get_tick() == tick
+        assert copy.get_cars() == map_state.get_cars()
+        assert copy.state_hash() == map_state.state_hash()
+        for node, traffic_light in map_state.get_traffic_lights().items():
+            assert copy.get_traffic_light(node).get_blocked_road_keys() == (
+                traffic_light.get_blocked_road_keys()
+            )
+        assert {
+            car_id: [point.map_position for point in points]
+            for car_id, points in copy.get_points().items()
+        } == {
+            car_id: [point.map_position for point in points]
+            for car_id, points in map_state.get_points().items()
+        }
+        for road_key, road in map_state.get_roads().items():
+            assert np.array_equal(copy.get_road(road_key).get_road(), road.get_road())
+
+    assert len(map_state.get_points()[1]) < 3
+    reader.close(copy)
+    shared.close(map_state)
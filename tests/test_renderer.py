@@ -0,0 +1,61 @@
+import os
+import queue
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import numpy as np
+
+from psi_environment.data.map import Map
+from psi_environment.game.renderer import BackgroundRenderer
+
+from conftest import SeededAgent
+
+
+def make_map():
+    np.random.seed(3)
+    return Map(random_seed=3, n_bots=10, agent_types=[SeededAgent] * 2)
+
+
+def wait_for_frames(renderer, n_frames, timeout=30):
+    deadline = time.perf_counter() + timeout
+    while renderer.get_rendered_frames() < n_frames:
+        assert time.perf_counter() < deadline, "renderer did not draw in time"
+        time.sleep(0.01)
+
+
+def test_submit_replaces_snapshot_not_taken_yet():
+    game_map = make_map()
+    renderer = BackgroundRenderer.__new__(BackgroundRenderer)
+    renderer._queue = queue.Queue(maxsize=1)
+    renderer._pending = None
+
+    moved_cars = set()
+    for _ in range(3):
+        game_map.step()
+        snapshot = game_map.get_snapshot()
+        moved_cars |= snapshot.moved_cars
+        renderer.submit(snapshot)
+
+    latest = renderer._queue.get_nowait()
+    assert latest.step == 3
+    assert latest.moved_cars == moved_cars
+    assert renderer._pending is None
+
+
+def test_renderer_process_skips_frames_and_stops():
+    game_map = make_map()
+    # at 5 frames per second the renderer cannot keep up with the simulation
+    renderer = BackgroundRenderer(game_map, random_seed=4, fps=5)
+    assert renderer.is_running()
+    wait_for_frames(renderer, 1)
+
+    for _ in range(30):
+        game_map.step()
+        renderer.submit(game_map.get_snapshot())
+    renderer.stop()
+
+    assert not renderer.is_running()
+    assert not renderer._process.is_alive()
+    # the initial snapshot, a few intermediate ones and the last one
+    assert 2 <= renderer.get_rendered_frames() < 10
@@ -0,0 +1,113 @@
+import numpy as np
+
+from psi_environment.api.environment_api import EnvironmentAPI
+from psi_environment.data.action import Action
+from psi_environment.data.car import Car
+from psi_environment.data.map import Map
+from psi_environment.data.map_state import MapState
+from psi_environment.data.route import RouteTable
+
+
+def get_turn(api: EnvironmentAPI, road_key: tuple[int, int]) -> Action:
+    turns = api.get_available_turns(road_key)
+    return turns[sum(road_key) % len(turns)]
+
+
+class TurningAgent(Car):
+    """Takes a turn that depends only on its road at every road end."""
+
+    def __init__(self, road_key, road_pos, car_id):
+        super().__init__(road_key, road_pos, car_id)
+        self.n_calls = 0
+
+    def get_action(self, map_state: MapState) -> Action:
+        self.n_calls += 1
+        api = EnvironmentAPI.for_map_state(map_state)
+        if api.is_position_road_end(self._road_key, self._road_pos):
+            return get_turn(api, self._road_key)
+        return Action.FORWARD
+
+
+class RouteAgent(TurningAgent):
+    """Takes the same turns as TurningAgent, planned five road ends ahead."""
+
+    def get_action(self, map_state: MapState) -> Action:
+        self.n_calls += 1
+        api = EnvironmentAPI.for_map_state(map_state)
+        route = []
+        road_key = self._road_key
+        for _ in range(5):
+            route.append(get_turn(api, road_key))
+            road_key = api.get_route_road_keys(road_key, route[-1:])[0]
+        self.set_route(route, max_blocked_ticks=3)
+        # not used, the route starts in this step
+        return Action.BACK
+
+
+def run_map(agent_type, steps=150):
+    np.random.seed(0)
+    game_map = Map(random_seed=0, n_bots=20, agent_types=[agent_type] * 4)
+    positions = []
+    for _ in range(steps):
+        game_map.step()
+        positions.append(dict(game_map.get_map_state().get_cars()))
+    return game_map, positions
+
+
+def test_routes_drive_like_agents_asked_every_step():
+    route_map, positions = run_map(RouteAgent)
+    turning_map, reference_positions = run_map(TurningAgent)
+    assert positions == reference_positions
+
+    n_calls = sum(agent.n_calls for agent in route_map._agents.values())
+    assert n_calls < sum(agent.n_calls for agent in turning_map._agents.values()) / 5
+
+
+def test_route_table_drops_routes():
+    routes = RouteTable([1, 2, 3])
+    routes.set_route(1, [Action.LEFT, Action.RIGHT], max_blocked_ticks=2)
+    routes.set_route(2, [Action.FORWARD] * 20, max_blocked_ticks=2)
+    routes.set_route(3, [Action.BACK], max_blocked_ticks=2)
+    assert routes.get_car_ids() == [1, 2, 3]
+    assert routes.get_actions([1, 2, 3], at_road_end=[1]) == {
+        1: Action.LEFT,
+        2: Action.FORWARD,
+        3: Action.FORWARD,
+    }
+
+    # car 1 completes its first action, car 2 collects a point, car 3 is blocked
+    routes.update(moved_car_ids={1}, collecting_car_ids={2})
+    assert routes.get_car_ids() == [1, 3]
+    assert routes.get_actions([1, 3], at_road_end=[1, 3]) == {
+        1: Action.RIGHT,
+        3: Action.BACK,
+    }
+    routes.update(moved_car_ids={1}, collecting_car_ids=set())
+    assert not routes.has_route(1)
+    assert not routes.has_route(3)
+
+    # replacing routes compacts the buffer
+    for _ in range(10):
+        routes.set_route(2, [Action.LEFT] * 20, max_blocked_ticks=2)
+    assert len(routes._actions) <= 64
+    assert routes.get_actions([2], at_road_end=[2]) == {2: Action.LEFT}
+
+
+class UninitializedAgent(Car):
+    """Sets its attributes without calling Car.__init__."""
+
+    def __init__(self, road_key, road_pos, car_id):
+        self._road_key = road_key
+        self._road_pos = road_pos
+        self._car_id = car_id
+
+    def get_action(self, map_state: MapState) -> Action:
+        return Action.FORWARD
+
+
+def test_agents_without_car_init_are_supported():
+    np.random.seed(0)
+    game_map = Map(random_seed=0, n_bots=5, agent_types=[UninitializedAgent] * 2)
+    for _ in range(10):
+        game_map.step()
+    assert game_map.get_timestep() == 10
@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+from psi_environment.data.map import Map
+from psi_environment.data.render_mode import RenderMode
+from psi_environment.data.stop_mode import StopMode
+from psi_environment.data.stop_reason import StopReason
+from psi_environment.environment import Environment
+
+from conftest import SeededAgent
+
+
+def make_map(n_agents=3, **kwargs):
+    np.random.seed(0)
+    return Map(
+        random_seed=0,
+        n_bots=10,
+        agent_types=[SeededAgent] * n_agents,
+        n_points=2,
+        **kwargs,
+    )
+
+
+def test_scoreboard_tracks_points_and_finish_ticks():
+    game_map = make_map()
+    scoreboard = game_map.get_scoreboard()
+    points = game_map.get_map_state().get_points()
+    first_finished = None
+
+    while not game_map.is_game_over():
+        game_map.step()
+        scores = scoreboard.get_scores()
+        for car_id, score in scores.items():
+            assert score.points_left == len(points[car_id])
+            assert len(score.collection_ticks) == 2 - score.points_left
+        finished = [car_id for car_id, p in points.items() if not p]
+        assert game_map.is_game_over(StopMode.ONE_FINISHED) == bool(finished)
+        if finished and first_finished is None:
+            first_finished = game_map.get_timestep()
+
+    scores = scoreboard.get_scores()
+    assert all(score.points_left == 0 for score in scores.values())
+    assert {
+        car_id: score.collection_ticks[-1] for car_id, score in scores.items()
+    } == scoreboard.get_finish_ticks()
+    assert min(scoreboard.get_finish_ticks().values()) == first_finished
+    assert max(scoreboard.get_finish_ticks().values()) == game_map.get_timestep()
+
+
+def test_first_k_finished_stops_when_k_agents_finished():
+    game_map = make_map(stop_mode=StopMode.FIRST_K_FINISHED, n_finished=2)
+    scoreboard = game_map.get_scoreboard()
+    while not game_map.is_game_over():
+        assert scoreboard.get_n_finished() < 2
+        game_map.step()
+    assert scoreboard.get_n_finished() == 2
+
+
+def test_tick_and_wall_limits():
+    with pytest.raises(ValueError):
+        make_map(stop_mode=StopMode.MAX_TICKS)
+    with pytest.raises(ValueError):
+        make_map(stop_mode=StopMode.WALL_BUDGET)
+
+    game_map = make_map(stop_mode=StopMode.MAX_TICKS, max_ticks=30)
+    for _ in range(29):
+        game_map.step()
+        assert not game_map.is_game_over()
+    game_map.step()
+    assert game_map.is_game_over()
+
+    assert make_map(stop_mode=StopMode.WALL_BUDGET, wall_budget=0).is_game_over()
+    assert not make_map(wall_budget=100).is_game_over()
+
+
+def test_run_summary_has_finish_ticks():
+    env = Environment(
+        agent_types=[SeededAgent] * 2,
+        n_bots=10,
+        n_points=2,
+        random_seed=3,
+        render_mode=RenderMode.NONE,
+        max_ticks=20,
+    )
+    summary = env.run()
+    assert summary.stop_reason == StopReason.GAME_OVER
+    assert summary.timestep == 20
+    scores = env._map.get_scoreboard().get_scores()
+    assert summary.finish_ticks == {
+        car_id: score.finish_tick for car_id, score in scores.items()
+    }
@@ -0,0 +1,38 @@
+import subprocess
+import sys
+
+HEADLESS_RUN = """
+from psi_environment.data.render_mode import RenderMode
+from psi_environment.environment import Environment
+
+env = Environment(
+    n_bots=5, random_seed=1, render_mode=RenderMode.NONE, speed_multiplier=None
+)
+for _ in range(10):
+    env.step()
+"""
+
+
+def get_imported_modules(code: str) -> dict[str, int]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            modules[name.strip()] = int(cumulative)
+    return modules
+
+
+def test_headless_environment_does_not_import_pygame():
+    modules = get_imported_modules(HEADLESS_RUN)
+
+    assert "psi_environment.environment" in modules
+    assert "pygame" not in modules
+    assert not any(name.startswith("psi_environment.game") for name in modules)